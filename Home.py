@@ -1,4 +1,8 @@
 import streamlit as st
+from core.warmup import start_warmup, report
+
+# Server boot par detector background mein load + warm (pehla visitor wait na kare)
+start_warmup()
 
 #  --- REMOVE WATERMARK CONFIG ---
 st.markdown("""
@@ -148,9 +152,9 @@ with col5:
             <span class='logic-tag'>DeepFace + Sentiment Analysis</span>
             <p style='color: #aaa; margin-top: 10px; font-size: 14px;'>
                 <b>How it works:</b><br>
-                1. <b>Biometric Extraction:</b> Face landmarks se Age, Gender aur Mood predict karta hai.<br>
+                1. <b>Face Tracking:</b> Har frame sasta face detector + tracker; DeepFace (Age, Gender, Mood) sirf naye face par ya har kuch second.<br>
                 2. <b>Safe-Search Filter:</b> Age ke base par content restrictions (Kids/Adult) apply karta hai.<br>
-                3. <b>YT-DLP API:</b> Mood ke according real-time music and movie recommendations load karta hai.
+                3. <b>Local Catalog:</b> Mood ke according music and movie recommendations, bina network call ke.
             </p>
         </div>
         """, unsafe_allow_html=True)
@@ -162,6 +166,12 @@ st.write("### 🏗️ Neural Pipeline Architecture")
 
 st.info("👈 **Sidebar open karein aur feature select karein.** Har module backend par Deep Learning models (Weights) use karta hai.")
 
+# --- STARTUP STATUS ---
+startup = report()
+with st.expander(f"⚡ Engine: {startup['state']}"):
+    st.button("🔄 Refresh", key="startup_refresh")
+    st.json(startup)
+
 
 
 
@@ -0,0 +1,149 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import git_commit, load_frames, peak_rss_mb, summarize
+
+# Pages ki zarurat ke hisaab se "kaafi achha" ki seema (PyTorch baseline ke against)
+MEASUREMENT_MAX_SIZE_ERR_PCT = 2.0
+SPEED_MAX_CENTER_ERR_PX = 2.0
+MIN_RECALL = 0.95
+
+
+# --- BACKEND RUN ---
+# Har backend alag process mein: export/load, warm-up, phir har frame ki detections + latency
+def run_backend(backend, args):
+    from core.detections import Detections
+    from core.inference import registry, shared_model
+
+    model = shared_model(args.weights, backend)
+    frames = load_frames(args)
+    t0 = time.perf_counter()
+    model.predict(frames[0], imgsz=args.imgsz, conf=args.conf, verbose=False)
+    load_s = time.perf_counter() - t0
+
+    times, dets = [], []
+    for img in frames:
+        t1 = time.perf_counter()
+        d = Detections.from_result(model.predict(img, imgsz=args.imgsz, conf=args.conf, verbose=False)[0])
+        times.append(time.perf_counter() - t1)
+        dets.append({"xyxy": d.xyxy.tolist(), "conf": d.conf.tolist(), "cls": d.cls.tolist()})
+    entry = next((e for e in registry.stats() if e["backend"] == backend and e["tag"] is None), {})
+    return {"active": entry.get("active"), "fallback": entry.get("fallback"), "load_s": round(load_s, 3),
+            "latency": summarize(times), "peak_rss_mb": round(peak_rss_mb(), 1), "dets": dets}
+
+
+# --- ACCURACY vs BASELINE ---
+def _iou(a, b):
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(rb - lt, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def agreement(base_frames, cand_frames, iou_thr=0.5):
+    # Greedy same-class IoU matching; measurement ke liye box size error, speed ke liye center shift
+    n_base = n_cand = matched = 0
+    ious, conf_err, size_err, center_err = [], [], [], []
+    for bf, cf in zip(base_frames, cand_frames):
+        b, c = np.asarray(bf["xyxy"], np.float32).reshape(-1, 4), np.asarray(cf["xyxy"], np.float32).reshape(-1, 4)
+        n_base += len(b)
+        n_cand += len(c)
+        if not len(b) or not len(c):
+            continue
+        m = _iou(b, c)
+        m[np.asarray(bf["cls"])[:, None] != np.asarray(cf["cls"])[None, :]] = 0
+        for i, j in zip(*np.unravel_index(np.argsort(-m, axis=None), m.shape)):
+            if m[i, j] < iou_thr:
+                break
+            if np.isnan(m[i, j]):
+                continue
+            matched += 1
+            ious.append(m[i, j])
+            conf_err.append(abs(bf["conf"][i] - cf["conf"][j]))
+            wh_b, wh_c = b[i, 2:] - b[i, :2], c[j, 2:] - c[j, :2]
+            size_err.append(float(np.mean(np.abs(wh_c - wh_b) / np.maximum(wh_b, 1e-6))) * 100)
+            center_err.append(float(np.linalg.norm((c[j, :2] + c[j, 2:]) / 2 - (b[i, :2] + b[i, 2:]) / 2)))
+            m[i, :] = np.nan
+            m[:, j] = np.nan
+
+    def mean(x):
+        return round(float(np.mean(x)), 3) if x else None
+
+    return {"recall": round(matched / n_base, 3) if n_base else None,
+            "precision": round(matched / n_cand, 3) if n_cand else None,
+            "mean_iou": mean(ious), "conf_mae": mean(conf_err),
+            "size_err_pct": mean(size_err), "center_err_px": mean(center_err)}
+
+
+def verdict(acc):
+    if acc["recall"] is None or acc["size_err_pct"] is None:
+        return {"measurement": None, "speed": None}
+    ok_recall = acc["recall"] >= MIN_RECALL
+    return {"measurement": ok_recall and acc["size_err_pct"] <= MEASUREMENT_MAX_SIZE_ERR_PCT,
+            "speed": ok_recall and acc["center_err_px"] <= SPEED_MAX_CENTER_ERR_PX}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Accuracy/latency of ONNX/OpenVINO (INT8) backends vs PyTorch.")
+    parser.add_argument("--backends", default="onnx,onnx-int8,openvino,openvino-int8",
+                        help="comma list compared against torch")
+    parser.add_argument("--images", help="folder of real images (recommended; synthetic frames otherwise)")
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU for matching against baseline boxes")
+    parser.add_argument("--weights", default=None)
+    parser.add_argument("--out", default=None, help="JSON output path")
+    args = parser.parse_args(argv)
+
+    from core import config
+    args.weights = args.weights or config.WEIGHTS
+
+    report = {"meta": {"commit": git_commit(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "python": platform.python_version(), "machine": platform.machine(),
+                       "cpus": os.cpu_count(), "args": vars(args)},
+              "backends": {}}
+
+    ctx = mp.get_context("spawn")
+    names = ["torch"] + [b.strip() for b in args.backends.split(",") if b.strip() and b.strip() != "torch"]
+    results = {}
+    for name in names:
+        with ctx.Pool(1) as pool:
+            results[name] = pool.apply(run_backend, (name, args))
+
+    base = results["torch"]
+    base_p50 = base["latency"]["p50_ms"]
+    print(f"{'backend':15s} {'active':15s} {'p50 ms':>8s} {'speedup':>8s} {'recall':>7s} {'size%':>7s} "
+          f"{'ctr px':>7s}  measurement/speed")
+    for name, res in results.items():
+        acc = agreement(base["dets"], res["dets"], args.iou)
+        ok = verdict(acc)
+        p50 = res["latency"]["p50_ms"]
+        row = {k: v for k, v in res.items() if k != "dets"}
+        row.update(accuracy=acc, verdict=ok, speedup=round(base_p50 / p50, 2) if p50 else None)
+        report["backends"][name] = row
+        print(f"{name:15s} {str(res['active']):15s} {p50:8.2f} {row['speedup'] or 0:7.2f}x "
+              f"{acc['recall'] or 0:7.3f} {acc['size_err_pct'] or 0:7.2f} {acc['center_err_px'] or 0:7.2f}  "
+              f"{ok['measurement']}/{ok['speed']}" + (f"  (fallback: {res['fallback']})" if res["fallback"] else ""))
+
+    stamp = f"{report['meta']['commit'] or 'local'}-{int(time.time())}"
+    out = args.out or os.path.join("bench_results", f"backends-{stamp}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"saved {out}")
+
+
+if __name__ == "__main__":
+    main()
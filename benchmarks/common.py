@@ -0,0 +1,119 @@
+import glob
+import os
+import resource
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+
+# --- MEMORY ---
+def rss_mb():
+    # Current RSS (Linux /proc), warna process ka peak (ru_maxrss: Linux KB, macOS bytes)
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+# --- STAGE TIMER ---
+class StageTimer:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.peak_rss = defaultdict(float)
+        # Pipeline-specific counters (jaise live worker ke processed/dropped)
+        self.extra = None
+
+    @contextmanager
+    def __call__(self, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[stage].append(time.perf_counter() - t0)
+            self.peak_rss[stage] = max(self.peak_rss[stage], rss_mb())
+
+    def summary(self):
+        return {stage: summarize(times, self.peak_rss[stage]) for stage, times in self.samples.items()}
+
+
+def summarize(times, peak_rss=None):
+    ms = np.asarray(times) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if len(ms) else (0, 0, 0)
+    total = ms.sum() / 1000
+    out = {"n": len(ms), "mean_ms": round(float(ms.mean()) if len(ms) else 0, 3),
+           "p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3),
+           "throughput_per_s": round(len(ms) / total, 2) if total else 0.0}
+    if peak_rss is not None:
+        out["peak_rss_mb"] = round(peak_rss, 1)
+    return out
+
+
+# --- INPUT FRAMES ---
+def synthetic_frames(n, size=(640, 480), seed=0):
+    # Gradient background par chalte hue rectangles/circles (tracker aur motion ko kuch dikhe)
+    w, h = size
+    rng = np.random.default_rng(seed)
+    bg = np.dstack([np.tile(np.linspace(30, 120, w, dtype=np.uint8), (h, 1))] * 3)
+    objs = [(rng.uniform(0, w), rng.uniform(0, h), rng.uniform(-8, 8), rng.uniform(-4, 4),
+             tuple(int(c) for c in rng.integers(0, 255, 3))) for _ in range(6)]
+    for i in range(n):
+        frame = bg.copy()
+        for k, (x, y, vx, vy, color) in enumerate(objs):
+            cx, cy = int((x + vx * i) % w), int((y + vy * i) % h)
+            if k % 2:
+                cv2.circle(frame, (cx, cy), 30, color, -1)
+            else:
+                cv2.rectangle(frame, (cx - 40, cy - 25), (cx + 40, cy + 25), color, -1)
+        yield frame
+
+
+def image_frames(directory, n=None):
+    paths = sorted(p for ext in ("jpg", "jpeg", "png", "bmp") for p in glob.glob(os.path.join(directory, f"*.{ext}")))
+    for p in paths[:n]:
+        img = cv2.imread(p)
+        if img is not None:
+            yield img
+
+
+def video_frames(path, n=None):
+    cap = cv2.VideoCapture(path)
+    try:
+        i = 0
+        while n is None or i < n:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield frame
+            i += 1
+    finally:
+        cap.release()
+
+
+def load_frames(args):
+    # Saare benchmarks ke --images / --video / --frames (/ --width --height) flags -> frames ki list
+    if args.images:
+        return list(image_frames(args.images, args.frames))
+    if getattr(args, "video", None):
+        return list(video_frames(args.video, args.frames))
+    size = (getattr(args, "width", 640), getattr(args, "height", 480))
+    return list(synthetic_frames(args.frames, size))
+
+
+def git_commit():
+    try:
+        import subprocess
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
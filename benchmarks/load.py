@@ -0,0 +1,304 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import git_commit, load_frames, rss_mb
+
+PIPELINES = ("detection_live", "speed_tracker")
+
+
+# --- STREAM FACTORIES ---
+# Pages jaisa hi setup (same classes, same defaults), sirf Streamlit/WebRTC ke bina.
+# Har stream = ek browser session: apna processor, apna tracker/controller/gate.
+def make_detection_live(model, scheduler, args, metrics):
+    from core.adaptive import AdaptiveController
+    from core.live import LiveDetector
+    from core.motion import MotionGate
+
+    controller = None
+    if args.adaptive:
+        controller = AdaptiveController(target_ms=150, imgsz=320, interval_bounds=(0.0, 0.5),
+                                        metrics=metrics, sizes=model.sizes)
+    return LiveDetector(model, conf=0.3, imgsz=320, night_mode=args.night, metrics=metrics, controller=controller,
+                        gate=MotionGate() if args.gate else None, scheduler=scheduler)
+
+
+def make_speed_tracker(model, scheduler, args, metrics):
+    from core.adaptive import AdaptiveController
+    from core.motion import MotionGate
+    from core.radar import VideoProcessor
+
+    controller = None
+    if args.adaptive:
+        controller = AdaptiveController(target_ms=80, imgsz=256, interval_bounds=(0.05, 0.5),
+                                        metrics=metrics, sizes=model.sizes)
+    return VideoProcessor(model, "km/h", 50, 35, args.night, metrics=metrics, controller=controller,
+                          gate=MotionGate() if args.gate else None, scheduler=scheduler)
+
+
+FACTORIES = {"detection_live": make_detection_live, "speed_tracker": make_speed_tracker}
+
+
+def _callback(proc):
+    # av ho to asli recv (ndarray <-> VideoFrame conversion bhi load ka hissa), warna process()
+    try:
+        import av
+    except ImportError:
+        return lambda img: proc.process(img), False
+
+    def call(img):
+        return proc.recv(av.VideoFrame.from_ndarray(img, format="bgr24"))
+
+    return call, True
+
+
+# --- ONE CAMERA ---
+# Camera `fps` par frames deta hai. Callback busy ho to beech ke frames miss (WebRTC bhi purane
+# frames rok ke nahi rakhta): agla callback sabse naye frame par. Latency = frame ka capture
+# time -> callback return, yaani wait + processing.
+def _stream(call, frames, fps, phase, t_start, t_measure, t_end, out):
+    interval = 1.0 / fps
+    latencies, delivered, missed = [], 0, 0
+    k = 0
+    while True:
+        t_tick = t_start + phase + k * interval
+        if t_tick > t_end:
+            break
+        now = time.perf_counter()
+        if now < t_tick:
+            time.sleep(t_tick - now)
+        else:
+            behind = int((now - t_tick) / interval)
+            if behind:
+                k += behind
+                t_tick += behind * interval
+                if t_tick >= t_measure:
+                    missed += behind
+        call(frames[k % len(frames)].copy())
+        if t_tick >= t_measure:
+            latencies.append(time.perf_counter() - t_tick)
+            delivered += 1
+        k += 1
+    out.update(latencies=latencies, delivered=delivered, missed=missed)
+
+
+class _Sampler:
+    # Step ke dauraan RSS ka peak (threads ke allocations bhi process RSS mein)
+    def __init__(self, every=0.2):
+        self.every = every
+        self.peak = rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.every):
+            self.peak = max(self.peak, rss_mb())
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return max(self.peak, rss_mb())
+
+
+def _cpu_s():
+    r = resource.getrusage(resource.RUSAGE_SELF)
+    return r.ru_utime + r.ru_stime
+
+
+def _pct(x, q):
+    return round(float(np.percentile(np.asarray(x) * 1000, q)), 2) if len(x) else None
+
+
+# --- ONE RAMP STEP ---
+def run_step(n, model, scheduler, frames, args):
+    from core.metrics import Metrics
+
+    # Step ka apna Metrics (process registry se alag), taaki pichhle step ke samples mix na hon
+    metrics = Metrics(f"load-{n}", window=1 << 16)
+    procs = [FACTORIES[args.pipeline](model, scheduler, args, metrics) for _ in range(n)]
+    calls = [_callback(p) for p in procs]
+
+    t_start = time.perf_counter() + 0.2
+    t_measure = t_start + args.settle
+    t_end = t_measure + args.duration
+    outs = [{} for _ in range(n)]
+    # Cameras ek saath tick na karein: phase barabar spread
+    threads = [threading.Thread(target=_stream, args=(call, frames, args.fps, i / (args.fps * n), t_start,
+                                                      t_measure, t_end, outs[i]), daemon=True)
+               for i, (call, _) in enumerate(calls)]
+    for t in threads:
+        t.start()
+
+    # CPU/RSS sirf measurement window ka
+    time.sleep(max(t_measure - time.perf_counter(), 0))
+    snap_before = metrics.snapshot()
+    pool_before = scheduler.stats() if scheduler is not None else None
+    cpu0, wall0 = _cpu_s(), time.perf_counter()
+    sampler = _Sampler()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall0
+    cpu = _cpu_s() - cpu0
+    peak_rss = sampler.stop()
+    snap = metrics.snapshot()
+
+    latencies = np.concatenate([np.asarray(o["latencies"]) for o in outs])
+    fps = np.array([o["delivered"] / args.duration for o in outs])
+    row = {"streams": n, "fps_target": args.fps,
+           "fps_mean": round(float(fps.mean()), 2), "fps_min": round(float(fps.min()), 2),
+           "fps_total": round(float(fps.sum()), 2),
+           "missed": int(sum(o["missed"] for o in outs)),
+           "latency_p50_ms": _pct(latencies, 50), "latency_p95_ms": _pct(latencies, 95),
+           "latency_p99_ms": _pct(latencies, 99),
+           "cpu_cores": round(cpu / wall, 2), "cpu_pct": round(cpu / wall / (os.cpu_count() or 1) * 100, 1),
+           "rss_mb": round(rss_mb(), 1), "peak_rss_mb": round(peak_rss, 1), "av": calls[0][1]}
+
+    # Detections ki rate + age (latest-frame worker ka e2e); Speed Tracker mein yeh recv ke andar hi hai
+    counters, counters_before = snap["counters"], snap_before["counters"]
+    inferred = counters.get("frames_inferred", 0) - counters_before.get("frames_inferred", 0)
+    row["infer_fps_per_stream"] = round(inferred / args.duration / n, 2)
+    row["frames_dropped"] = counters.get("frames_dropped", 0) - counters_before.get("frames_dropped", 0)
+    if args.pipeline == "detection_live":
+        # Window bada hai, step ke andar ring wrap nahi hota: settle wale samples seedha kaat do
+        e2e = metrics.samples("e2e")[snap_before["stages"].get("e2e", {}).get("count", 0):]
+        if len(e2e):
+            row.update(detect_e2e_p50_ms=_pct(e2e, 50), detect_e2e_p95_ms=_pct(e2e, 95),
+                       detect_e2e_p99_ms=_pct(e2e, 99))
+        row["worker_dropped"] = sum(p.worker.dropped for p in procs)
+    if pool_before is not None:
+        pool = scheduler.stats()
+        row["pool"] = {"batches": pool["batches"] - pool_before["batches"],
+                       "frames": pool["frames"] - pool_before["frames"],
+                       "dropped": pool["dropped"] - pool_before["dropped"],
+                       "timed_out": pool["timed_out"] - pool_before["timed_out"]}
+        row["pool"]["avg_batch"] = round(row["pool"]["frames"] / row["pool"]["batches"], 2) \
+            if row["pool"]["batches"] else 0.0
+    return row
+
+
+def saturated(row, base, args):
+    # Returns reason (str) ya None. base = 1-stream step: usi ke against per-stream rate girna
+    latency = row.get("detect_e2e_p95_ms") or row["latency_p95_ms"]
+    if latency is not None and latency > args.slo_ms:
+        return f"p95 latency {latency:.0f} ms > SLO {args.slo_ms:.0f} ms"
+    if row["fps_mean"] < args.min_fps_ratio * args.fps:
+        return f"per-stream fps {row['fps_mean']:.1f} < {args.min_fps_ratio:.0%} of camera {args.fps:.0f}"
+    if base and base["infer_fps_per_stream"] and \
+            row["infer_fps_per_stream"] < args.min_fps_ratio * base["infer_fps_per_stream"]:
+        return (f"per-stream inference {row['infer_fps_per_stream']:.1f}/s < {args.min_fps_ratio:.0%} "
+                f"of single-stream {base['infer_fps_per_stream']:.1f}/s")
+    return None
+
+
+def ramp(args):
+    # Ek hi process (jaise Streamlit server): model ek baar load, streams threads mein
+    from core.batching import shared_scheduler
+    from core.inference import shared_model
+    from core.warmup import warmup
+
+    model = shared_model(args.weights, args.backend)
+    warmup(args.weights, args.backend)
+    scheduler = None if args.scheduler == "off" else shared_scheduler(model, batch=args.scheduler == "batch")
+    frames = load_frames(args)
+
+    steps, base, saturation = [], None, None
+    for n in args.streams:
+        row = run_step(n, model, scheduler, frames, args)
+        reason = saturated(row, base, args)
+        row["saturated"] = reason
+        base = base or row
+        steps.append(row)
+        _print_row(row)
+        if reason and saturation is None:
+            saturation = n
+            if not args.keep_going:
+                break
+    capacity = max((r["streams"] for r in steps if not r["saturated"]), default=0)
+    return {"steps": steps, "saturation_streams": saturation, "capacity_streams": capacity}
+
+
+def _print_row(r):
+    e2e = r.get("detect_e2e_p95_ms")
+    print(f"{r['streams']:4d} streams  fps/stream {r['fps_mean']:6.2f} (min {r['fps_min']:6.2f})  "
+          f"infer/stream {r['infer_fps_per_stream']:6.2f}/s  p50 {r['latency_p50_ms'] or 0:7.1f}  "
+          f"p95 {r['latency_p95_ms'] or 0:7.1f}  p99 {r['latency_p99_ms'] or 0:7.1f} ms"
+          + (f"  det-e2e p95 {e2e:7.1f} ms" if e2e is not None else "")
+          + f"  cpu {r['cpu_pct']:5.1f}%  rss {r['peak_rss_mb']:.0f} MB  dropped {r['frames_dropped']}"
+          + (f"  <- {r['saturated']}" if r["saturated"] else ""), flush=True)
+
+
+def _streams(spec, max_streams):
+    if spec:
+        return sorted({int(s) for s in spec.split(",") if s.strip()})
+    out, n = [], 1
+    while n <= max_streams:
+        out.append(n)
+        n *= 2
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulated concurrent camera streams: find where latency breaks.")
+    parser.add_argument("--pipeline", default="detection_live", choices=PIPELINES)
+    parser.add_argument("--streams", help="comma list of stream counts (default: 1,2,4,... up to --max-streams)")
+    parser.add_argument("--max-streams", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10, help="measured seconds per step")
+    parser.add_argument("--settle", type=float, default=2, help="unmeasured seconds at the start of each step")
+    parser.add_argument("--fps", type=float, default=15, help="camera rate per stream")
+    parser.add_argument("--slo-ms", type=float, default=250, help="p95 latency budget")
+    parser.add_argument("--min-fps-ratio", type=float, default=0.8,
+                        help="saturated when per-stream rate falls below this fraction")
+    parser.add_argument("--keep-going", action="store_true", help="run all steps even after saturation")
+    parser.add_argument("--scheduler", default="batch", choices=("off", "pool", "batch"),
+                        help="shared inference pool (pages default: batch)")
+    parser.add_argument("--adaptive", action="store_true", help="per-stream adaptive quality, as on the pages")
+    parser.add_argument("--gate", action="store_true", help="per-stream motion gate")
+    parser.add_argument("--night", default="Off", choices=("Off", "Auto", "On"))
+    parser.add_argument("--images", help="folder of images to replay")
+    parser.add_argument("--video", help="recorded video to replay")
+    parser.add_argument("--frames", type=int, default=120, help="frames looped by every stream")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--weights", default=None)
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--out", default=None, help="JSON output path")
+    args = parser.parse_args(argv)
+
+    from core import config
+    args.weights = args.weights or config.WEIGHTS
+    args.backend = args.backend or config.BACKEND
+    args.streams = _streams(args.streams, args.max_streams)
+
+    report = {"meta": {"commit": git_commit(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "python": platform.python_version(), "machine": platform.machine(),
+                       "cpus": os.cpu_count(), "args": vars(args),
+                       "pool": {"workers": config.INFER_WORKERS, "max_pending": config.INFER_MAX_PENDING,
+                                "max_batch": config.BATCH_MAX_SIZE}}}
+
+    # Alag process: parent ki imports/RSS measurement mein na aayein
+    with mp.get_context("spawn").Pool(1) as pool:
+        report.update(pool.apply(ramp, (args,)))
+
+    sat, cap = report["saturation_streams"], report["capacity_streams"]
+    print(f"capacity: {cap} streams" + (f", saturates at {sat}" if sat else " (no saturation in tested range)"))
+    stamp = f"{report['meta']['commit'] or 'local'}-{int(time.time())}"
+    out = args.out or os.path.join("bench_results", f"load-{stamp}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"saved {out}")
+
+
+if __name__ == "__main__":
+    main()
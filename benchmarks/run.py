@@ -0,0 +1,164 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import StageTimer, git_commit, load_frames, peak_rss_mb
+
+PIPELINES = ("measurement", "counter", "detection_live", "speed_tracker")
+
+
+# --- PIPELINES ---
+# Har function page ke processing path ko bina Streamlit/WebRTC ke replay karta hai
+# aur stage-wise timings (StageTimer) bharta hai.
+def bench_measurement(model, frames, timer, args):
+    from core.detections import Detections
+    from core.measurement import measure
+    from core.overlay import renderer
+
+    for img in frames:
+        canvas = img.copy()
+        with timer("total"):
+            with timer("infer"):
+                dets = Detections.from_result(model(img, verbose=False)[0])
+            with timer("measure"):
+                measure(dets, model.names, 0.0264, "cm", img=img)
+            with timer("render"):
+                renderer.boxes(canvas, dets, model.names)
+
+
+def bench_counter(model, frames, timer, args):
+    from core.detections import Detections
+    from core.enhance import NightVision
+    from core.overlay import renderer
+    from core.timeseries import CountStore, class_histogram
+
+    night_vision = NightVision()
+    store = CountStore(len(model.names))
+    for img in frames:
+        with timer("total"):
+            with timer("night_vision"):
+                night_vision.process(img, args.night, bgr=True)
+            with timer("infer"):
+                dets = Detections.from_result(model(img, verbose=False)[0])
+            with timer("count"):
+                store.add(time.time(), class_histogram(dets.cls, len(model.names)))
+            with timer("render"):
+                renderer.boxes(img.copy(), dets, model.names)
+
+
+def bench_detection_live(model, frames, timer, args):
+    from core.live import LiveDetector
+
+    live = LiveDetector(model, night_mode=args.night)
+    interval = 1.0 / args.fps if args.fps else 0
+    next_t = time.perf_counter()
+    for img in frames:
+        with timer("callback"):
+            live.process(img)
+        if interval:
+            # Camera ki rate par frames (warna worker har frame drop karega)
+            next_t += interval
+            time.sleep(max(next_t - time.perf_counter(), 0))
+    time.sleep(live.worker.last_latency * 2 + 0.1)
+    timer.extra = live.worker.stats()
+
+
+def bench_speed_tracker(model, frames, timer, args):
+    from core.radar import VideoProcessor
+
+    proc = VideoProcessor(model, "km/h", 50, 35, night_mode=args.night)
+    fps = args.fps or 30
+    for i, img in enumerate(frames):
+        with timer("recv"):
+            # Video time: 0.15s inference gate real camera jaisa behave kare
+            proc.process(img, t_now=i / fps)
+
+
+BENCHES = {"measurement": bench_measurement, "counter": bench_counter,
+           "detection_live": bench_detection_live, "speed_tracker": bench_speed_tracker}
+
+
+def run_pipeline(name, args):
+    # Alag process mein chalta hai taaki peak RSS sirf isi pipeline ka ho
+    from core.inference import shared_model
+
+    model = shared_model(args.weights, args.backend)
+    frames = load_frames(args)
+    timer = StageTimer()
+    model.predict(frames[0], verbose=False)  # warm-up (weights load + first pass)
+
+    t0 = time.perf_counter()
+    BENCHES[name](model, frames, timer, args)
+    wall = time.perf_counter() - t0
+    return {"frames": len(frames), "wall_s": round(wall, 3), "fps": round(len(frames) / wall, 2),
+            "peak_rss_mb": round(peak_rss_mb(), 1), "stages": timer.summary(), "extra": timer.extra}
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)
+    lines = []
+    for name, res in current["pipelines"].items():
+        base = baseline.get("pipelines", {}).get(name)
+        if not base:
+            continue
+        for stage, s in res["stages"].items():
+            b = base["stages"].get(stage)
+            if b and b["p50_ms"]:
+                delta = (s["p50_ms"] - b["p50_ms"]) / b["p50_ms"] * 100
+                lines.append(f"{name:16s} {stage:14s} p50 {b['p50_ms']:9.2f} -> {s['p50_ms']:9.2f} ms ({delta:+.1f}%)")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark for every page's processing pipeline.")
+    parser.add_argument("--pipelines", default=",".join(PIPELINES), help=f"comma list of {PIPELINES}")
+    parser.add_argument("--images", help="folder of images to replay")
+    parser.add_argument("--video", help="recorded video to replay")
+    parser.add_argument("--frames", type=int, default=200, help="frames per pipeline (synthetic / limit)")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--fps", type=float, default=30, help="camera rate for live pipelines (0 = flat out)")
+    parser.add_argument("--night", default="Off", choices=("Off", "Auto", "On"))
+    parser.add_argument("--weights", default=None)
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--out", default=None, help="JSON output path")
+    parser.add_argument("--compare", help="baseline JSON to diff against")
+    args = parser.parse_args(argv)
+
+    from core import config
+    args.weights = args.weights or config.WEIGHTS
+    args.backend = args.backend or config.BACKEND
+
+    report = {"meta": {"commit": git_commit(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "python": platform.python_version(), "machine": platform.machine(),
+                       "cpus": os.cpu_count(), "args": vars(args)},
+              "pipelines": {}}
+
+    ctx = mp.get_context("spawn")
+    for name in args.pipelines.split(","):
+        name = name.strip()
+        with ctx.Pool(1) as pool:
+            res = pool.apply(run_pipeline, (name, args))
+        report["pipelines"][name] = res
+        print(f"{name:16s} {res['fps']:8.2f} fps  peak RSS {res['peak_rss_mb']:.0f} MB")
+        for stage, s in res["stages"].items():
+            print(f"  {stage:14s} p50 {s['p50_ms']:8.2f}  p95 {s['p95_ms']:8.2f}  p99 {s['p99_ms']:8.2f} ms")
+
+    out = args.out or os.path.join("bench_results", f"{report['meta']['commit'] or 'local'}-{int(time.time())}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"saved {out}")
+    if args.compare:
+        print(compare(report, args.compare))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# --- ADAPTIVE QUALITY CONTROLLER ---
+# Har inference ki latency (EWMA) dekh ke operating point adjust karta hai:
+#   * imgsz: latency target se upar -> ek step chhota; agla bada step bhi budget mein fit ho -> ek step bada
+#   * interval: inference ke beech ka gap, taaki detector CPU ka `max_duty` hissa hi le
+#     (interval >= latency / max_duty), bounds ke andar.
+# Kamzor machine chhote imgsz + lambe interval par settle hoti hai, strong machine best accuracy par.
+# `sizes` diye hon (ONNX/OpenVINO exports, dekho SharedModel.sizes) to imgsz `step` ki jagah sirf
+# inhi sizes ki ladder par chalta hai, taaki har naya size naya export na maange.
+class AdaptiveController:
+    def __init__(self, target_ms=120, imgsz=320, imgsz_bounds=(160, 640), interval_bounds=(0.0, 0.5),
+                 max_duty=0.7, step=32, alpha=0.3, cooldown=5, metrics=None, sizes=None):
+        self.target_ms = target_ms
+        self.imgsz_bounds = imgsz_bounds
+        self.sizes = None
+        if sizes:
+            lo, hi = imgsz_bounds
+            self.sizes = sorted(s for s in sizes if lo <= s <= hi) or [min(sizes, key=lambda s: abs(s - imgsz))]
+            imgsz = min(self.sizes, key=lambda s: abs(s - imgsz))
+        self.imgsz = imgsz
+        self.interval_bounds = interval_bounds
+        self.interval = interval_bounds[0]
+        self.max_duty = max_duty
+        self.step = step
+        self.alpha = alpha
+        self.cooldown = cooldown
+        self.metrics = metrics
+        self.latency_ms = None
+        self._since_change = 0
+
+    def observe(self, latency_s):
+        ms = latency_s * 1000
+        self.latency_ms = ms if self.latency_ms is None else self.alpha * ms + (1 - self.alpha) * self.latency_ms
+        self._since_change += 1
+
+        # imgsz change ke baad kuch samples settle hone do (warna oscillate karega)
+        if self._since_change >= self.cooldown:
+            smaller, bigger = self._neighbours()
+            if self.latency_ms > self.target_ms * 1.1 and smaller is not None:
+                self._resize(smaller, ms)
+            elif bigger is not None:
+                # Bada size tabhi jab predicted latency bhi target ke 90% ke andar rahe (hysteresis)
+                if self.latency_ms * (bigger / self.imgsz) ** 2 < self.target_ms * 0.9:
+                    self._resize(bigger, ms)
+
+        lo, hi = self.interval_bounds
+        self.interval = min(max(self.latency_ms / 1000 / self.max_duty, lo), hi)
+
+        if self.metrics is not None:
+            self.metrics.gauge("imgsz", self.imgsz)
+            self.metrics.gauge("interval_ms", round(self.interval * 1000, 1))
+            self.metrics.gauge("latency_ewma_ms", round(self.latency_ms, 1))
+
+    def _neighbours(self):
+        # (ek step chhota, ek step bada) imgsz; bound par None
+        if self.sizes is not None:
+            i = self.sizes.index(self.imgsz)
+            return (self.sizes[i - 1] if i > 0 else None,
+                    self.sizes[i + 1] if i + 1 < len(self.sizes) else None)
+        lo, hi = self.imgsz_bounds
+        return (max(self.imgsz - self.step, lo) if self.imgsz > lo else None,
+                min(self.imgsz + self.step, hi) if self.imgsz < hi else None)
+
+    def _resize(self, imgsz, last_ms):
+        # Latency roughly pixels (imgsz²) ke saath scale hoti hai: EWMA ko naye size ke hisaab se re-seed
+        self.latency_ms = last_ms * (imgsz / self.imgsz) ** 2
+        self.imgsz = imgsz
+        self._since_change = 0
+
+    def state(self):
+        return {"imgsz": self.imgsz, "interval_ms": round(self.interval * 1000, 1),
+                "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+                "target_ms": self.target_ms}
@@ -0,0 +1,136 @@
+import glob
+import os
+import shutil
+import threading
+
+import cv2
+import numpy as np
+
+from core import config
+
+
+# --- CPU INFERENCE BACKENDS ---
+# Backend naam: "torch" (default), "onnx", "openvino", aur unke INT8 variants
+# "onnx-int8" / "openvino-int8". Har export ek imgsz ke liye hota hai (INT8 calibration bhi
+# usi size par), isliye har (weights, backend, imgsz) ek baar export hokar `.cache/models`
+# mein rakha jaata hai aur agli baar seedha wahi load hota hai. INT8 ko local calibration images chahiye
+# (AIV_CALIB_DIR); woh na hon to export fail hota hai aur registry torch par fall back karti hai.
+BACKENDS = ("torch", "onnx", "onnx-int8", "openvino", "openvino-int8")
+
+_export_lock = threading.Lock()
+
+
+def parse(backend):
+    # "openvino-int8" -> ("openvino", True)
+    fmt, _, precision = backend.partition("-")
+    if fmt not in ("torch", "onnx", "openvino") or precision not in ("", "int8") or backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    return fmt, precision == "int8"
+
+
+def snap_imgsz(imgsz, sizes=config.EXPORT_IMGSZ):
+    # Export sirf in sizes par hote hain: request ko sabse chhote >= export size par le jao
+    sizes = sorted(sizes)
+    for s in sizes:
+        if s >= imgsz:
+            return s
+    return sizes[-1]
+
+
+def artifact_path(weights, backend, imgsz, directory=None):
+    directory = directory or os.path.join(config.CACHE_DIR, "models")
+    stem = os.path.splitext(os.path.basename(weights))[0]
+    fmt, _ = parse(backend)
+    name = f"{stem}_{imgsz}_{backend.replace('-', '_')}"
+    # Ultralytics OpenVINO models ko "*_openvino_model" folder naam se pehchanta hai
+    return os.path.join(directory, name + (".onnx" if fmt == "onnx" else "_openvino_model"))
+
+
+def ensure_exported(weights, backend, imgsz, calib_dir=config.CALIB_DIR):
+    """Cached artifact ka path; pehli baar export (+ INT8 calibration) karta hai."""
+    fmt, int8 = parse(backend)
+    if fmt == "torch":
+        return weights
+    out = artifact_path(weights, backend, imgsz)
+    if os.path.exists(out):
+        return out
+    # Ek process mein ek hi export ek waqt par (CPU/RAM heavy)
+    with _export_lock:
+        if os.path.exists(out):
+            return out
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        fp32 = artifact_path(weights, fmt, imgsz)
+        if not os.path.exists(fp32):
+            _export_fp32(weights, fmt, imgsz, fp32)
+        if int8:
+            calib = list(calibration_batches(calib_dir, imgsz))
+            if not calib:
+                raise ValueError(f"INT8 export needs calibration images in {calib_dir!r}")
+            (_quantize_onnx if fmt == "onnx" else _quantize_openvino)(fp32, out, calib)
+    return out
+
+
+def _export_fp32(weights, fmt, imgsz, out):
+    from ultralytics import YOLO
+    # dynamic=True: batch dimension free rahe (BatchScheduler list of frames bhejta hai); calibration
+    # aur cache phir bhi is imgsz ke liye hain
+    exported = YOLO(weights).export(format=fmt, imgsz=imgsz, dynamic=True, half=False, verbose=False)
+    tmp = f"{out}.{os.getpid()}.tmp"
+    shutil.move(str(exported), tmp)
+    os.replace(tmp, out)
+
+
+def calibration_batches(directory, imgsz, limit=config.CALIB_IMAGES):
+    # Ultralytics jaisa preprocessing: letterbox (114 gray) -> RGB -> [0,1] float -> NCHW
+    paths = sorted(p for ext in ("jpg", "jpeg", "png", "bmp") for p in glob.glob(os.path.join(directory, f"*.{ext}")))
+    for p in paths[:limit]:
+        img = cv2.imread(p)
+        if img is None:
+            continue
+        h, w = img.shape[:2]
+        r = imgsz / max(h, w)
+        nh, nw = round(h * r), round(w * r)
+        canvas = np.full((imgsz, imgsz, 3), 114, np.uint8)
+        top, left = (imgsz - nh) // 2, (imgsz - nw) // 2
+        canvas[top:top + nh, left:left + nw] = cv2.resize(img, (nw, nh), interpolation=cv2.INTER_LINEAR)
+        yield np.ascontiguousarray(canvas[..., ::-1].transpose(2, 0, 1)[None], dtype=np.float32) / 255
+
+
+def _quantize_onnx(src, out, calib):
+    import onnx
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    class Reader(CalibrationDataReader):
+        def __init__(self, name):
+            self.it = iter({name: x} for x in calib)
+
+        def get_next(self):
+            return next(self.it, None)
+
+    fp32 = onnx.load(src)
+    tmp = f"{out}.{os.getpid()}.tmp"
+    quantize_static(src, tmp, Reader(fp32.graph.input[0].name), quant_format=QuantFormat.QDQ,
+                    per_channel=True, activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    # Ultralytics names/stride/imgsz ONNX metadata se padhta hai: fp32 model se copy
+    q = onnx.load(tmp)
+    del q.metadata_props[:]
+    q.metadata_props.extend(fp32.metadata_props)
+    onnx.save(q, tmp)
+    os.replace(tmp, out)
+
+
+def _quantize_openvino(src, out, calib):
+    import nncf
+    import openvino as ov
+
+    xml = glob.glob(os.path.join(src, "*.xml"))[0]
+    model = ov.Core().read_model(xml)
+    quantized = nncf.quantize(model, nncf.Dataset(calib), preset=nncf.QuantizationPreset.MIXED,
+                              subset_size=len(calib))
+    tmp = f"{out}.{os.getpid()}.tmp"
+    os.makedirs(tmp, exist_ok=True)
+    ov.save_model(quantized, os.path.join(tmp, os.path.basename(xml)))
+    # metadata.yaml (names, stride, imgsz) ke bina ultralytics folder load nahi karta
+    for meta in glob.glob(os.path.join(src, "*.yaml")):
+        shutil.copy(meta, tmp)
+    os.replace(tmp, out)
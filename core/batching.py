@@ -0,0 +1,175 @@
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from core import config
+from core.detections import Detections
+from core.metrics import get_metrics
+
+
+# --- CROSS-SESSION MICRO-BATCHING ---
+# Har WebRTC session apna frame yahan submit karta hai aur Future par wait karta hai. Worker
+# threads `max_wait` seconds tak (ya `max_batch` frames hone tak) requests jama karte hain,
+# phir same imgsz wale frames ek hi forward pass mein chalte hain. CPU par ek batch of N, N
+# alag calls se sasta padta hai, isliye streams badhne par aggregate FPS behtar scale karta
+# hai. Batch sabse kam conf par chalta hai; har request ka apna conf baad mein NumPy filter se.
+#
+# Pool fixed size ka hai (`workers` threads, har ek ki apni model copy registry tag se, kyunki
+# ek copy ka forward pass serialize hota hai) aur queue bounded: `max_pending` frames pehle se
+# ho to naya frame turant `Overloaded` ke saath reject hota hai (drop counter badhta hai),
+# aur `infer` result ka `timeout` se zyada wait nahi karta. Cameras badhne par latency bounded
+# rehti hai, frames girte hain.
+class Overloaded(RuntimeError):
+    """Pool ki queue full hai (ya result time par nahi aaya): frame drop karo, baad wala bhejo."""
+
+
+def worker_tag(slot):
+    # Pehla worker default copy use karta hai (Measurement/Detection pages wali), baaki apni
+    return None if slot == 0 else f"pool-{slot}"
+
+
+class _Request:
+    __slots__ = ("img", "conf", "imgsz", "future", "t")
+
+    def __init__(self, img, conf, imgsz):
+        self.img = img
+        self.conf = conf
+        self.imgsz = imgsz
+        self.future = Future()
+        self.t = time.monotonic()
+
+
+class BatchScheduler:
+    def __init__(self, model, max_batch=config.BATCH_MAX_SIZE, max_wait=config.BATCH_MAX_WAIT,
+                 workers=config.INFER_WORKERS, max_pending=config.INFER_MAX_PENDING,
+                 timeout=config.INFER_TIMEOUT, idle_timeout=10.0, metrics=None):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.metrics = metrics or get_metrics("batching")
+        self._cond = threading.Condition()
+        self._queue = []
+        self._threads = {}   # slot -> thread
+        self.batches = 0
+        self.frames = 0
+        self.dropped = 0
+        self.timed_out = 0
+
+    def submit(self, img, conf=0.25, imgsz=640):
+        # Exported backends par 300 aur 320 dono 320 par chalte hain: ek hi group
+        req = _Request(img, conf, self.model.snap(imgsz))
+        with self._cond:
+            if len(self._queue) >= self.max_pending:
+                self.dropped += 1
+                self.metrics.inc("frames_dropped")
+                raise Overloaded(f"{len(self._queue)} frames pending")
+            self._queue.append(req)
+            self._start_workers()
+            self._cond.notify()
+        return req.future
+
+    def infer(self, img, conf=0.25, imgsz=640, timeout=None):
+        # Blocking shortcut: caller ke thread (WebRTC callback / live worker) se use hota hai
+        future = self.submit(img, conf, imgsz)
+        try:
+            return future.result(timeout or self.timeout)
+        except FutureTimeout:
+            # Queue mein pada ho to worker ise skip karega; chal raha ho to result bas phenk diya jaata hai
+            future.cancel()
+            with self._cond:
+                self.timed_out += 1
+            self.metrics.inc("frames_timed_out")
+            raise Overloaded("result timed out") from None
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._queue)
+            workers = len(self._threads)
+        return {"batches": self.batches, "frames": self.frames, "pending": pending, "workers": workers,
+                "dropped": self.dropped, "timed_out": self.timed_out,
+                "avg_batch": round(self.frames / self.batches, 2) if self.batches else 0.0}
+
+    def _start_workers(self):
+        # _cond ke andar se: idle hokar band hue workers ko dobara chalao
+        for slot in range(self.workers):
+            if slot not in self._threads:
+                t = self._threads[slot] = threading.Thread(target=self._run, args=(slot,),
+                                                           name=f"infer-pool-{slot}", daemon=True)
+                t.start()
+
+    def _collect(self, slot):
+        with self._cond:
+            while True:
+                if not self._cond.wait_for(lambda: self._queue, self.idle_timeout):
+                    # Koi stream nahi: worker khatam, agla submit naya start karega
+                    del self._threads[slot]
+                    return None
+                # Pehli request ke aane se max_wait tak aur frames ka intezaar
+                deadline = self._queue[0].t + self.max_wait
+                while self._queue and len(self._queue) < self.max_batch:
+                    rest = deadline - time.monotonic()
+                    if rest <= 0:
+                        break
+                    self._cond.wait(rest)
+                batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+                # Timeout par cancel hue requests skip (dusra worker bhi inhe le chuka ho sakta hai)
+                batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+                if batch:
+                    return batch
+
+    def _run(self, slot):
+        tag = worker_tag(slot)
+        while True:
+            batch = self._collect(slot)
+            if batch is None:
+                return
+            groups = {}
+            for req in batch:
+                groups.setdefault(req.imgsz, []).append(req)
+            for imgsz, reqs in groups.items():
+                self._infer_group(imgsz, reqs, tag)
+
+    def _infer_group(self, imgsz, reqs, tag=None):
+        m = self.metrics
+        floor = min(r.conf for r in reqs)
+        t0 = time.perf_counter()
+        # Predict ya post-processing kuch bhi fail ho: error callers tak jaaye, worker thread zinda rahe
+        # (marta to slot `_threads` mein registered rehta aur pool hamesha ke liye chhota ho jaata)
+        try:
+            results = self.model.predict([r.img for r in reqs], tag=tag, conf=floor, imgsz=imgsz, verbose=False)
+            m.observe("batch_infer", time.perf_counter() - t0)
+            now = time.monotonic()
+            for r, res in zip(reqs, results):
+                m.observe("queue_wait", now - r.t)
+                dets = Detections.from_result(res)
+                r.future.set_result(dets.filter(r.conf) if r.conf > floor else dets)
+        except Exception as e:
+            for r in reqs:
+                if not r.future.done():
+                    r.future.set_exception(e)
+            return
+        with self._cond:
+            self.batches += 1
+            self.frames += len(reqs)
+        m.inc("batches")
+        m.inc("frames_batched", len(reqs))
+        m.gauge("batch_size", len(reqs))
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def shared_scheduler(model, batch=True):
+    # Process mein har model ke liye ek pool: saare sessions ke frames yahin milte hain.
+    # batch=False: pool aur backpressure wahi, lekin har forward pass mein ek hi frame
+    key = (model.weights, model.backend, model.imgsz, batch)
+    with _schedulers_lock:
+        sched = _schedulers.get(key)
+        if sched is None:
+            sched = _schedulers[key] = BatchScheduler(model, max_batch=config.BATCH_MAX_SIZE if batch else 1)
+        return sched
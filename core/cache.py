@@ -0,0 +1,144 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from core import config
+from core.detections import Detections
+
+
+# --- DETECTION CACHE ---
+# Streamlit har widget change par poora script dobara chalata hai. Same photo + same
+# model settings ke liye YOLO dobara chalane ki zarurat nahi: raw detections image ke
+# content hash se cache hote hain, sirf sasta downstream kaam (units, metrics, counts) repeat hota hai.
+def content_key(data, *params):
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(data, np.ndarray):
+        h.update(repr((data.shape, data.dtype.str)).encode())
+        data = np.ascontiguousarray(data)
+    h.update(memoryview(data))
+    h.update(repr(params).encode())
+    return h.hexdigest()
+
+
+class InferenceCache:
+    def __init__(self, maxsize=128, disk_dir=None, max_bytes=256 * 2**20):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        # Disk files ka LRU index (key -> bytes), purane pehle; har put par directory scan nahi karna padta
+        self._files = OrderedDict()
+        self.disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._scan()
+
+    def _scan(self):
+        # Pichhle runs ki files mtime order mein (get hit par mtime bump hota hai, to yahi LRU order hai)
+        found = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".tmp.npz") or not entry.name.endswith(".npz"):
+                continue
+            st = entry.stat()
+            found.append((st.st_mtime, entry.name[:-4], st.st_size))
+        for _, key, size in sorted(found):
+            self._files[key] = size
+            self.disk_bytes += size
+        with self._lock:
+            self._prune()
+
+    def _prune(self):
+        # Lock ke andar call hota hai. Dusra process file pehle hi hata chuka ho to bhi theek.
+        while self.disk_bytes > self.max_bytes and self._files:
+            key, size = self._files.popitem(last=False)
+            self.disk_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.npz")
+
+    def get(self, key):
+        with self._lock:
+            dets = self._items.get(key)
+            if dets is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return dets
+        if self.disk_dir and os.path.exists(self._path(key)):
+            try:
+                with np.load(self._path(key)) as z:
+                    segments = None
+                    if "seg_xy" in z:
+                        segments = np.split(z["seg_xy"], z["seg_offsets"][1:-1])
+                    dets = Detections(z["xyxy"], z["conf"], z["cls"], z["ids"] if "ids" in z else None, segments)
+                # mtime = last use, taaki restart ke baad bhi scan LRU order de
+                os.utime(self._path(key))
+            except FileNotFoundError:
+                dets = None   # beech mein prune ho gayi: miss
+            if dets is not None:
+                self._remember(key, dets)
+                with self._lock:
+                    if key in self._files:
+                        self._files.move_to_end(key)
+                    self.hits += 1
+                return dets
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, dets):
+        self._remember(key, dets)
+        if self.disk_dir:
+            arrays = {"xyxy": dets.xyxy, "conf": dets.conf, "cls": dets.cls}
+            if dets.ids is not None:
+                arrays["ids"] = dets.ids
+            if dets.segments is not None:
+                # Polygons alag lengths ke: ek flat array + offsets
+                arrays["seg_offsets"] = np.cumsum([0] + [len(p) for p in dets.segments])
+                arrays["seg_xy"] = (np.concatenate(dets.segments) if dets.segments
+                                    else np.zeros((0, 2), np.float32))
+            tmp = self._path(key) + ".tmp.npz"
+            np.savez(tmp, **arrays)
+            os.replace(tmp, self._path(key))
+            size = os.path.getsize(self._path(key))
+            with self._lock:
+                self.disk_bytes += size - self._files.pop(key, 0)
+                self._files[key] = size
+                self._prune()
+
+    def _remember(self, key, dets):
+        with self._lock:
+            self._items[key] = dets
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get_or_run(self, key, run):
+        # Returns (detections, hit)
+        dets = self.get(key)
+        if dets is not None:
+            return dets, True
+        dets = run()
+        self.put(key, dets)
+        return dets, False
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._items),
+                "disk_entries": len(self._files), "disk_bytes": self.disk_bytes,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0}
+
+
+inference_cache = InferenceCache(
+    config.DETECTION_CACHE_SIZE,
+    os.path.join(config.CACHE_DIR, "detections") if config.DETECTION_CACHE_DISK else None,
+    int(config.DETECTION_CACHE_DISK_MB * 2**20))
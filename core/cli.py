@@ -0,0 +1,232 @@
+import argparse
+import csv
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+_DONE = object()
+UNIT_FACTOR = {"km/h": 3.6, "m/s": 1, "cm/s": 100}
+
+
+# --- PIPELINED VIDEO CHAIN ---
+# decode thread -> (bounded queue) -> process (main thread) -> (bounded queue) -> writer thread.
+# Decode aur encode GIL chhodte hain, isliye inference ke saath overlap hote hain.
+# Koi bhi stage fail ho to `stop` set hota hai; baaki stages queues par timeout ke saath wait karte
+# hain aur stop dekh kar nikal jaate hain, isliye full queue par join kabhi atakta nahi.
+def _put(q, item, stop, timeout=0.1):
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=timeout)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(q, stop, timeout=0.1):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=timeout)
+        except queue.Empty:
+            pass
+    return _DONE
+
+
+def _decoder(cap, out_q, stop, errors):
+    try:
+        while not stop.is_set():
+            ok, frame = cap.read()
+            if not ok or not _put(out_q, frame, stop):
+                break
+    except Exception as e:
+        errors.append(e)
+        stop.set()
+    finally:
+        _put(out_q, _DONE, stop)
+
+
+def _writer(writer, in_q, stop, errors):
+    try:
+        while True:
+            frame = _get(in_q, stop)
+            if frame is _DONE:
+                break
+            writer.write(frame)
+    except Exception as e:
+        errors.append(e)
+        stop.set()
+
+
+def _run_chain(path, process, out_video, queue_size=8):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"cannot open {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    w, h = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    stop = threading.Event()
+    errors = []
+    frames_q = queue.Queue(queue_size)
+    decoder = threading.Thread(target=_decoder, args=(cap, frames_q, stop, errors), daemon=True)
+    decoder.start()
+
+    writer, write_q, writer_t = None, None, None
+    if out_video:
+        writer = cv2.VideoWriter(out_video, cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h))
+        write_q = queue.Queue(queue_size)
+        writer_t = threading.Thread(target=_writer, args=(writer, write_q, stop, errors), daemon=True)
+        writer_t.start()
+
+    n = 0
+    try:
+        while True:
+            frame = _get(frames_q, stop)
+            if frame is _DONE:
+                break
+            # Video time (frame index / fps): speeds file ki real timing se nikalti hain
+            annotated = process(frame, n / fps)
+            if write_q is not None and not _put(write_q, annotated, stop):
+                break
+            n += 1
+        if write_q is not None:
+            _put(write_q, _DONE, stop)
+    except BaseException:
+        # process() fail: decoder/writer ko band karo, warna woh full queue par hamesha block rehte
+        stop.set()
+        raise
+    finally:
+        if writer_t is not None:
+            writer_t.join()
+            writer.release()
+        decoder.join()
+        cap.release()
+    if errors:
+        raise errors[0]
+    return n, fps
+
+
+# --- JOBS (ek process = ek file) ---
+def _init_worker(threads):
+    # Har process ko cores ka hissa; warna N processes x all-core torch threads oversubscribe karte hain
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _stem(path, out_dir, suffix):
+    return os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + suffix)
+
+
+def speed_job(path, args):
+    from core.inference import shared_model
+    from core.radar import VideoProcessor
+    from core.speedlog import SpeedLog
+
+    model = shared_model(args.weights, args.backend)
+    t0 = time.perf_counter()
+    samples = _stem(path, args.out, "_speed.csv")
+    for p in (samples, _stem(path, args.out, "_speed_events.csv")):
+        # SpeedLog append karta hai: purane run ki file hatao
+        if os.path.exists(p):
+            os.remove(p)
+    limit = args.limit / UNIT_FACTOR[args.unit] if args.limit else None
+    log = SpeedLog(samples, names=model.names, limit_mps=limit)
+    proc = VideoProcessor(model, args.unit, args.grid, args.ppm, night_mode=args.night,
+                          interval=args.interval, sink=log.record)
+    out_video = None if args.no_video else _stem(path, args.out, "_annotated.mp4")
+    try:
+        n, fps = _run_chain(path, lambda frame, t: proc.process(frame, t_now=t), out_video)
+    finally:
+        log.close()
+    summary = log.summary()
+    with open(_stem(path, args.out, "_speed_summary.csv"), "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(summary[0]) if summary else ["track_id"])
+        writer.writeheader()
+        writer.writerows(summary)
+    return {"file": path, "frames": n, "seconds": round(time.perf_counter() - t0, 2)}
+
+
+def count_job(path, args):
+    from core.counting import CountingProcessor, LineZone, PolygonZone
+    from core.inference import shared_model
+
+    model = shared_model(args.weights, args.backend)
+    pts = [tuple(map(float, p.split(","))) for p in args.zone.split(";") if p.strip()]
+
+    def zone_fn(w, h):
+        scaled = [(x * w, y * h) for x, y in pts]
+        return LineZone(*scaled) if len(scaled) == 2 else PolygonZone(scaled)
+
+    proc = CountingProcessor(model, zone_fn, imgsz=args.imgsz, night_mode=args.night)
+    t0 = time.perf_counter()
+    out_video = None if args.no_video else _stem(path, args.out, "_annotated.mp4")
+    n, fps = _run_chain(path, proc.process, out_video)
+    with open(_stem(path, args.out, "_counts.csv"), "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=["Object", "In", "Out"])
+        writer.writeheader()
+        writer.writerows(proc.summary())
+    return {"file": path, "frames": n, "seconds": round(time.perf_counter() - t0, 2)}
+
+
+JOBS = {"speed": speed_job, "count": count_job}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m core.cli",
+        description="Offline speed tracking / line counting over recorded video files.")
+    parser.add_argument("mode", choices=sorted(JOBS))
+    parser.add_argument("videos", nargs="+")
+    parser.add_argument("--out", default="cli_output", help="output folder")
+    parser.add_argument("--workers", type=int, default=max((os.cpu_count() or 2) // 2, 1),
+                        help="files processed in parallel (one process each)")
+    parser.add_argument("--weights", default=None)
+    parser.add_argument("--backend", default=None, help="torch, onnx, onnx-int8, openvino, openvino-int8")
+    parser.add_argument("--no-video", action="store_true", help="skip annotated video output")
+    parser.add_argument("--night", default="Off", choices=("Off", "Auto", "On"))
+    # speed mode
+    parser.add_argument("--unit", default="km/h", choices=("km/h", "m/s", "cm/s"))
+    parser.add_argument("--ppm", type=float, default=35, help="pixels per metre")
+    parser.add_argument("--grid", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.15, help="seconds between inferences")
+    parser.add_argument("--limit", type=float, default=None, help="speed limit in --unit (over-limit events)")
+    # count mode
+    parser.add_argument("--zone", default="0,0.5;1,0.5",
+                        help="relative points 'x,y;x,y' (2 = line, 3+ = polygon)")
+    parser.add_argument("--imgsz", type=int, default=640)
+    args = parser.parse_args(argv)
+
+    from core import config
+    args.weights = args.weights or config.WEIGHTS
+    args.backend = args.backend or config.BACKEND
+    os.makedirs(args.out, exist_ok=True)
+    # Files se zyada processes bekaar: ek file par saare cores usi ek process ke torch threads ko
+    workers = max(1, min(args.workers, len(args.videos)))
+    threads = max((os.cpu_count() or 1) // workers, 1)
+
+    t0 = time.perf_counter()
+    total_frames = 0
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = {pool.submit(JOBS[args.mode], path, args): path for path in args.videos}
+        for fut in as_completed(futures):
+            try:
+                res = fut.result()
+            except Exception as e:
+                print(f"FAILED {futures[fut]}: {e}", file=sys.stderr)
+                continue
+            total_frames += res["frames"]
+            print(f"{res['file']}: {res['frames']} frames in {res['seconds']}s "
+                  f"({res['frames'] / max(res['seconds'], 1e-6):.1f} fps)")
+    wall = time.perf_counter() - t0
+    print(f"done: {len(args.videos)} files, {total_frames} frames, {total_frames / wall:.1f} fps aggregate")
+
+
+if __name__ == "__main__":
+    main()
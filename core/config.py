@@ -0,0 +1,55 @@
+import os
+
+# --- SHARED RUNTIME SETTINGS ---
+# Sab pages yahi defaults use karte hain; deployment env vars se override kar sakti hai.
+WEIGHTS = os.environ.get("AIV_WEIGHTS", "yolov8n.pt")
+BACKEND = os.environ.get("AIV_BACKEND", "torch")
+
+# Idle models (koi page use nahi kar raha) itne seconds baad memory se hata diye jaate hain
+MODEL_IDLE_TTL = float(os.environ.get("AIV_MODEL_IDLE_TTL", "900"))
+
+# Local artifacts (detection cache, exports, logs) isi folder mein jaate hain
+CACHE_DIR = os.environ.get("AIV_CACHE_DIR", ".cache")
+
+# Detection cache: kitni images RAM mein, aur kya disk par bhi persist karna hai
+DETECTION_CACHE_SIZE = int(os.environ.get("AIV_DETECTION_CACHE_SIZE", "128"))
+DETECTION_CACHE_DISK = os.environ.get("AIV_DETECTION_CACHE_DISK", "0") == "1"
+# Disk layer ka size budget: isse bada ho to sabse purani (least recently used) files delete
+DETECTION_CACHE_DISK_MB = float(os.environ.get("AIV_DETECTION_CACHE_DISK_MB", "256"))
+
+# Measurement batch mode: server folder sirf is root ke andar se padha ja sakta hai (unset = sirf uploads)
+BATCH_ROOT = os.environ.get("AIV_BATCH_ROOT")
+
+# Metrics: agar set ho to Prometheus textfile (node_exporter collector ke liye) har N sec likhi jaati hai
+METRICS_FILE = os.environ.get("AIV_METRICS_FILE")
+METRICS_INTERVAL = float(os.environ.get("AIV_METRICS_INTERVAL", "15"))
+
+# Adaptive live quality: imgsz in bounds ke beech hi move karta hai
+IMGSZ_MIN = int(os.environ.get("AIV_IMGSZ_MIN", "160"))
+IMGSZ_MAX = int(os.environ.get("AIV_IMGSZ_MAX", "640"))
+
+# Cross-session micro-batching: ek batch mein max kitne frames, aur pehle frame ke baad max kitna wait
+BATCH_MAX_SIZE = int(os.environ.get("AIV_BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT = float(os.environ.get("AIV_BATCH_MAX_WAIT_MS", "15")) / 1000
+# Live inference pool: itne worker threads (har ek ki apni model copy), queue mein max itne frames
+# (usse zyada aaye to frame drop, queue nahi badhti), aur ek frame ke result ka max wait
+INFER_WORKERS = int(os.environ.get("AIV_INFER_WORKERS", "2"))
+INFER_MAX_PENDING = int(os.environ.get("AIV_INFER_MAX_PENDING", "16"))
+INFER_TIMEOUT = float(os.environ.get("AIV_INFER_TIMEOUT_MS", "1000")) / 1000
+
+# Cold start: server boot par detector background mein load + har imgsz par ek dummy inference
+WARMUP = os.environ.get("AIV_WARMUP", "1") == "1"
+WARMUP_IMGSZ = tuple(int(s) for s in os.environ.get("AIV_WARMUP_IMGSZ", "256,320,480,640").split(",") if s.strip())
+WARMUP_POOL = os.environ.get("AIV_WARMUP_POOL", "1") == "1"
+
+# ONNX/OpenVINO exports fixed-shape hote hain: in sizes par hi export hota hai, baaki requests inpar snap hoti hain
+EXPORT_IMGSZ = tuple(int(s) for s in os.environ.get("AIV_EXPORT_IMGSZ", "256,320,480,640").split(",") if s.strip())
+# INT8 quantization ke liye local calibration images (jitni hon, max itni)
+CALIB_DIR = os.environ.get("AIV_CALIB_DIR", os.path.join(CACHE_DIR, "calib"))
+CALIB_IMAGES = int(os.environ.get("AIV_CALIB_IMAGES", "64"))
+
+# Mood module: face attributes (age/gender/emotion) ka model ("deepface", ya tests/CPU-light ke liye "stub"),
+# ek face track ko kitne seconds baad dobara analyse karna hai, aur optional apna recommendations catalog (JSON)
+MOOD_MODEL = os.environ.get("AIV_MOOD_MODEL", "deepface")
+MOOD_REFRESH = float(os.environ.get("AIV_MOOD_REFRESH", "5"))
+MOOD_CATALOG = os.environ.get("AIV_MOOD_CATALOG")
@@ -0,0 +1,194 @@
+import time
+
+import cv2
+import numpy as np
+
+from core.batching import Overloaded
+from core.detections import Detections
+from core.enhance import NightVision
+from core.live import to_video_frame
+from core.metrics import get_metrics
+from core.overlay import renderer
+from core.tracks import SessionTracker, TrackTable
+
+
+# --- COUNTING ZONES ---
+# Dono zones ek hi sawaal ka jawab dete hain: har point ka signed distance (px).
+# Line: A->B chalte hue right-hand side positive (image coords, y neeche; left->right line ke neeche).
+# Polygon: andar positive, bahar negative.
+class LineZone:
+    def __init__(self, a, b):
+        self.a = np.asarray(a, np.float32)
+        self.b = np.asarray(b, np.float32)
+        d = self.b - self.a
+        self._normal = np.array([-d[1], d[0]], np.float32) / max(float(np.hypot(*d)), 1e-6)
+
+    def signed_distance(self, pts):
+        return (pts - self.a) @ self._normal
+
+    def crosses(self, p, q):
+        # Segment p->q (har track ka) line segment A-B ko kaat raha hai? (vectorized orientation test)
+        a, b = self.a, self.b
+
+        def orient(u, v, w):
+            return (v[..., 0] - u[..., 0]) * (w[..., 1] - u[..., 1]) - (v[..., 1] - u[..., 1]) * (w[..., 0] - u[..., 0])
+
+        return (np.sign(orient(a, b, p)) != np.sign(orient(a, b, q))) & \
+               (np.sign(orient(p, q, a)) != np.sign(orient(p, q, b)))
+
+    def polyline(self):
+        return np.stack([self.a, self.b]).astype(np.int32)
+
+
+class PolygonZone:
+    def __init__(self, points):
+        self.points = np.asarray(points, np.float32)
+        self._a = self.points
+        self._b = np.roll(self.points, -1, axis=0)
+
+    def signed_distance(self, pts):
+        # (N points x M edges) — M chhota constant hai, isliye per-track cost O(1)
+        p = pts[:, None, :]
+        a, b = self._a[None], self._b[None]
+        ab = b - a
+        t = np.clip(((p - a) * ab).sum(-1) / np.maximum((ab * ab).sum(-1), 1e-6), 0, 1)
+        dist = np.hypot(*(p - (a + t[..., None] * ab)).transpose(2, 0, 1)).min(axis=1)
+        # Ray casting: kitni edges point ke right se guzarti hain
+        ay, by, ax, bx = a[..., 1], b[..., 1], a[..., 0], b[..., 0]
+        py, px = p[..., 1], p[..., 0]
+        straddle = (ay > py) != (by > py)
+        x_cross = ax + (py - ay) * (bx - ax) / np.where(by == ay, 1e-6, by - ay)
+        inside = (straddle & (px < x_cross)).sum(axis=1) % 2 == 1
+        return np.where(inside, dist, -dist)
+
+    def crosses(self, p, q):
+        return np.ones(len(p), bool)
+
+    def polyline(self):
+        return self.points.astype(np.int32)
+
+
+# --- CROSSING COUNTER ---
+# Har track ka ek "committed side" hota hai jo sirf tab badalta hai jab centroid zone se
+# `deadband` px se zyada door ho. Line ke paas jitter karta track isliye double count nahi hota.
+# Count tabhi hota hai jab side flip ho aur last committed point -> current point ka path
+# zone boundary (line segment) ko kaate. Per track per frame O(1) kaam, sab vectorized.
+class CrossingCounter:
+    def __init__(self, zone, deadband=6.0, capacity=512, ttl=3.0, n_classes=256):
+        self.zone = zone
+        self.deadband = deadband
+        self.tracks = TrackTable(capacity, ttl)
+        self.side = np.zeros(capacity, np.int8)
+        self.anchor = np.zeros((capacity, 2), np.float32)
+        self.count_in = np.zeros(n_classes, np.int64)
+        self.count_out = np.zeros(n_classes, np.int64)
+
+    def update(self, ids, centers, clss, t_now):
+        """Ek frame ke tracks process karo. Returns per-track direction: +1 In, -1 Out, 0 none."""
+        centers = np.asarray(centers, np.float32)
+        clss = np.asarray(clss, np.int64)
+        slots, known = self.tracks.assign(ids, t_now)
+        ok = slots >= 0
+        slots, known, centers, clss = slots[ok], known[ok], centers[ok], clss[ok]
+        events = np.zeros(len(ok), np.int8)
+
+        d = self.zone.signed_distance(centers)
+        side_now = np.where(d > self.deadband, 1, np.where(d < -self.deadband, -1, 0)).astype(np.int8)
+        prev = self.side[slots]
+
+        flipped = known & (side_now != 0) & (prev != 0) & (side_now != prev)
+        flipped &= self.zone.crosses(self.anchor[slots], centers)
+        direction = np.where(flipped, side_now, 0).astype(np.int8)
+        np.add.at(self.count_in, clss[direction > 0], 1)
+        np.add.at(self.count_out, clss[direction < 0], 1)
+        events[ok] = direction
+
+        # Deadband ke bahar wale points naya committed side + anchor bante hain
+        commit = side_now != 0
+        self.side[slots[commit]] = side_now[commit]
+        self.anchor[slots[commit]] = centers[commit]
+        self.side[slots[~known & ~commit]] = 0
+        return events
+
+    def totals(self, names):
+        # {label: (in, out)} sirf un classes ke liye jo kabhi count hui
+        active = np.flatnonzero(self.count_in + self.count_out)
+        return {names[c]: (int(self.count_in[c]), int(self.count_out[c])) for c in active}
+
+    def reset(self):
+        self.count_in[:] = 0
+        self.count_out[:] = 0
+
+
+# --- COUNTING PIPELINE ---
+class CountingProcessor:
+    # Tracked IDs + virtual line/polygon: har track ka In/Out ek hi baar count hota hai
+    def __init__(self, model, zone_fn, imgsz=320, metrics=None, scheduler=None, store=None, night_mode="Off"):
+        self.model = model
+        # store (CountStore) ho to har inferred frame ki per-class occupancy time buckets mein jaati hai
+        self.store = store
+        self.metrics = metrics or get_metrics("counter")
+        self.zone_fn = zone_fn
+        self.imgsz = imgsz
+        # scheduler (BatchScheduler) ho to detection shared inference pool mein; tracker hamesha apna
+        self.scheduler = scheduler
+        self.tracker = None
+        self.counter = None
+        self.night_mode = night_mode
+        self.night_vision = NightVision()
+
+    def process(self, img, t_now):
+        h, w = img.shape[:2]
+        m = self.metrics
+        m.inc("frames_in")
+        first = self.counter is None
+        if first:
+            self.counter = CrossingCounter(self.zone_fn(w, h))
+            self.tracker = SessionTracker()
+        # Low-light enhance (Auto: sirf andhere frames par), detection se pehle
+        with m.stage("preprocess"):
+            self.night_vision.process(img, self.night_mode, bgr=True)
+        try:
+            with m.stage("track"):
+                dets = self.tracker.update(self._detect(img), img)
+        except Overloaded:
+            # Pool full: is frame par count nahi (tracks TTL tak zinda), zone/HUD phir bhi
+            m.inc("frames_dropped")
+            dets = Detections.empty()
+        else:
+            m.inc("frames_inferred")
+            m.inc("objects", len(dets))
+            m.gauge("objects_per_frame", len(dets))
+            if self.store is not None:
+                self.store.add_classes(t_now, dets.cls)
+        if dets.ids is not None and len(dets):
+            with m.stage("count"):
+                self.counter.update(dets.ids, dets.centers, dets.cls, t_now)
+            with m.stage("render"):
+                labels = [f"#{i} {self.model.names[c]}" for i, c in zip(dets.ids, dets.cls)]
+                renderer.boxes(img, dets, self.model.names, labels=labels)
+
+        zone = self.counter.zone
+        cv2.polylines(img, [zone.polyline()], isinstance(zone, PolygonZone), (0, 255, 255), 2)
+        renderer.hud(img, [("IN:", int(self.counter.count_in.sum())),
+                           ("OUT:", int(self.counter.count_out.sum()))])
+        return img
+
+    def _detect(self, img):
+        # model.track jaisa low floor, ByteTrack ka second association isi par chalta hai
+        if self.scheduler is not None:
+            return self.scheduler.infer(img, conf=0.1, imgsz=self.imgsz)
+        return Detections.from_result(self.model.predict(img, conf=0.1, imgsz=self.imgsz, verbose=False)[0])
+
+    def recv(self, frame):
+        with self.metrics.stage("to_ndarray"):
+            img = frame.to_ndarray(format="bgr24")
+        img = self.process(img, time.time())
+        with self.metrics.stage("from_ndarray"):
+            return to_video_frame(img)
+
+    def summary(self):
+        if self.counter is None:
+            return []
+        return [{"Object": label.capitalize(), "In": n_in, "Out": n_out}
+                for label, (n_in, n_out) in self.counter.totals(self.model.names).items()]
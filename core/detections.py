@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+def nms(xyxy, scores, iou=0.7, cls=None):
+    """Greedy NMS, NumPy mein. cls diya ho to class-wise (alag classes ek doosre ko suppress nahi karti).
+
+    Returns kept indices, score ke descending order mein.
+    """
+    n = len(scores)
+    if n == 0:
+        return np.zeros(0, np.intp)
+    order = np.argsort(-scores, kind="stable")
+    boxes = xyxy[order].astype(np.float32)
+    if cls is not None:
+        # Har class ko alag coordinate region mein shift: ek hi pass mein class-aware NMS
+        boxes = boxes + (cls[order] * (float(boxes.max()) + 1))[:, None].astype(np.float32)
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    lt = np.maximum(boxes[:, None, :2], boxes[None, :, :2])
+    rb = np.minimum(boxes[:, None, 2:], boxes[None, :, 2:])
+    wh = np.clip(rb - lt, 0, None)
+    inter = wh[..., 0] * wh[..., 1]
+    overlap = inter / np.maximum(area[:, None] + area[None, :] - inter, 1e-9) > iou
+    keep = np.ones(n, bool)
+    for i in range(n):
+        if keep[i]:
+            keep[i + 1:] &= ~overlap[i, i + 1:]
+    return order[keep]
+
+
+# --- RAW DETECTIONS ---
+# Ultralytics Results ka halka NumPy copy: ek hi baar GPU/CPU tensor se transfer,
+# phir pages isi par counting, drawing, filtering karte hain.
+@dataclass
+class Detections:
+    xyxy: np.ndarray   # (N, 4) float32
+    conf: np.ndarray   # (N,) float32
+    cls: np.ndarray    # (N,) int32
+    ids: np.ndarray = None  # (N,) int32, sirf tracking mode mein
+    segments: list = None   # N polygons (K_i, 2) float32, sirf seg models par
+
+    def __len__(self):
+        return len(self.cls)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int32))
+
+    @classmethod
+    def from_result(cls, result):
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return cls.empty()
+        # Sirf ek transfer: data rows (x1, y1, x2, y2, [id,] conf, cls); track mode mein 7 columns
+        data = boxes.data.cpu().numpy()
+        ids = data[:, 4].astype(np.int32) if data.shape[1] == 7 else None
+        masks = getattr(result, "masks", None)
+        # masks.xy: original image pixels mein polygons (mask tensors CPU par laane se kaafi halka)
+        segments = [np.asarray(p, np.float32) for p in masks.xy] if masks is not None else None
+        return cls(data[:, :4].astype(np.float32), data[:, -2].astype(np.float32),
+                   data[:, -1].astype(np.int32), ids, segments)
+
+    @property
+    def centers(self):
+        return np.stack([(self.xyxy[:, 0] + self.xyxy[:, 2]) / 2,
+                         (self.xyxy[:, 1] + self.xyxy[:, 3]) / 2], axis=1)
+
+    @property
+    def xywh(self):
+        # Center x, y + width, height (ByteTrack isi format mein detections leta hai)
+        return np.concatenate([self.centers, self.xyxy[:, 2:] - self.xyxy[:, :2]], axis=1)
+
+    def filter(self, conf=0.0, classes=None, exclude=None):
+        # Threshold/class filter: sirf boolean mask, re-inference nahi
+        mask = self.conf >= conf
+        if classes is not None:
+            mask &= np.isin(self.cls, classes)
+        if exclude is not None:
+            mask &= ~np.isin(self.cls, exclude)
+        return self[mask]
+
+    def nms(self, iou=0.7, agnostic=False):
+        return self[nms(self.xyxy, self.conf, iou, None if agnostic else self.cls)]
+
+    def __getitem__(self, idx):
+        segments = None
+        if self.segments is not None:
+            keep = np.arange(len(self.segments))[idx]
+            segments = [self.segments[i] for i in np.atleast_1d(keep)]
+        return Detections(self.xyxy[idx], self.conf[idx], self.cls[idx],
+                          None if self.ids is None else self.ids[idx], segments)
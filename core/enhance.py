@@ -0,0 +1,46 @@
+import cv2
+import numpy as np
+
+
+# --- NIGHT VISION ENGINE ---
+# Ek hi LAB round-trip: L channel par CLAHE (ek baar bana instance), phir brightness boost
+# ek precomputed 256-entry LUT se. Intermediate buffers reuse hote hain aur result caller ke
+# array mein hi likha jaata hai, isliye yeh live WebRTC frames par bhi chal sakta hai.
+# Instance thread-safe nahi hai: har stream/session apna NightVision rakhe.
+class NightVision:
+    MODES = ("Off", "Auto", "On")
+
+    def __init__(self, clip_limit=3.0, tile=(8, 8), brightness=1.5, dark_threshold=70):
+        self.clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile)
+        self.lut = np.clip(np.arange(256) * brightness, 0, 255).astype(np.uint8)
+        self.dark_threshold = dark_threshold
+        self._lab = None
+        self._l = None
+
+    def luminance(self, img):
+        # Har 8th pixel ka channel mean: brightness ka sasta andaza, RGB/BGR dono par same
+        return float(img[::8, ::8].mean())
+
+    def is_dark(self, img):
+        return self.luminance(img) < self.dark_threshold
+
+    def apply(self, img, bgr=False):
+        # `img` (uint8, HxWx3) in-place enhance hota hai
+        to_lab, from_lab = (cv2.COLOR_BGR2LAB, cv2.COLOR_LAB2BGR) if bgr else (cv2.COLOR_RGB2LAB, cv2.COLOR_LAB2RGB)
+        if self._lab is None or self._lab.shape != img.shape:
+            self._lab = np.empty_like(img)
+            self._l = np.empty(img.shape[:2], np.uint8)
+        cv2.cvtColor(img, to_lab, dst=self._lab)
+        cv2.extractChannel(self._lab, 0, dst=self._l)
+        self.clahe.apply(self._l, dst=self._l)
+        cv2.insertChannel(self._l, self._lab, 0)
+        cv2.cvtColor(self._lab, from_lab, dst=img)
+        cv2.LUT(img, self.lut, dst=img)
+        return img
+
+    def process(self, img, mode="Auto", bgr=False):
+        # Returns True agar enhancement laga
+        if mode == "On" or (mode == "Auto" and self.is_dark(img)):
+            self.apply(img, bgr)
+            return True
+        return False
@@ -0,0 +1,289 @@
+import os
+import threading
+import time
+import urllib.request
+from collections import Counter, OrderedDict
+
+import cv2
+import numpy as np
+
+from core import config
+from core.detections import Detections
+from core.live import LatestFrameWorker, to_video_frame
+from core.metrics import get_metrics
+from core.overlay import renderer
+from core.tracks import SessionTracker
+
+
+# --- FACE DETECTOR ---
+# Mood pipeline ka sasta pehla stage, CPU par har frame (downscaled input). OpenCV 4.x: Haar cascade
+# (gray + histogram equalize, koi download nahi). OpenCV 5 mein Haar cascades hat gaye, wahan
+# OpenCV ka apna YuNet (FaceDetectorYN, ~230 KB ONNX) jo pehli baar `.cache/models` mein download
+# hota hai, jaise YOLO weights.
+YUNET_URL = ("https://github.com/opencv/opencv_zoo/raw/main/models/face_detection_yunet/"
+             "face_detection_yunet_2023mar.onnx")
+
+
+def _yunet_path():
+    path = os.path.join(config.CACHE_DIR, "models", os.path.basename(YUNET_URL))
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        urllib.request.urlretrieve(YUNET_URL, tmp)
+        os.replace(tmp, path)
+    return path
+
+
+class FaceDetector:
+    def __init__(self, width=320, scale_factor=1.15, min_neighbors=5, min_size=0.08, score=0.7):
+        self.width = width
+        # Frame ki chhoti side ka itna hissa: isse chhote "faces" mostly noise hote hain
+        self.min_size = min_size
+        if hasattr(cv2, "CascadeClassifier"):
+            self.backend = "haar"
+            self.cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+            self.scale_factor = scale_factor
+            self.min_neighbors = min_neighbors
+        else:
+            self.backend = "yunet"
+            self.yunet = cv2.FaceDetectorYN.create(_yunet_path(), "", (width, width), score, 0.3, 50)
+            self._input_size = None
+
+    def detect(self, img):
+        h, w = img.shape[:2]
+        r = min(self.width / w, 1.0)
+        small = cv2.resize(img, (round(w * r), round(h * r)), interpolation=cv2.INTER_AREA) if r < 1 else img
+        side = max(int(min(small.shape[:2]) * self.min_size), 20)
+        if self.backend == "haar":
+            gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+            cv2.equalizeHist(gray, dst=gray)
+            faces = self.cascade.detectMultiScale(gray, self.scale_factor, self.min_neighbors, minSize=(side, side))
+            xywh, conf = np.asarray(faces, np.float32).reshape(-1, 4), None
+        else:
+            size = (small.shape[1], small.shape[0])
+            if size != self._input_size:
+                self.yunet.setInputSize(size)
+                self._input_size = size
+            _, faces = self.yunet.detect(small)
+            faces = np.zeros((0, 15), np.float32) if faces is None else faces
+            faces = faces[(faces[:, 2] >= side) & (faces[:, 3] >= side)]
+            xywh, conf = faces[:, :4], faces[:, -1]
+        if len(xywh) == 0:
+            return Detections.empty()
+        xywh = xywh / r
+        xyxy = np.concatenate([xywh[:, :2], xywh[:, :2] + xywh[:, 2:]], axis=1).astype(np.float32)
+        conf = np.ones(len(xyxy), np.float32) if conf is None else conf.astype(np.float32)
+        return Detections(xyxy, conf, np.zeros(len(xyxy), np.int32))
+
+
+def crop_face(img, box, pad=0.2):
+    # Thoda margin (baal/thodi): attribute models tight face box par kam accurate hote hain
+    h, w = img.shape[:2]
+    x1, y1, x2, y2 = box
+    px, py = (x2 - x1) * pad, (y2 - y1) * pad
+    x1, y1 = max(int(x1 - px), 0), max(int(y1 - py), 0)
+    x2, y2 = min(int(x2 + px), w), min(int(y2 + py), h)
+    return img[y1:y2, x1:x2].copy()
+
+
+# --- ATTRIBUTE MODELS ---
+# Interface: analyze(face_bgr) -> {"mood", "age", "gender", "scores"}. Heavy model (DeepFace /
+# TensorFlow) isi ke peeche hai, isliye tests ya bina TF wale servers par StubAttributes lag jaata hai.
+class StubAttributes:
+    name = "stub"
+
+    def __init__(self, mood="neutral", age=30, gender="Woman", delay=0.0):
+        self.mood = mood
+        self.age = age
+        self.gender = gender
+        # delay: heavy model ki latency simulate karne ke liye (load tests)
+        self.delay = delay
+
+    def analyze(self, face):
+        if self.delay:
+            time.sleep(self.delay)
+        return {"mood": self.mood, "age": self.age, "gender": self.gender, "scores": {self.mood: 100.0}}
+
+
+class DeepFaceAttributes:
+    name = "deepface"
+
+    def __init__(self):
+        from deepface import DeepFace
+        self._deepface = DeepFace
+        # TF/Keras models ek saath kai threads se predict par bharosa nahi: ek waqt par ek face
+        self._lock = threading.Lock()
+
+    def analyze(self, face):
+        # detector_backend="skip": face hum de rahe hain, DeepFace dobara detect na kare
+        with self._lock:
+            res = self._deepface.analyze(face, actions=("emotion", "age", "gender"), detector_backend="skip",
+                                         enforce_detection=False, silent=True)
+        r = res[0] if isinstance(res, list) else res
+        return {"mood": r["dominant_emotion"], "age": int(r["age"]), "gender": r["dominant_gender"],
+                "scores": {k: round(float(v), 1) for k, v in r["emotion"].items()}}
+
+
+_models = {}
+_fallbacks = {}
+_models_lock = threading.Lock()
+
+
+def attribute_model(name=config.MOOD_MODEL):
+    # Process mein har model ki ek copy. DeepFace import/load na ho (TF missing) to stub par
+    # fall back, reason `attribute_fallback(name)` se UI tak
+    with _models_lock:
+        model = _models.get(name)
+        if model is None:
+            if name == "stub":
+                model = StubAttributes()
+            elif name == "deepface":
+                try:
+                    model = DeepFaceAttributes()
+                except Exception as e:
+                    get_metrics("mood").inc("model_fallback")
+                    _fallbacks[name] = repr(e)
+                    model = StubAttributes()
+            else:
+                raise ValueError(f"Unknown attribute model {name!r}, expected 'deepface' or 'stub'")
+            _models[name] = model
+        return model
+
+
+def attribute_fallback(name):
+    return _fallbacks.get(name)
+
+
+def analyze_faces(img, detector, model):
+    """Snapshot ke liye: saare faces ek baar detect + analyse. Returns (Detections, [attrs])."""
+    faces = detector.detect(img)
+    return faces, [model.analyze(crop_face(img, box)) for box in faces.xyxy]
+
+
+# --- LIVE MOOD PIPELINE ---
+# Har frame: faces (Haar/YuNet) -> is session ka apna tracker (stable IDs). Heavy attribute model sirf
+# naye track par, ya `refresh` seconds purane result par, aur woh bhi background worker mein
+# (latest crop wins), isliye callback kabhi DeepFace ka wait nahi karta. Results per track ID
+# cache mein; track `ttl` seconds na dikhe to entry hat jaati hai (LRU cap bhi).
+class MoodPipeline:
+    def __init__(self, model_name=config.MOOD_MODEL, refresh=config.MOOD_REFRESH, detector=None, metrics=None,
+                 ttl=10.0, max_tracks=256):
+        self.model_name = model_name
+        self.refresh = refresh
+        self.detector = detector or FaceDetector()
+        self.metrics = metrics or get_metrics("mood")
+        self.ttl = ttl
+        self.max_tracks = max_tracks
+        self.tracker = None
+        # id -> {"attrs": dict | None, "t": analysed frame time | None, "seen": last seen}
+        self.cache = OrderedDict()
+        self._inflight = None
+        self._lock = threading.Lock()
+        self.worker = LatestFrameWorker(self._analyze)
+        self.analyzed = 0
+
+    def _analyze(self, face, meta):
+        tid, t_frame = meta
+        with self._lock:
+            self._inflight = tid
+        try:
+            # Model pehli baar yahin load hota hai (worker thread), page/callback block nahi hote
+            with self.metrics.stage("attributes"):
+                attrs = attribute_model(self.model_name).analyze(face)
+        finally:
+            with self._lock:
+                self._inflight = None
+        with self._lock:
+            entry = self.cache.get(tid)
+            if entry is not None:
+                entry["attrs"], entry["t"] = attrs, t_frame
+        self.analyzed += 1
+        self.metrics.inc("faces_analyzed")
+        return Detections.empty()
+
+    def _due(self, ids, t_now):
+        # Sabse zyada zaroori track: bina result wala pehle, phir sabse purana result
+        best, best_t = None, None
+        for tid in ids:
+            entry = self.cache[tid]
+            if tid == self._inflight:
+                continue
+            t = entry["t"]
+            if t is not None and t_now - t < self.refresh:
+                continue
+            key = -np.inf if t is None else t
+            if best is None or key < best_t:
+                best, best_t = tid, key
+        return best
+
+    def process(self, img, t_now=None):
+        t_now = time.time() if t_now is None else t_now
+        m = self.metrics
+        m.inc("frames_in")
+        with m.stage("faces"):
+            faces = self.detector.detect(img)
+        if self.tracker is None:
+            self.tracker = SessionTracker()
+        with m.stage("track"):
+            tracks = self.tracker.update(faces, img)
+        m.gauge("faces", len(tracks))
+
+        ids = tracks.ids.tolist() if tracks.ids is not None else []
+        with self._lock:
+            for tid in ids:
+                entry = self.cache.get(tid)
+                if entry is None:
+                    entry = self.cache[tid] = {"attrs": None, "t": None, "seen": t_now}
+                    m.inc("face_tracks")
+                else:
+                    self.cache.move_to_end(tid)
+                entry["seen"] = t_now
+            while self.cache and (len(self.cache) > self.max_tracks or
+                                  t_now - next(iter(self.cache.values()))["seen"] > self.ttl):
+                self.cache.popitem(last=False)
+            due = self._due(ids, t_now)
+            labels = [self._label(tid) for tid in ids]
+        if due is not None:
+            box = tracks.xyxy[ids.index(due)]
+            self.worker.submit(crop_face(img, box), copy=False, meta=(due, t_now))
+
+        if ids:
+            with m.stage("render"):
+                renderer.boxes(img, tracks, {0: "face"}, labels=labels, color=(255, 200, 0))
+        return img
+
+    def _label(self, tid):
+        attrs = self.cache[tid]["attrs"]
+        if attrs is None:
+            return f"#{tid} analysing..."
+        return f"#{tid} {attrs['mood']} {attrs['age']} {attrs['gender'][0]}"
+
+    def recv(self, frame):
+        with self.metrics.stage("to_ndarray"):
+            img = frame.to_ndarray(format="bgr24")
+        img = self.process(img)
+        with self.metrics.stage("from_ndarray"):
+            return to_video_frame(img)
+
+    def tracks(self, window=None):
+        """Table ke liye: har (recent) track ka latest result, latest pehle."""
+        window = self.ttl if window is None else window
+        now = time.time()
+        with self._lock:
+            items = list(self.cache.items())
+        out = []
+        for tid, e in reversed(items):
+            if e["attrs"] is None or now - e["seen"] > window:
+                continue
+            a = e["attrs"]
+            out.append({"track_id": tid, "mood": a["mood"], "age": a["age"], "gender": a["gender"],
+                        "analysed_s_ago": round(now - e["t"], 1) if e["t"] else None})
+        return out
+
+    def dominant(self, window=None):
+        # Screen par abhi jo log hain unka sabse common mood, aur sabse chhoti age (safe filter ke liye)
+        rows = self.tracks(window)
+        if not rows:
+            return None, None
+        mood = Counter(r["mood"] for r in rows).most_common(1)[0][0]
+        return mood, min(r["age"] for r in rows)
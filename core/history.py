@@ -0,0 +1,131 @@
+import csv
+import os
+import sqlite3
+import tempfile
+import threading
+import weakref
+
+from core import config
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _cleanup(db, path):
+    db.close()
+    for p in (path, path + ".csv"):
+        if os.path.exists(p):
+            os.remove(p)
+
+
+# --- SESSION HISTORY STORE ---
+# Append-only, columnar: naye rows memory ke chhote tail mein aate hain (column -> list),
+# tail bhar jaane par poora tail ek executemany se local SQLite file mein spill hota hai.
+# UI sirf ek page padhta hai aur CSV export incremental hai, isliye rerun cost session ki
+# length se independent rehti hai. Session khatam (object GC) hone par file delete.
+class HistoryStore:
+    def __init__(self, name="history", tail_size=500, directory=None):
+        directory = directory or os.path.join(config.CACHE_DIR, "history")
+        os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix=f"{name}-", suffix=".sqlite", dir=directory)
+        os.close(fd)
+        self.tail_size = tail_size
+        self.columns = []
+        self._tail = {}
+        self._n_tail = 0
+        self._n_spilled = 0
+        self._exported = 0
+        self._export_cols = None
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("CREATE TABLE rows (_seq INTEGER PRIMARY KEY)")
+        self._finalizer = weakref.finalize(self, _cleanup, self._db, self.path)
+
+    def __len__(self):
+        return self._n_spilled + self._n_tail
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def _add_column(self, col):
+        self.columns.append(col)
+        self._tail[col] = [None] * self._n_tail
+        self._db.execute(f"ALTER TABLE rows ADD COLUMN {_quote(col)}")
+
+    def append(self, row):
+        with self._lock:
+            for col in row:
+                if col not in self._tail:
+                    self._add_column(col)
+            for col in self.columns:
+                self._tail[col].append(row.get(col))
+            self._n_tail += 1
+            if self._n_tail >= self.tail_size:
+                self._spill()
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def _spill(self):
+        cols = ", ".join(_quote(c) for c in self.columns)
+        marks = ", ".join("?" * len(self.columns))
+        self._db.executemany(f"INSERT INTO rows ({cols}) VALUES ({marks})",
+                             zip(*(self._tail[c] for c in self.columns)))
+        self._db.commit()
+        self._n_spilled += self._n_tail
+        self._n_tail = 0
+        self._tail = {c: [] for c in self.columns}
+
+    def _read(self, start, stop):
+        # Rows [start, stop) as list of tuples (self.columns order)
+        out = []
+        if start < self._n_spilled:
+            cols = ", ".join(_quote(c) for c in self.columns)
+            cur = self._db.execute(f"SELECT {cols} FROM rows ORDER BY _seq LIMIT ? OFFSET ?",
+                                   (min(stop, self._n_spilled) - start, start))
+            out.extend(cur.fetchall())
+        lo, hi = max(start - self._n_spilled, 0), max(stop - self._n_spilled, 0)
+        if hi > lo:
+            out.extend(zip(*(self._tail[c][lo:hi] for c in self.columns)))
+        return out
+
+    def page(self, page, per_page=50, newest_first=True):
+        """Ek page ke rows as {column: list} (seedha pd.DataFrame mein jaata hai)."""
+        with self._lock:
+            n = len(self)
+            if newest_first:
+                stop = max(n - page * per_page, 0)
+                start = max(stop - per_page, 0)
+            else:
+                start = min(page * per_page, n)
+                stop = min(start + per_page, n)
+            rows = self._read(start, stop)
+            if newest_first:
+                rows.reverse()
+            return {c: [r[i] for r in rows] for i, c in enumerate(self.columns)}
+
+    def n_pages(self, per_page=50):
+        return max((len(self) + per_page - 1) // per_page, 1)
+
+    def export_csv(self, chunk=2000):
+        """CSV file path return karta hai; sirf pichhle export ke baad aaye rows append hote hain."""
+        with self._lock:
+            csv_path = self.path + ".csv"
+            if self._export_cols != self.columns:
+                # Naya column aaya -> header badla, file shuru se likho
+                self._exported = 0
+                self._export_cols = list(self.columns)
+                with open(csv_path, "w", newline="", encoding="utf-8") as fh:
+                    csv.writer(fh).writerow(self.columns)
+            with open(csv_path, "a", newline="", encoding="utf-8") as fh:
+                writer = csv.writer(fh)
+                n = len(self)
+                for start in range(self._exported, n, chunk):
+                    writer.writerows(self._read(start, min(start + chunk, n)))
+                self._exported = n
+            return csv_path
+
+    def close(self):
+        self._finalizer()
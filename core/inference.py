@@ -0,0 +1,217 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from core import backends, config
+from core.metrics import get_metrics
+
+# Process start ka andaza (pehla core import); startup report isi se naapta hai
+BOOT_T = time.monotonic()
+_first_inference = None
+
+
+def first_inference_s():
+    # Boot se pehli asli (page/CLI) inference tak ka time; warm-up calls count nahi hote
+    return _first_inference
+
+
+def _note_inference():
+    global _first_inference
+    if _first_inference is None:
+        _first_inference = round(time.monotonic() - BOOT_T, 3)
+        get_metrics("startup").gauge("time_to_first_inference_s", _first_inference)
+
+
+# --- MODEL REGISTRY ---
+# Ek process mein har (weights, backend, imgsz) ke liye sirf ek loaded model.
+# Pages lease lete hain (refcount++), kaam ke baad release (refcount--);
+# jo model idle_ttl se zyada der tak unused rahe use evict kar diya jaata hai.
+class _Entry:
+    __slots__ = ("model", "refs", "last_used", "load_lock", "infer_lock", "active", "fallback", "pinned")
+
+    def __init__(self):
+        self.model = None
+        # Asal mein kaunsa backend chal raha hai (export fail hone par "torch"), aur kyun
+        self.active = None
+        self.fallback = None
+        self.refs = 0
+        self.last_used = time.monotonic()
+        # Pinned (warm-up wala default model): idle hone par bhi evict nahi, taaki quiet server par
+        # 15 min baad aane wala visitor phir se cold load na jhele
+        self.pinned = False
+        self.load_lock = threading.Lock()
+        # Ultralytics predictor thread-safe nahi hai, isliye forward pass serialize hota hai
+        self.infer_lock = threading.Lock()
+
+
+class ModelRegistry:
+    def __init__(self, idle_ttl=config.MODEL_IDLE_TTL, sweep_every=60.0):
+        self.idle_ttl = idle_ttl
+        self.sweep_every = sweep_every
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._janitor = None
+
+    @staticmethod
+    def key(weights, backend, imgsz, tag=None):
+        # PyTorch weights kisi bhi imgsz par chalte hain -> ek hi copy sab sizes serve karti hai.
+        # Exported backends (ONNX/OpenVINO) ka input shape fixed hota hai, wahan imgsz key ka hissa hai.
+        # `tag` stateful copies (jaise model.track ke tracker callbacks) ko plain predict se alag rakhta hai.
+        return (weights, backend, None if backend == "torch" else imgsz, tag)
+
+    def _load(self, weights, backend, imgsz):
+        # Returns (model, active_backend, fallback_reason)
+        from ultralytics import YOLO
+        if backend == "torch":
+            return YOLO(weights), "torch", None
+        try:
+            return YOLO(backends.ensure_exported(weights, backend, imgsz), task="detect"), backend, None
+        except Exception as e:
+            # Export/runtime na ho (onnxruntime/openvino missing, INT8 calib nahi): chupchaap PyTorch
+            get_metrics("startup").inc("backend_fallback")
+            return YOLO(weights), "torch", repr(e)
+
+    def acquire(self, weights, backend="torch", imgsz=None, tag=None):
+        key = self.key(weights, backend, imgsz, tag)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            entry.refs += 1
+            self._start_janitor()
+
+        # Load global lock ke bahar, taaki ek slow load baaki models ko block na kare
+        if entry.model is None:
+            with entry.load_lock:
+                if entry.model is None:
+                    try:
+                        entry.model, entry.active, entry.fallback = self._load(weights, backend, imgsz)
+                    except BaseException:
+                        self.release(entry)
+                        raise
+        return entry
+
+    def release(self, entry):
+        with self._lock:
+            entry.refs -= 1
+            entry.last_used = time.monotonic()
+
+    def pin(self, weights, backend="torch", imgsz=None, tag=None):
+        with self._lock:
+            entry = self._entries.get(self.key(weights, backend, imgsz, tag))
+            if entry is not None:
+                entry.pinned = True
+            return entry is not None
+
+    @contextmanager
+    def lease(self, weights, backend="torch", imgsz=None, tag=None):
+        entry = self.acquire(weights, backend, imgsz, tag)
+        try:
+            yield entry
+        finally:
+            self.release(entry)
+
+    def sweep(self):
+        now = time.monotonic()
+        with self._lock:
+            idle = [k for k, e in self._entries.items()
+                    if e.refs == 0 and not e.pinned and now - e.last_used > self.idle_ttl]
+            for k in idle:
+                del self._entries[k]
+        return idle
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return [{"weights": k[0], "backend": k[1], "imgsz": k[2], "tag": k[3], "refs": e.refs,
+                     "pinned": e.pinned, "loaded": e.model is not None, "active": e.active, "fallback": e.fallback,
+                     "idle_s": round(now - e.last_used, 1)}
+                    for k, e in self._entries.items()]
+
+    def _start_janitor(self):
+        if self._janitor is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(self.sweep_every)
+                self.sweep()
+
+        self._janitor = threading.Thread(target=loop, name="model-janitor", daemon=True)
+        self._janitor.start()
+
+
+registry = ModelRegistry()
+
+
+# --- PAGE-FACING HANDLE ---
+# YOLO jaisa interface (model(img), model.predict, model.track, model.names),
+# lekin har call registry se lease leke shared model par chalti hai.
+class SharedModel:
+    def __init__(self, weights=config.WEIGHTS, backend=config.BACKEND, imgsz=None, registry=registry):
+        self.weights = weights
+        self.backend = backend
+        self.imgsz = imgsz
+        self.registry = registry
+        self._names = None
+
+    @property
+    def sizes(self):
+        # Exported backends sirf in sizes par export/load hote hain (adaptive controller ki ladder); torch: koi bhi
+        return None if self.backend == "torch" else tuple(sorted(config.EXPORT_IMGSZ))
+
+    def snap(self, imgsz):
+        # Request ka imgsz -> jis size par asal mein inference hogi
+        imgsz = imgsz or self.imgsz or 640
+        return imgsz if self.backend == "torch" else backends.snap_imgsz(imgsz)
+
+    def _entry_imgsz(self, imgsz=None):
+        return self.imgsz if self.backend == "torch" else self.snap(imgsz)
+
+    @contextmanager
+    def lease(self, tag=None, imgsz=None):
+        with self.registry.lease(self.weights, self.backend, self._entry_imgsz(imgsz), tag) as entry:
+            with entry.infer_lock:
+                if self._names is None:
+                    self._names = entry.model.names
+                yield entry.model
+
+    def pin(self, tag=None, imgsz=None):
+        # Loaded copy ko idle eviction se bachao (warm-up ke baad)
+        return self.registry.pin(self.weights, self.backend, self._entry_imgsz(imgsz), tag)
+
+    @property
+    def ident(self):
+        # Cache keys ke liye model ki pehchaan
+        return (self.weights, self.backend)
+
+    @property
+    def names(self):
+        # Names ke liye infer_lock ki zarurat nahi, warna live callback chalti inference par atak jaata
+        if self._names is None:
+            with self.registry.lease(self.weights, self.backend, self._entry_imgsz()) as entry:
+                self._names = entry.model.names
+        return self._names
+
+    def predict(self, source, tag=None, **kwargs):
+        # tag: alag model copy (jaise inference pool ke workers), taaki forward passes parallel chal sakein
+        kwargs["imgsz"] = self.snap(kwargs.get("imgsz"))
+        with self.lease(tag=tag, imgsz=kwargs["imgsz"]) as model:
+            results = model.predict(source, **kwargs)
+        _note_inference()
+        return results
+
+    def track(self, source, **kwargs):
+        # Dhyan: tracker state is shared "track" copy par hai, yaani saare callers ki ek hi.
+        # Kai streams/sessions ke liye predict + core.tracks.SessionTracker use karo.
+        kwargs["imgsz"] = self.snap(kwargs.get("imgsz"))
+        with self.lease(tag="track", imgsz=kwargs["imgsz"]) as model:
+            results = model.track(source, **kwargs)
+        _note_inference()
+        return results
+
+    __call__ = predict
+
+
+def shared_model(weights=config.WEIGHTS, backend=config.BACKEND, imgsz=None):
+    return SharedModel(weights, backend, imgsz)
@@ -0,0 +1,44 @@
+import io
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# EXIF orientation tag -> transpose jo photo ko seedha karta hai
+_ORIENT = {2: Image.Transpose.FLIP_LEFT_RIGHT, 3: Image.Transpose.ROTATE_180, 4: Image.Transpose.FLIP_TOP_BOTTOM,
+           5: Image.Transpose.TRANSPOSE, 6: Image.Transpose.ROTATE_270, 7: Image.Transpose.TRANSVERSE,
+           8: Image.Transpose.ROTATE_90}
+
+
+# --- IMAGE INGESTION ---
+# Uploads/snapshots ke liye ek hi raasta: JPEG seedha reduced scale (1/2, 1/4, 1/8) par decode
+# (PIL draft), baaki formats par integer `reduce`, phir EXIF orientation fix. Result hamesha
+# detector jitna bada (long side >= max_side, 2x se kam), aur ek hi writable BGR array (jo
+# ultralytics numpy input ke liye expect karta hai; st.image ko channels="BGR" do).
+# `scale` decoded pixels ko original photo ke pixels mein badalta hai (measurement ke liye).
+def load_image(source, max_side=None):
+    """Returns (img_bgr, scale). scale = original_px / decoded_px."""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    elif hasattr(source, "seek"):
+        source.seek(0)
+    with Image.open(source) as im:
+        w, h = im.size
+        orientation = im.getexif().get(0x0112, 1)
+        if max_side and max(w, h) > max_side:
+            r = max_side / max(w, h)
+            # draft sirf JPEG par kaam karta hai; requested size se chhota kabhi nahi deta
+            im.draft("RGB", (int(w * r + 0.5), int(h * r + 0.5)))
+            factor = max(im.size) // max_side
+            if factor >= 2:
+                im = im.reduce(factor)
+        if orientation in _ORIENT:
+            # Reduce ke baad: chhoti image ghumana sasta hai
+            im = im.transpose(_ORIENT[orientation])
+        if im.mode != "RGB":
+            im = im.convert("RGB")
+        img = np.array(im)
+
+    cv2.cvtColor(img, cv2.COLOR_RGB2BGR, dst=img)
+    # Rotation sirf axes badalta hai, long side wahi rehti hai
+    return img, max(w, h) / max(img.shape[:2])
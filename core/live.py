@@ -0,0 +1,176 @@
+import threading
+import time
+
+import numpy as np
+
+from core.batching import Overloaded
+from core.detections import Detections
+from core.enhance import NightVision
+from core.metrics import get_metrics
+from core.overlay import renderer
+
+
+def to_video_frame(img):
+    # av sirf WebRTC path ko chahiye; offline tools bina iske chal sakte hain
+    import av
+    return av.VideoFrame.from_ndarray(img, format="bgr24")
+
+
+# --- LATEST-FRAME-WINS WORKER ---
+# Callback har frame submit karta hai, lekin background thread sirf sabse naya frame
+# infer karta hai; beech ke purane frames drop ho jaate hain. Isse video camera FPS par
+# chalta rehta hai aur latency detector ki speed ke saath badhti nahi.
+class LatestFrameWorker:
+    def __init__(self, infer_fn, idle_timeout=10.0, metrics=None):
+        self.infer_fn = infer_fn
+        self.metrics = metrics
+        self.idle_timeout = idle_timeout
+        self._cond = threading.Condition()
+        self._pending = None
+        self._latest = Detections.empty()
+        self._thread = None
+        self._started = time.monotonic()
+        self.submitted = 0
+        self.processed = 0
+        self.dropped = 0
+        self.last_latency = 0.0
+        self.last_error = None
+        # Do inferences ke start ke beech kam se kam itna gap (adaptive controller set karta hai)
+        self.min_interval = 0.0
+
+    def submit(self, img, copy=True, meta=None):
+        # Caller frame par draw karega, isliye worker ko apni copy chahiye.
+        # meta frame ke saath infer_fn(frame, meta) tak jaata hai (jaise crop ka offset)
+        frame = img.copy() if copy else img
+        with self._cond:
+            if self._pending is not None:
+                self.dropped += 1
+                if self.metrics:
+                    self.metrics.inc("frames_dropped")
+            self._pending = (frame, meta, time.perf_counter())
+            self.submitted += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="live-infer", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def latest(self):
+        return self._latest
+
+    def stats(self):
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        return {"submitted": self.submitted, "processed": self.processed, "dropped": self.dropped,
+                "infer_fps": round(self.processed / elapsed, 1),
+                "latency_ms": round(self.last_latency * 1000, 1), "error": self.last_error}
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._pending is None:
+                    self._cond.wait(self.idle_timeout)
+                if self._pending is None:
+                    # Stream band ho gaya: thread khatam, agla submit naya thread start karega
+                    self._thread = None
+                    return
+                (frame, meta, t_submit), self._pending = self._pending, None
+
+            t0 = time.perf_counter()
+            try:
+                dets = self.infer_fn(frame, meta)
+            except Overloaded:
+                # Shared pool full: yeh frame bhi drop, pichhli detections hi dikhti rahengi
+                self.dropped += 1
+                if self.metrics:
+                    self.metrics.inc("frames_dropped")
+                continue
+            except Exception as e:
+                self.last_error = repr(e)
+                continue
+            self.last_latency = time.perf_counter() - t0
+            # Pehle publish: ready detections pacing ki neend ke dauraan chhupi na rahein
+            self._latest = dets
+            self.processed += 1
+            if self.metrics:
+                self.metrics.observe("infer", self.last_latency)
+                # Frame submit -> uski detections screen par (queue/pool wait + inference)
+                self.metrics.observe("e2e", time.perf_counter() - t_submit)
+                self.metrics.inc("frames_inferred")
+                self.metrics.inc("objects", len(dets))
+                self.metrics.gauge("objects_per_frame", len(dets))
+            rest = self.min_interval - (time.perf_counter() - t0)
+            if rest > 0:
+                # Pacing: is beech aaye frames mein se sirf sabse naya agla infer hoga
+                time.sleep(rest)
+
+
+# --- LIVE DETECTION PIPELINE ---
+# Detection page ka Live Stream callback: enhance -> motion gate -> latest-frame worker ->
+# last detections redraw.
+class LiveDetector:
+    def __init__(self, model, conf=0.3, imgsz=320, night_mode="Off", metrics=None, controller=None,
+                 gate=None, crop=False, scheduler=None):
+        self.model = model
+        self.conf = conf
+        self.imgsz = imgsz
+        self.night_mode = night_mode
+        self.night_vision = NightVision()
+        self.metrics = metrics or get_metrics("detection")
+        # controller (AdaptiveController) ho to imgsz + pacing wahi decide karta hai
+        self.controller = controller
+        # gate (MotionGate) ho to static frames worker tak jaate hi nahi; crop=True par sirf
+        # motion wala hissa infer hota hai (purane boxes frame ke baaki hisse se gayab ho jaate hain)
+        self.gate = gate
+        self.crop = crop
+        # scheduler (BatchScheduler) ho to frame shared inference pool mein (doosre sessions ke frames
+        # ke saath batch mein) infer hota hai
+        self.scheduler = scheduler
+        self.worker = LatestFrameWorker(self.infer, metrics=self.metrics)
+
+    def infer(self, img, offset=None):
+        ctrl = self.controller
+        imgsz = ctrl.imgsz if ctrl is not None else self.imgsz
+        t0 = time.perf_counter()
+        if self.scheduler is not None:
+            dets = self.scheduler.infer(img, conf=self.conf, imgsz=imgsz)
+        else:
+            dets = Detections.from_result(self.model.predict(img, conf=self.conf, imgsz=imgsz, verbose=False)[0])
+        if ctrl is not None:
+            ctrl.observe(time.perf_counter() - t0)
+            self.worker.min_interval = ctrl.interval
+        else:
+            self.worker.min_interval = 0.0
+        if offset is not None and len(dets):
+            # Crop ke coordinates wapas full frame mein
+            x0, y0 = offset
+            dets.xyxy += np.array([x0, y0, x0, y0], np.float32)
+        return dets
+
+    def process(self, img):
+        m = self.metrics
+        m.inc("frames_in")
+        # Low light mein frame enhance (Auto mode sirf andhere frames par chalta hai)
+        with m.stage("preprocess"):
+            self.night_vision.process(img, self.night_mode, bgr=True)
+        moving, roi = True, None
+        if self.gate is not None:
+            with m.stage("motion"):
+                moving, roi = self.gate.check(img, time.monotonic())
+        if not moving:
+            # Static scene: detector idle, pichhli detections hi redraw
+            m.inc("frames_skipped_static")
+        elif self.crop and roi is not None:
+            x0, y0, x1, y1 = roi
+            with m.stage("submit"):
+                self.worker.submit(img[y0:y1, x0:x1], meta=(x0, y0))
+        else:
+            with m.stage("submit"):
+                self.worker.submit(img)
+        with m.stage("render"):
+            return renderer.boxes(img, self.worker.latest(), self.model.names)
+
+    def recv(self, frame):
+        with self.metrics.stage("to_ndarray"):
+            img = frame.to_ndarray(format="bgr24")
+        img = self.process(img)
+        with self.metrics.stage("from_ndarray"):
+            return to_video_frame(img)
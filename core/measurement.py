@@ -0,0 +1,239 @@
+import csv
+import glob
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from core import config
+from core.detections import Detections
+from core.ingest import load_image
+
+# YOLO typically detects cards as 'book' or 'cell phone'
+REFERENCE_LABELS = ('cell phone', 'book')
+CARD_WIDTH_CM = 8.56
+UNIT_DIVISOR = {"cm": 1, "m": 100, "ft": 30.48, "inch": 2.54}
+BATCH_IMGSZ = 640
+SPHERES = ('sports ball', 'orange', 'apple')
+CYLINDERS = ('bottle', 'cup')
+
+
+# --- SHAPE EXTRACTION ---
+# Har object ka asli outline: seg model ho to uska mask polygon, warna bounding box ke ROI ke
+# andar Otsu threshold + sabse bada contour (poore frame par nahi). Outline se rotated
+# min-area rectangle (tedhe rakhe parts bhi sahi length/breadth), contour area aur perimeter.
+# Contour na mile (plain background nahi, object ROI ka chhota hissa) to bounding box hi.
+def _roi_contour(gray, box, pad=4, min_fill=0.2):
+    h, w = gray.shape
+    x0, y0 = max(int(box[0]) - pad, 0), max(int(box[1]) - pad, 0)
+    x1, y1 = min(int(box[2]) + pad + 1, w), min(int(box[3]) + pad + 1, h)
+    roi = gray[y0:y1, x0:x1]
+    if roi.shape[0] < 8 or roi.shape[1] < 8:
+        return None
+    _, th = cv2.threshold(roi, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    # Object background se halka ho ya gehra: ROI ka border background maana jaata hai
+    border = np.concatenate([th[0], th[-1], th[:, 0], th[:, -1]])
+    if border.mean() > 127:
+        cv2.bitwise_not(th, dst=th)
+    contours, _ = cv2.findContours(th, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+    c = max(contours, key=cv2.contourArea)
+    if cv2.contourArea(c) < min_fill * (box[2] - box[0]) * (box[3] - box[1]):
+        return None
+    return c + np.array([x0, y0], np.int32)
+
+
+def shapes(dets, img=None):
+    """Per object (length_px, breadth_px, area_px, perimeter_px, corners (N,4,2), refined mask)."""
+    xyxy = dets.xyxy.astype(np.float64)
+    n = len(xyxy)
+    wh = xyxy[:, 2:] - xyxy[:, :2]
+    length, breadth = wh[:, 0].copy(), wh[:, 1].copy()
+    area = wh[:, 0] * wh[:, 1]
+    perim = 2 * (wh[:, 0] + wh[:, 1])
+    corners = np.stack([xyxy[:, [0, 1]], xyxy[:, [2, 1]], xyxy[:, [2, 3]], xyxy[:, [0, 3]]], axis=1)
+    refined = np.zeros(n, bool)
+
+    gray = None
+    if dets.segments is None and img is not None and n:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    for i in range(n):
+        if dets.segments is not None:
+            c = dets.segments[i]
+            if len(c) < 3:
+                continue
+        elif gray is not None:
+            c = _roi_contour(gray, xyxy[i])
+            if c is None:
+                continue
+        else:
+            break
+        rect = cv2.minAreaRect(c)
+        length[i], breadth[i] = rect[1]
+        area[i] = cv2.contourArea(c)
+        # Pixel contour ki seedhi-tedhi (staircase) edge perimeter badha deti hai: halka simplify
+        arc = cv2.arcLength(c, True)
+        perim[i] = cv2.arcLength(cv2.approxPolyDP(c, 0.002 * arc, True), True)
+        corners[i] = cv2.boxPoints(rect)
+        refined[i] = True
+    # Rotated rect mein koi fixed "width" nahi: lambi side length, chhoti breadth
+    length, breadth = np.maximum(length, breadth), np.minimum(length, breadth)
+    return length, breadth, area, perim, corners, refined
+
+
+# --- CALIBRATION ---
+def calibrate(labels, length_px, p2u_manual):
+    # Returns (cm-per-pixel, reference_found). Pehla reference object scale set karta hai.
+    for label, L in zip(labels, length_px):
+        if label in REFERENCE_LABELS and L > 0:
+            # Standard Card (lambi side) = 8.56 cm
+            return CARD_WIDTH_CM / float(L), True
+    return p2u_manual, False
+
+
+# --- CALCULATION ENGINE ---
+# Saare objects ke metrics ek saath NumPy arrays par; dict rows sirf UI/CSV ke liye end mein.
+def measure_arrays(dets, names, p2u_manual, unit, scale=1.0, img=None):
+    # scale: reduced decode (core.ingest) ke pixels -> original photo ke pixels; manual calibration
+    # original photo ke pixels par hai, card calibration par scale khud cancel ho jaata hai
+    labels = [names[c] for c in dets.cls.tolist()]
+    length, breadth, area_px, perim_px, corners, refined = shapes(dets, img)
+    p2u, found_ref = calibrate(labels, length * scale, p2u_manual)
+    k = p2u * scale / UNIT_DIVISOR[unit]
+
+    L, B = length * k, breadth * k
+    lab = np.array(labels, dtype=object)
+    sphere = np.isin(lab, SPHERES)
+    cylinder = np.isin(lab, CYLINDERS)
+    r = L / 2
+    volume = np.where(sphere, (4 / 3) * np.pi * r ** 3,
+                      np.where(cylinder, np.pi * (B / 2) ** 2 * L, L * B * ((L + B) / 2)))  # else: Est. Volume
+    return {"labels": labels, "length": L, "breadth": B, "perimeter": perim_px * k, "area": area_px * k * k,
+            "radius": np.where(sphere, r, np.nan), "volume": volume, "corners": corners, "refined": refined,
+            "found_ref": found_ref}
+
+
+def to_rows(m, unit):
+    stamp = f"AI-{int(time.time() % 10000)}"
+    cols = [np.round(m["length"], 2).tolist(), np.round(m["breadth"], 2).tolist(),
+            np.round(m["perimeter"], 2).tolist(), np.round(m["area"], 2).tolist(),
+            np.round(m["radius"], 2).tolist(), np.round(m["volume"], 3).tolist()]
+    rows = []
+    for label, L, B, P, A, R, V in zip(m["labels"], *cols):
+        row = {"ID": stamp, "Object": label.capitalize(), f"Length ({unit})": L, f"Breadth ({unit})": B,
+               f"Perimeter ({unit})": P, f"Area ({unit}²)": A}
+        if not math.isnan(R):
+            row[f"Radius ({unit})"] = R
+        row[f"Volume ({unit}³)"] = V
+        rows.append(row)
+    return rows
+
+
+def measure(dets, names, p2u_manual, unit, scale=1.0, img=None):
+    # Ek image ki saari detections -> (rows, reference_found). img ho to contour-based shapes
+    m = measure_arrays(dets, names, p2u_manual, unit, scale, img)
+    return to_rows(m, unit), m["found_ref"]
+
+
+# --- BATCH MODE ---
+# QC lot ke saikdon photos: decoding thread pool mein (PIL GIL chhod deta hai), detector
+# ek saath `batch_size` images par, aur rows seedha CSV mein stream hoti hain (RAM mein jama nahi).
+def batch_columns(unit):
+    return ["File", "Reference", "ID", "Object", f"Length ({unit})", f"Breadth ({unit})",
+            f"Perimeter ({unit})", f"Area ({unit}²)", f"Radius ({unit})", f"Volume ({unit}³)"]
+
+
+def lot_images(folder, root=config.BATCH_ROOT):
+    """`root` ke andar ke folder ki images (sorted). Root ke bahar (../, absolute path, symlink) ValueError."""
+    if not root:
+        raise ValueError("server folders band hain (AIV_BATCH_ROOT set nahi)")
+    root = os.path.realpath(root)
+    lot = os.path.realpath(os.path.join(root, folder))
+    if os.path.commonpath([root, lot]) != root:
+        raise ValueError(f"{folder!r} batch root ke bahar hai")
+    if not os.path.isdir(lot):
+        raise ValueError(f"{folder!r} folder nahi mila")
+    # Folder ke andar symlinks bhi root ke bahar na le jaayein
+    paths = (os.path.realpath(p) for ext in ("jpg", "jpeg", "png") for p in glob.glob(os.path.join(lot, f"*.{ext}")))
+    return sorted(p for p in paths if os.path.commonpath([root, p]) == root)
+
+
+def _source_name(source):
+    # source: uploaded file (Streamlit UploadedFile) ya disk path
+    return getattr(source, "name", None) or os.path.basename(source)
+
+
+def _decode(source):
+    # Detector ke size par reduced decode + EXIF fix; (img_bgr, scale)
+    return load_image(source, BATCH_IMGSZ)
+
+
+def _decoded(sources, workers, ahead):
+    # Bounded prefetch: sirf `ahead` images memory mein decode hoke wait karti hain
+    with ThreadPoolExecutor(workers) as pool:
+        it = iter(sources)
+        pending = deque((s, pool.submit(_decode, s)) for _, s in zip(range(ahead), it))
+        while pending:
+            source, fut = pending.popleft()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append((nxt, pool.submit(_decode, nxt)))
+            try:
+                yield _source_name(source), fut.result()
+            except Exception as e:
+                yield _source_name(source), e
+
+
+def run_batch(sources, model, out_csv, p2u_manual, unit, batch_size=8, workers=4):
+    """Measure every image in `sources`, appending rows to `out_csv`.
+
+    Generator: har detector batch ke baad progress dict yield karta hai
+    (done, total, rows, failed, images_per_s).
+    """
+    sources = list(sources)
+    total, done, n_rows, failed = len(sources), 0, 0, []
+    t0 = time.perf_counter()
+
+    with open(out_csv, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=batch_columns(unit), extrasaction="ignore")
+        writer.writeheader()
+
+        batch = []
+
+        def flush():
+            nonlocal done, n_rows
+            results = model.predict([img for _, (img, _) in batch], imgsz=BATCH_IMGSZ, verbose=False)
+            for (name, (img, scale)), result in zip(batch, results):
+                rows, found_ref = measure(Detections.from_result(result), model.names, p2u_manual, unit,
+                                          scale, img)
+                for row in rows:
+                    row["File"], row["Reference"] = name, "card" if found_ref else "manual"
+                writer.writerows(rows)
+                n_rows += len(rows)
+            fh.flush()
+            done += len(batch)
+            batch.clear()
+
+        for name, arr in _decoded(sources, workers, ahead=batch_size * 2):
+            if isinstance(arr, Exception):
+                failed.append(f"{name}: {arr}")
+                done += 1
+                continue
+            batch.append((name, arr))
+            if len(batch) == batch_size:
+                flush()
+                yield _progress(done, total, n_rows, failed, t0)
+        if batch:
+            flush()
+        yield _progress(done, total, n_rows, failed, t0)
+
+
+def _progress(done, total, rows, failed, t0):
+    elapsed = max(time.perf_counter() - t0, 1e-6)
+    return {"done": done, "total": total, "rows": rows, "failed": failed,
+            "images_per_s": round(done / elapsed, 2)}
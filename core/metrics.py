@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from core import config
+
+
+class _Stage:
+    __slots__ = ("metrics", "name", "t0")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.t0)
+
+
+class _Ring:
+    __slots__ = ("values", "idx", "count", "total")
+
+    def __init__(self, window):
+        self.values = np.zeros(window, np.float64)
+        self.idx = 0
+        self.count = 0
+        self.total = 0.0
+
+
+# --- PIPELINE METRICS ---
+# Hot path par sirf perf_counter + ek preallocated ring buffer mein write; percentiles
+# tabhi nikalte hain jab koi snapshot maange. Isliye production mein hamesha ON rakh sakte hain.
+class Metrics:
+    def __init__(self, pipeline, window=512):
+        self.pipeline = pipeline
+        self.window = window
+        self._stages = {}
+        self._counters = defaultdict(int)
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            ring = self._stages.get(name)
+            if ring is None:
+                ring = self._stages[name] = _Ring(self.window)
+            ring.values[ring.idx] = seconds
+            ring.idx = (ring.idx + 1) % self.window
+            ring.count += 1
+            ring.total += seconds
+
+    def inc(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def gauge(self, name, value):
+        self._gauges[name] = value
+
+    def samples(self, name):
+        # Stage ke recent samples (seconds, purane pehle jab tak ring bhara na ho): load tests apne
+        # aggregation/percentiles ke liye
+        with self._lock:
+            ring = self._stages.get(name)
+            if ring is None:
+                return np.zeros(0)
+            if ring.count <= self.window:
+                return ring.values[:ring.count].copy()
+            return np.roll(ring.values, -ring.idx)
+
+    def snapshot(self):
+        with self._lock:
+            stages = {}
+            for name, ring in self._stages.items():
+                recent = ring.values[:min(ring.count, self.window)] * 1000
+                p50, p95, p99 = np.percentile(recent, [50, 95, 99])
+                stages[name] = {"count": ring.count, "total_s": round(ring.total, 3),
+                                "mean_ms": round(float(recent.mean()), 3), "p50_ms": round(float(p50), 3),
+                                "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3)}
+            return {"pipeline": self.pipeline, "stages": stages,
+                    "counters": dict(self._counters), "gauges": dict(self._gauges)}
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_metrics(pipeline):
+    # Process-wide, har pipeline (page) ka ek Metrics: saare sessions ka data ek jagah
+    with _registry_lock:
+        m = _registry.get(pipeline)
+        if m is None:
+            m = _registry[pipeline] = Metrics(pipeline)
+            _start_textfile_writer()
+        return m
+
+
+def snapshot_all():
+    with _registry_lock:
+        pipelines = list(_registry.values())
+    return {"time": time.time(), "pipelines": [m.snapshot() for m in pipelines]}
+
+
+def snapshot_json():
+    return json.dumps(snapshot_all(), indent=2)
+
+
+# --- PROMETHEUS TEXT FORMAT ---
+def prometheus_text(prefix="aiv"):
+    lines = [f"# TYPE {prefix}_stage_seconds summary"]
+    counters, gauges = [], []
+    for snap in snapshot_all()["pipelines"]:
+        p = snap["pipeline"]
+        for stage, s in snap["stages"].items():
+            labels = f'pipeline="{p}",stage="{stage}"'
+            for q, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+                lines.append(f'{prefix}_stage_seconds{{{labels},quantile="{q}"}} {s[key] / 1000:.6f}')
+            lines.append(f"{prefix}_stage_seconds_sum{{{labels}}} {s['total_s']}")
+            lines.append(f"{prefix}_stage_seconds_count{{{labels}}} {s['count']}")
+        counters += [(name, p, v) for name, v in snap["counters"].items()]
+        gauges += [(name, p, v) for name, v in snap["gauges"].items()]
+    for name in sorted({c[0] for c in counters}):
+        lines.append(f"# TYPE {prefix}_{name}_total counter")
+        lines += [f'{prefix}_{name}_total{{pipeline="{p}"}} {v}' for n, p, v in counters if n == name]
+    for name in sorted({g[0] for g in gauges}):
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        lines += [f'{prefix}_{name}{{pipeline="{p}"}} {v}' for n, p, v in gauges if n == name]
+    return "\n".join(lines) + "\n"
+
+
+_writer = None
+
+
+def _start_textfile_writer():
+    global _writer
+    if _writer is not None or not config.METRICS_FILE:
+        return
+
+    def loop():
+        while True:
+            time.sleep(config.METRICS_INTERVAL)
+            tmp = config.METRICS_FILE + ".tmp"
+            with open(tmp, "w") as fh:
+                fh.write(prometheus_text())
+            # Atomic replace: collector kabhi adhi likhi file nahi padhta
+            os.replace(tmp, config.METRICS_FILE)
+
+    _writer = threading.Thread(target=loop, name="metrics-textfile", daemon=True)
+    _writer.start()
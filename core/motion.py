@@ -0,0 +1,76 @@
+import cv2
+import numpy as np
+
+
+# --- MOTION GATE ---
+# Detector chalane se pehle ek sasta check: chhote grayscale frame ka running background
+# (accumulateWeighted) se diff. Scene static ho to inference skip, pichhli detections hi
+# redraw hoti hain. `keepalive` seconds mein ek baar inference zabardasti chalti hai taaki
+# dheere badalne wale scenes (ya ruke hue objects) bhi kabhi-kabhi refresh hote rahein.
+# Instance thread-safe nahi hai: har stream/session apna MotionGate rakhe.
+class MotionGate:
+    def __init__(self, width=160, threshold=25, min_area=0.002, alpha=0.5, keepalive=2.0, pad=0.1):
+        self.width = width
+        self.threshold = threshold
+        # Frame area ka itna hissa badle tabhi motion maana jaata hai (noise/compression ignore)
+        self.min_area = min_area
+        # Background kitni jaldi naye frame ki taraf jaaye: zyada alpha = object hatne ke baad
+        # "ghost" jaldi mit jaata hai (0.5 par ~3 checks), kam alpha = dheemi motion bhi pakdi jaati hai
+        self.alpha = alpha
+        self.keepalive = keepalive
+        self.pad = pad
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        self.reset()
+
+    def reset(self):
+        self._bg = None
+        self._small = None
+        self._gray = None
+        self._last_fire = None
+        self.checked = 0
+        self.skipped = 0
+
+    def _mask(self, img):
+        h, w = img.shape[:2]
+        sh = max(1, round(h * self.width / w))
+        if self._small is None or self._small.shape[:2] != (sh, self.width):
+            self._small = np.empty((sh, self.width, 3), np.uint8)
+            self._gray = np.empty((sh, self.width), np.uint8)
+            self._bg = None
+        cv2.resize(img, (self.width, sh), dst=self._small, interpolation=cv2.INTER_AREA)
+        # Channel order se farak nahi padta: sirf change dekhna hai
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        cv2.GaussianBlur(self._gray, (5, 5), 0, dst=self._gray)
+        if self._bg is None:
+            self._bg = self._gray.astype(np.float32)
+            return None
+        diff = cv2.absdiff(self._gray, cv2.convertScaleAbs(self._bg))
+        cv2.accumulateWeighted(self._gray, self._bg, self.alpha)
+        _, mask = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+        return cv2.dilate(mask, self.kernel)
+
+    def check(self, img, t_now):
+        """Returns (moving, roi). roi = (x0, y0, x1, y1) full-res pixels mein, ya None (poora frame)."""
+        self.checked += 1
+        mask = self._mask(img)
+        if mask is None or self._last_fire is None or t_now - self._last_fire >= self.keepalive:
+            # Pehla frame / keepalive: poore frame par inference
+            self._last_fire = t_now
+            return True, None
+
+        if cv2.countNonZero(mask) < self.min_area * mask.size:
+            self.skipped += 1
+            return False, None
+
+        self._last_fire = t_now
+        x, y, bw, bh = cv2.boundingRect(mask)
+        h, w = img.shape[:2]
+        sx, sy = w / mask.shape[1], h / mask.shape[0]
+        px, py = self.pad * w, self.pad * h
+        x0, y0 = max(0, int(x * sx - px)), max(0, int(y * sy - py))
+        x1, y1 = min(w, int((x + bw) * sx + px)), min(h, int((y + bh) * sy + py))
+        return True, (x0, y0, x1, y1)
+
+    def stats(self):
+        return {"checked": self.checked, "skipped": self.skipped,
+                "skip_rate": round(self.skipped / self.checked, 3) if self.checked else 0.0}
@@ -0,0 +1,84 @@
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+
+@lru_cache(maxsize=512)
+def _text_size(text, scale, thickness):
+    return cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)[0]
+
+
+def _palette(n):
+    # Har class ka fixed, alag dikhne wala color (golden-ratio hue steps)
+    hsv = np.zeros((n, 1, 3), np.uint8)
+    hsv[:, 0, 0] = (np.arange(n) * 0.618 * 180).astype(int) % 180
+    hsv[:, 0, 1:] = 220
+    return [tuple(int(c) for c in px) for px in cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)[:, 0]]
+
+
+# --- OVERLAY RENDERER ---
+# results[0].plot() har call par poori annotated image allocate karta hai. Yeh renderer
+# caller ke frame buffer mein hi in-place draw karta hai, aur static layers (grid dimming LUT,
+# HUD panel + uske labels, class colors, text sizes) ek baar bana ke cache rakhta hai.
+class OverlayRenderer:
+    def __init__(self, thickness=2, font_scale=0.5):
+        self.thickness = thickness
+        self.font_scale = font_scale
+        self.palette = _palette(256)
+        self._grid_lut = (np.arange(256) // 2 + 40).astype(np.uint8)
+        self._hud_cache = {}
+
+    def grid(self, img, step):
+        # Speed Tracker ka graph grid: har `step` row/column ko precomputed LUT se dim karo,
+        # strided views par in-place (na temp arrays, na full-frame copy)
+        rows, cols = img[::step], img[:, ::step]
+        np.take(self._grid_lut, rows, out=rows)
+        np.take(self._grid_lut, cols, out=cols)
+        return img
+
+    def _hud_template(self, labels, size, channels):
+        key = (labels, size, channels)
+        tpl = self._hud_cache.get(key)
+        if tpl is None:
+            w, h = size
+            tpl = np.zeros((h, w, channels), np.uint8)
+            for i, label in enumerate(labels):
+                cv2.putText(tpl, label, (10, 25 + 25 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 1)
+            self._hud_cache[key] = tpl
+        return tpl
+
+    def hud(self, img, fields, origin=(10, 10), size=(240, 70)):
+        # fields: [(static label, dynamic value), ...]; sirf value har frame render hoti hai
+        labels = tuple(label for label, _ in fields)
+        tpl = self._hud_template(labels, size, img.shape[2])
+        x, y = origin
+        roi = img[y:y + tpl.shape[0], x:x + tpl.shape[1]]
+        np.copyto(roi, tpl[:roi.shape[0], :roi.shape[1]])
+        for i, (label, value) in enumerate(fields):
+            offset = _text_size(label, 0.6, 1)[0] + 18
+            cv2.putText(img, str(value), (x + offset, y + 25 + 25 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 1)
+        return img
+
+    def boxes(self, img, dets, names, labels=None, color=None):
+        # labels: optional per-box text (default "<class> <conf>"); color: sab boxes ke liye ek color
+        h, w = img.shape[:2]
+        for i, ((x1, y1, x2, y2), cls_idx) in enumerate(zip(dets.xyxy.astype(int), dets.cls)):
+            c = color or self.palette[cls_idx % len(self.palette)]
+            cv2.rectangle(img, (x1, y1), (x2, y2), c, self.thickness)
+            text = labels[i] if labels is not None else f"{names[cls_idx]} {dets.conf[i]:.2f}"
+            tw, th = _text_size(text, self.font_scale, 1)
+            ty = y1 - 4 if y1 - th - 8 >= 0 else y1 + th + 4
+            cv2.rectangle(img, (x1, ty - th - 4), (min(x1 + tw + 4, w - 1), ty + 4), c, -1)
+            cv2.putText(img, text, (x1 + 2, ty), cv2.FONT_HERSHEY_SIMPLEX, self.font_scale,
+                        (0, 0, 0), 1, cv2.LINE_AA)
+        return img
+
+    def outlines(self, img, corners, color=(0, 255, 255)):
+        # Measurement ke rotated rectangles (N, 4, 2): ek hi polylines call
+        if len(corners):
+            cv2.polylines(img, np.round(corners).astype(np.int32), True, color, self.thickness, cv2.LINE_AA)
+        return img
+
+
+renderer = OverlayRenderer()
@@ -0,0 +1,82 @@
+import json
+from urllib.parse import quote_plus
+
+from core import config
+
+# --- LOCAL RECOMMENDATION CATALOG ---
+# Mood -> music/movies. Network call nahi: links sirf YouTube search URLs hain jo user click kare to khulte
+# hain. `kids`: under-13 viewers ke liye safe (age filter isi par). AIV_MOOD_CATALOG se apna JSON
+# (isi shape ka) de sakte hain.
+CATALOG = {
+    "happy": [
+        {"title": "Pharrell Williams - Happy", "type": "music", "kids": True},
+        {"title": "Gallan Goodiyaan - Dil Dhadakne Do", "type": "music", "kids": True},
+        {"title": "Badtameez Dil - Yeh Jawaani Hai Deewani", "type": "music", "kids": True},
+        {"title": "Zindagi Na Milegi Dobara", "type": "movie", "kids": False},
+        {"title": "Paddington 2", "type": "movie", "kids": True},
+    ],
+    "sad": [
+        {"title": "Coldplay - Fix You", "type": "music", "kids": True},
+        {"title": "Kal Ho Naa Ho - Title Track", "type": "music", "kids": True},
+        {"title": "Inside Out", "type": "movie", "kids": True},
+        {"title": "Taare Zameen Par", "type": "movie", "kids": True},
+        {"title": "The Pursuit of Happyness", "type": "movie", "kids": False},
+    ],
+    "angry": [
+        {"title": "Weightless - Marconi Union", "type": "music", "kids": True},
+        {"title": "Kun Faya Kun - Rockstar", "type": "music", "kids": True},
+        {"title": "Kung Fu Panda", "type": "movie", "kids": True},
+        {"title": "Peaceful Warrior", "type": "movie", "kids": False},
+    ],
+    "surprise": [
+        {"title": "Queen - Don't Stop Me Now", "type": "music", "kids": True},
+        {"title": "Malang - Dhoom 3", "type": "music", "kids": True},
+        {"title": "Up", "type": "movie", "kids": True},
+        {"title": "Andhadhun", "type": "movie", "kids": False},
+    ],
+    "fear": [
+        {"title": "Bob Marley - Three Little Birds", "type": "music", "kids": True},
+        {"title": "Aal Izz Well - 3 Idiots", "type": "music", "kids": True},
+        {"title": "Finding Nemo", "type": "movie", "kids": True},
+        {"title": "Chak De! India", "type": "movie", "kids": True},
+    ],
+    "disgust": [
+        {"title": "Louis Armstrong - What a Wonderful World", "type": "music", "kids": True},
+        {"title": "Ilahi - Yeh Jawaani Hai Deewani", "type": "music", "kids": True},
+        {"title": "Ratatouille", "type": "movie", "kids": True},
+        {"title": "English Vinglish", "type": "movie", "kids": True},
+    ],
+    "neutral": [
+        {"title": "Lofi Hindi Chill Mix", "type": "music", "kids": True},
+        {"title": "Norah Jones - Come Away With Me", "type": "music", "kids": True},
+        {"title": "The Secret Life of Walter Mitty", "type": "movie", "kids": True},
+        {"title": "Swades", "type": "movie", "kids": True},
+    ],
+}
+KIDS_AGE = 13
+
+_catalog = None
+
+
+def catalog():
+    global _catalog
+    if _catalog is None:
+        if config.MOOD_CATALOG:
+            with open(config.MOOD_CATALOG, encoding="utf-8") as fh:
+                _catalog = json.load(fh)
+        else:
+            _catalog = CATALOG
+    return _catalog
+
+
+def recommend(mood, age=None, kind=None, n=5):
+    """Mood ke items (type filter optional); age < KIDS_AGE par sirf kids-safe."""
+    items = catalog().get(mood) or catalog().get("neutral", [])
+    out = []
+    for item in items:
+        if kind and item["type"] != kind:
+            continue
+        if age is not None and age < KIDS_AGE and not item.get("kids", False):
+            continue
+        out.append({**item, "link": "https://www.youtube.com/results?search_query=" + quote_plus(item["title"])})
+    return out[:n]
@@ -0,0 +1,221 @@
+import csv
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from core import config
+
+COLUMNS = ["time_s", "track_id", "class", "speed_mps", "accel_mps2", "distance_m", "over_limit"]
+EVENT_COLUMNS = ["time_s", "track_id", "class", "speed_mps", "limit_mps"]
+
+
+def _writer_loop(ref, stop, interval):
+    # Weakref: chalta writer thread log ko zinda na rakhe (session khatam -> GC -> thread band)
+    while not stop.wait(interval):
+        log = ref()
+        if log is None:
+            return
+        try:
+            log.flush()
+        except Exception as e:
+            # Disk full / file locked: thread zinda rahe aur ring khali karta rahe, error stats() mein
+            log.write_errors += 1
+            log.last_error = repr(e)
+        del log
+
+
+# --- SPEED EVENT LOG ---
+# Frame callback (VideoProcessor ka `sink`) sirf ek preallocated NumPy ring buffer mein likhta hai:
+# na file I/O, na per-track Python state. Ek background writer thread har `flush_interval` par ring
+# khali karke samples append-only CSV mein likhta hai, over-limit events (limit ke upar jaate hi,
+# har track ka rising edge) alag `*_events.csv` mein, aur per-ID summary update karta hai.
+# Writer peeche reh jaaye to ring sabse purane samples overwrite karta hai (`dropped` count hota hai),
+# callback kabhi wait nahi karta.
+class SpeedLog:
+    def __init__(self, path=None, names=None, limit_mps=None, capacity=8192, flush_interval=0.5,
+                 max_ids=5000):
+        if path is None:
+            directory = os.path.join(config.CACHE_DIR, "speedlog")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"radar-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{id(self):x}.csv")
+        self.path = path
+        self.events_path = os.path.splitext(path)[0] + "_events.csv"
+        self.names = names or {}
+        self.limit_mps = limit_mps
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.max_ids = max_ids
+
+        self._t = np.zeros(capacity, np.float64)
+        self._id = np.zeros(capacity, np.int64)
+        self._cls = np.zeros(capacity, np.int32)
+        self._v = np.zeros(capacity, np.float32)
+        self._a = np.zeros(capacity, np.float32)
+        self._dist = np.zeros(capacity, np.float32)
+        self._over = np.zeros(capacity, bool)
+        # Record ke waqt ki limit (NaN = koi limit nahi): baad mein limit badle to purane events na badlein
+        self._limit = np.zeros(capacity, np.float32)
+        # False = track ka pehla sample (speed abhi 0, maapi nahi gayi): summary ke avg/max mein nahi
+        self._known = np.zeros(capacity, bool)
+        self._head = 0   # ab tak likhe gaye samples (total)
+        self._tail = 0   # ab tak writer ne uthaye
+        self._lock = threading.Lock()
+
+        self.samples = 0
+        self.dropped = 0
+        self.events = 0
+        self.write_errors = 0
+        self.last_error = None
+        # id -> [cls, n, v_sum, v_max, dist, first, last, over_events, over_now]; n = speed samples
+        self._summary = OrderedDict()
+        self._summary_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        weakref.finalize(self, self._stop_event.set)
+
+    # --- hot path ---
+    def record(self, t, ids, clss, v, a, dist, known=None):
+        """VideoProcessor sink: O(n) vectorized copy, lock sirf index update ke liye.
+
+        known: har sample ke liye True agar track pehle se tha (speed maapi gayi); None = sab known.
+        """
+        n = len(ids)
+        if n == 0:
+            return
+        if known is None:
+            known = np.ones(n, bool)
+        if n > self.capacity:
+            ids, clss, v, a, dist, known = ids[-self.capacity:], clss[-self.capacity:], v[-self.capacity:], \
+                a[-self.capacity:], dist[-self.capacity:], known[-self.capacity:]
+            n = self.capacity
+        limit = self.limit_mps
+        with self._lock:
+            idx = (self._head + np.arange(n)) % self.capacity
+            self._t[idx] = t
+            self._id[idx] = ids
+            self._cls[idx] = clss
+            self._v[idx] = v
+            self._a[idx] = a
+            self._dist[idx] = dist
+            self._over[idx] = False if limit is None else (np.asarray(v) > limit) & known
+            self._limit[idx] = np.nan if limit is None else limit
+            self._known[idx] = known
+            self._head += n
+            overflow = self._head - self._tail - self.capacity
+            if overflow > 0:
+                self._tail += overflow
+                self.dropped += overflow
+            if self._thread is None:
+                self._start()
+
+    __call__ = record
+
+    # --- writer ---
+    def _start(self):
+        self._thread = threading.Thread(target=_writer_loop, name="speedlog-writer", daemon=True,
+                                        args=(weakref.ref(self), self._stop_event, self.flush_interval))
+        self._thread.start()
+
+    def _drain(self):
+        with self._lock:
+            lo, hi = self._tail, self._head
+            if lo == hi:
+                return None
+            idx = np.arange(lo, hi) % self.capacity
+            batch = (self._t[idx], self._id[idx], self._cls[idx], self._v[idx], self._a[idx],
+                     self._dist[idx], self._over[idx], self._limit[idx], self._known[idx])
+            self._tail = hi
+        return batch
+
+    def flush(self):
+        # Writer thread (ya close) se; caller ke thread par I/O hota hai, isliye callback se mat bulao
+        with self._io_lock:
+            batch = self._drain()
+            if batch is None:
+                return 0
+            t, ids, clss, v, a, dist, over, limit, known = batch
+            labels = [self.names.get(c, str(c)) for c in clss.tolist()]
+            events = self._update_summary(t, ids, clss, v, dist, over, known)
+            new = not os.path.exists(self.path)
+            with open(self.path, "a", newline="") as fh:
+                w = csv.writer(fh)
+                if new:
+                    w.writerow(COLUMNS)
+                w.writerows(zip(np.round(t, 3).tolist(), ids.tolist(), labels, np.round(v, 3).tolist(),
+                                np.round(a, 3).tolist(), np.round(dist, 3).tolist(), over.astype(int).tolist()))
+            if events:
+                new = not os.path.exists(self.events_path)
+                with open(self.events_path, "a", newline="") as fh:
+                    w = csv.writer(fh)
+                    if new:
+                        w.writerow(EVENT_COLUMNS)
+                    w.writerows((round(et, 3), eid, labels[k], round(ev, 3), round(float(limit[k]), 3))
+                                for k, et, eid, ev in events)
+            self.samples += len(ids)
+            self.events += len(events)
+            return len(ids)
+
+    def _update_summary(self, t, ids, clss, v, dist, over, known):
+        # Returns rising-edge over-limit events: [(batch_index, t, id, speed)]
+        events = []
+        with self._summary_lock:
+            s = self._summary
+            for k, (ti, i, c, vi, di, oi, ki) in enumerate(zip(t.tolist(), ids.tolist(), clss.tolist(),
+                                                                v.tolist(), dist.tolist(), over.tolist(),
+                                                                known.tolist())):
+                row = s.get(i)
+                if row is None:
+                    row = s[i] = [c, 0, 0.0, 0.0, 0.0, ti, ti, 0, False]
+                    if len(s) > self.max_ids:
+                        s.popitem(last=False)
+                else:
+                    s.move_to_end(i)
+                if ki:
+                    # Pehla (unknown) sample sirf first_seen deta hai; uski 0 speed avg ko neeche na kheenche
+                    row[1] += 1
+                    row[2] += vi
+                    row[3] = max(row[3], vi)
+                row[4] = max(row[4], di)
+                row[6] = ti
+                if oi and not row[8]:
+                    row[7] += 1
+                    events.append((k, ti, i, vi))
+                row[8] = oi
+        return events
+
+    # --- queries ---
+    def summary(self, min_samples=1):
+        """Per track: max/avg speed (m/s), distance (m), first/last seen, over-limit events. Latest pehle."""
+        with self._summary_lock:
+            items = list(self._summary.items())
+        out = []
+        for i, (c, n, v_sum, v_max, dist, first, last, n_over, _) in reversed(items):
+            if n < min_samples:
+                continue
+            out.append({"track_id": i, "class": self.names.get(c, str(c)),
+                        "samples": n, "max_mps": round(v_max, 3), "avg_mps": round(v_sum / n, 3),
+                        "distance_m": round(dist, 2), "first_seen": first, "last_seen": last,
+                        "over_limit_events": n_over})
+        return out
+
+    def track(self, track_id):
+        return next((r for r in self.summary() if r["track_id"] == track_id), None)
+
+    def stats(self):
+        with self._lock:
+            pending = self._head - self._tail
+        return {"samples": self.samples, "pending": pending, "dropped": self.dropped,
+                "events": self.events, "tracks": len(self._summary), "path": self.path,
+                "write_errors": self.write_errors, "error": self.last_error}
+
+    def close(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
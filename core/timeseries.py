@@ -0,0 +1,181 @@
+import csv
+import os
+import threading
+import time
+
+import numpy as np
+
+from core import config
+
+# (bucket seconds, kitne buckets): 1 min x 1 din, 15 min x 7 din, 1 h x 30 din
+RESOLUTIONS = ((60, 1440), (900, 672), (3600, 720))
+STATS = ("mean", "max", "sum")
+
+
+class _Level:
+    __slots__ = ("seconds", "slots", "bucket", "n", "sum", "max")
+
+    def __init__(self, seconds, slots, n_classes):
+        self.seconds = seconds
+        self.slots = slots
+        # Har slot kis absolute bucket (t // seconds) ka data rakhta hai; -1 = khaali
+        self.bucket = np.full(slots, -1, np.int64)
+        self.n = np.zeros(slots, np.int32)
+        self.sum = np.zeros((slots, n_classes), np.float32)
+        self.max = np.zeros((slots, n_classes), np.int32)
+
+
+# --- TIME-BUCKETED COUNT STORE ---
+# Har observation ek per-class histogram hai (np.bincount over dets.cls). Har resolution ek fixed
+# ring of buckets: naya bucket purane slot ko overwrite karta hai, isliye memory din/hafte bhar
+# chalne par bhi fixed rehti hai. Har bucket mein observations ki ginti, per-class sum aur max,
+# jisse mean (occupancy), max (peak) aur sum (events) teeno range queries seedha arrays se nikalte hain.
+#
+# `path` ho to levels disk par `.npz` mein bhi jaate hain (har `save_every` seconds, add ke andar),
+# aur start par wahin se load: server restart ke baad bhi din/hafte ke trends bache rehte hain.
+class CountStore:
+    def __init__(self, n_classes, resolutions=RESOLUTIONS, path=None, save_every=60.0):
+        self.n_classes = n_classes
+        self.levels = [_Level(sec, slots, n_classes) for sec, slots in sorted(resolutions)]
+        self.observations = 0
+        self._lock = threading.Lock()
+        self.path = path
+        self.save_every = save_every
+        self._saved_at = time.monotonic()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    @property
+    def resolutions(self):
+        return [lv.seconds for lv in self.levels]
+
+    def add(self, t, counts):
+        """Ek observation: `counts` (n_classes,) per-class histogram, time `t` (epoch seconds)."""
+        counts = np.asarray(counts)
+        with self._lock:
+            for lv in self.levels:
+                b = int(t // lv.seconds)
+                s = b % lv.slots
+                if lv.bucket[s] != b:
+                    if lv.bucket[s] > b:
+                        # Itna purana sample ki uska bucket overwrite ho chuka: is level mein jagah nahi
+                        continue
+                    lv.bucket[s] = b
+                    lv.n[s] = 0
+                    lv.sum[s] = 0
+                    lv.max[s] = 0
+                lv.n[s] += 1
+                lv.sum[s] += counts
+                np.maximum(lv.max[s], counts, out=lv.max[s])
+            self.observations += 1
+            due = self.path and time.monotonic() - self._saved_at > self.save_every
+        if due:
+            self.save()
+
+    def add_classes(self, t, cls):
+        # Detections ki class tensor se seedha: Python loop ke bina per-class histogram
+        self.add(t, class_histogram(cls, self.n_classes))
+
+    def _level(self, start, resolution):
+        if resolution is not None:
+            return next(lv for lv in self.levels if lv.seconds == resolution)
+        # Sabse fine resolution jiski retention `start` tak pahunchti hai
+        now = time.time()
+        for lv in self.levels:
+            if now - start <= lv.seconds * lv.slots:
+                return lv
+        return self.levels[-1]
+
+    def query(self, start, end=None, resolution=None, stat="mean", classes=None):
+        """Returns (bucket_start_times (T,), values (T, C)). Khaali buckets NaN (charts mein gap).
+
+        resolution=None: range ke hisaab se sabse fine available level.
+        """
+        if stat not in STATS:
+            raise ValueError(f"stat must be one of {STATS}")
+        end = time.time() if end is None else end
+        lv = self._level(start, resolution)
+        ids = np.arange(int(start // lv.seconds), int(end // lv.seconds) + 1, dtype=np.int64)
+        slots = ids % lv.slots
+        with self._lock:
+            ok = lv.bucket[slots] == ids
+            n = lv.n[slots]
+            if stat == "max":
+                values = lv.max[slots].astype(np.float32)
+            else:
+                values = lv.sum[slots].copy()
+        if stat == "mean":
+            values /= np.maximum(n, 1)[:, None]
+        values[~ok] = np.nan
+        if classes is not None:
+            values = values[:, classes]
+        return ids * lv.seconds, values
+
+    def active_classes(self):
+        # Jo classes kabhi dikhi (sabse lambe level mein), charts/CSV columns ke liye
+        lv = self.levels[-1]
+        with self._lock:
+            used = lv.bucket >= 0
+            peak = lv.max[used].max(axis=0) if used.any() else np.zeros(self.n_classes)
+        return np.flatnonzero(peak)
+
+    def to_csv(self, fh, names, start, end=None, resolution=None, stat="mean", classes=None):
+        # Wide CSV: bucket start (local time), phir har class ka column
+        classes = self.active_classes() if classes is None else np.asarray(classes)
+        times, values = self.query(start, end, resolution, stat, classes)
+        w = csv.writer(fh)
+        w.writerow(["bucket_start"] + [names[c] for c in classes])
+        keep = ~np.isnan(values).all(axis=1) if len(classes) else np.zeros(len(times), bool)
+        for t, row in zip(times[keep].tolist(), np.round(values[keep], 3).tolist()):
+            w.writerow([time.strftime("%Y-%m-%d %H:%M", time.localtime(t))] + row)
+
+    def save(self, path=None):
+        path = path or self.path
+        with self._lock:
+            arrays = {"shape": np.array([[lv.seconds, lv.slots] for lv in self.levels]),
+                      "observations": np.array(self.observations)}
+            for i, lv in enumerate(self.levels):
+                for field in ("bucket", "n", "sum", "max"):
+                    arrays[f"{field}{i}"] = getattr(lv, field).copy()
+            self._saved_at = time.monotonic()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    def load(self, path):
+        # Alag resolutions ya class count wali purani file chup-chaap ignore (naya store khaali shuru)
+        with np.load(path) as z:
+            shape = [(lv.seconds, lv.slots) for lv in self.levels]
+            if [tuple(r) for r in z["shape"].tolist()] != shape or z["sum0"].shape[1] != self.n_classes:
+                return False
+            with self._lock:
+                for i, lv in enumerate(self.levels):
+                    for field in ("bucket", "n", "sum", "max"):
+                        getattr(lv, field)[...] = z[f"{field}{i}"]
+                self.observations = int(z["observations"])
+        return True
+
+    def stats(self):
+        mb = sum(lv.sum.nbytes + lv.max.nbytes + lv.bucket.nbytes + lv.n.nbytes for lv in self.levels) / 2**20
+        return {"observations": self.observations, "memory_mb": round(mb, 2),
+                "retention_h": {lv.seconds: lv.seconds * lv.slots / 3600 for lv in self.levels}}
+
+
+def class_histogram(cls, n_classes):
+    return np.bincount(np.asarray(cls, np.int64), minlength=n_classes)[:n_classes]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def shared_count_store(name, n_classes):
+    # Process mein har naam ka ek store: saare viewers/sessions ek hi trends dekhte aur bharte hain,
+    # browser refresh ya tab band hone par data nahi jaata (disk par CACHE_DIR/trends/<name>.npz)
+    with _stores_lock:
+        store = _stores.get(name)
+        if store is None or store.n_classes != n_classes:
+            path = os.path.join(config.CACHE_DIR, "trends", f"{name}.npz")
+            store = _stores[name] = CountStore(n_classes, path=path)
+        return store
@@ -0,0 +1,142 @@
+import functools
+
+import numpy as np
+
+from core.detections import Detections
+
+
+# --- TRACK TABLE ---
+# Fixed-capacity, array-backed store: har slot ek track ID ka centroid, last measurement time,
+# velocity aur total distance rakhta hai. Jo track `ttl` seconds tak na dikhe uska slot
+# free ho jaata hai, isliye memory kabhi nahi badhti chahe din bhar mein kitne bhi IDs aayein.
+# `t` (speed ke liye dt) aur `seen` (TTL liveness) alag hain, taaki skipped frames par
+# tracks carry() se zinda rakhe ja sakein bina speed galat kiye.
+class TrackTable:
+    def __init__(self, capacity=256, ttl=3.0):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.ids = np.full(capacity, -1, np.int64)
+        self.xy = np.zeros((capacity, 2), np.float32)
+        self.t = np.zeros(capacity, np.float64)
+        self.seen = np.zeros(capacity, np.float64)
+        self.v = np.zeros(capacity, np.float32)      # m/s
+        self.dist = np.zeros(capacity, np.float32)   # m
+
+    def __len__(self):
+        return int(np.count_nonzero(self.ids >= 0))
+
+    def evict(self, t_now):
+        stale = (self.ids >= 0) & (t_now - self.seen > self.ttl)
+        self.ids[stale] = -1
+        return int(np.count_nonzero(stale))
+
+    def lookup(self, ids):
+        # ID -> slot index (ya -1), sorted active IDs par searchsorted se
+        ids = np.asarray(ids, np.int64)
+        active = np.flatnonzero(self.ids >= 0)
+        if len(active) == 0 or len(ids) == 0:
+            return np.full(len(ids), -1, np.int64)
+        order = active[np.argsort(self.ids[active])]
+        sorted_ids = self.ids[order]
+        pos = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+        return np.where(sorted_ids[pos] == ids, order[pos], -1)
+
+    def _allocate(self, n):
+        free = np.flatnonzero(self.ids < 0)
+        if len(free) < n:
+            # Table full: sabse purane (least recently seen) tracks ki jagah le lo
+            used = np.flatnonzero(self.ids >= 0)
+            oldest = used[np.argsort(self.seen[used])[:n - len(free)]]
+            free = np.concatenate([free, oldest])
+        return free[:n]
+
+    def assign(self, ids, t_now):
+        """Frame ke IDs ko slots do: (slots, known). Naye IDs ko free (ya sabse purane) slots milte hain."""
+        self.evict(t_now)
+        ids = np.asarray(ids, np.int64)
+        slots = self.lookup(ids)
+        known = slots >= 0
+        # Pehle hi touch karo taaki allocation inhe "oldest" samajh ke evict na kare
+        self.seen[slots[known]] = t_now
+
+        new = np.flatnonzero(~known)
+        if len(new):
+            s_new = self._allocate(len(new))
+            new = new[:len(s_new)]
+            slots[new] = s_new
+            self.ids[s_new] = ids[new]
+            self.t[s_new] = t_now
+            self.seen[s_new] = t_now
+            self.dist[s_new] = 0
+            self.v[s_new] = 0
+        return slots, known
+
+    def update(self, ids, centers, t_now, px_per_m):
+        """Ek frame ke saare tracks ek saath update karo.
+
+        Returns (known, speed, accel): `known` un tracks ke liye True hai jo pehle se table
+        mein the; speed m/s aur accel m/s² mein, naye tracks ke liye 0.
+        """
+        slots, known = self.assign(ids, t_now)
+        centers = np.asarray(centers, np.float32)
+        speed = np.zeros(len(slots), np.float32)
+        accel = np.zeros(len(slots), np.float32)
+
+        if known.any():
+            s = slots[known]
+            dt = np.maximum(t_now - self.t[s], 1e-6)
+            step_m = np.hypot(*(centers[known] - self.xy[s]).T) / px_per_m
+            speed[known] = step_m / dt
+            accel[known] = (speed[known] - self.v[s]) / dt
+            self.dist[s] += step_m
+
+        ok = slots >= 0
+        self.xy[slots[ok]] = centers[ok]
+        self.t[slots[ok]] = t_now
+        self.v[slots[ok]] = speed[ok]
+        return known, speed, accel
+
+    def carry(self, t_now):
+        # Inference skip hua (static scene): saare active tracks ko zinda rakho, measurements same
+        self.seen[self.ids >= 0] = t_now
+
+    def distance(self, ids):
+        slots = self.lookup(ids)
+        return np.where(slots >= 0, self.dist[slots], 0)
+
+
+# --- PER-SESSION TRACKER ---
+# Ultralytics ByteTrack, lekin detections bahar se aati hain (jaise BatchScheduler ka batch).
+# Har stream apna SessionTracker rakhta hai, isliye batched detection ke saath bhi ek
+# session ke IDs doosre session ke tracks se mix nahi hote.
+@functools.lru_cache(maxsize=None)
+def _tracker_cls():
+    from ultralytics.trackers.byte_tracker import BYTETracker
+
+    class SessionBYTETracker(BYTETracker):
+        # BYTETracker.__init__ global STrack ID counter 0 kar deta hai: naya session khulte hi
+        # chal rahe sessions naye objects ko purane (abhi zinda) IDs de dete. Counter process-wide chale.
+        @staticmethod
+        def reset_id():
+            pass
+
+    return SessionBYTETracker
+
+
+class SessionTracker:
+    def __init__(self, cfg="bytetrack.yaml", frame_rate=30):
+        from ultralytics.utils import YAML, IterableSimpleNamespace
+        from ultralytics.utils.checks import check_yaml
+        self.tracker = _tracker_cls()(IterableSimpleNamespace(**YAML.load(check_yaml(cfg))), frame_rate=frame_rate)
+
+    def update(self, dets, img=None):
+        # Returns sirf confirmed tracks, `ids` ke saath. Khaali frame bhi tracker ko do: frame_id aage
+        # badhta hai aur lost tracks `track_buffer` ke baad hat jaate hain (warna stale track naye
+        # object se match ho sakta hai). BYTETracker detections ko slice karta hai (`results[mask]`),
+        # len() leta hai aur `.xywh/.conf/.cls` padhta hai: Detections yeh sab deta hai.
+        tracks = self.tracker.update(dets, img)
+        if len(tracks) == 0:
+            return Detections.empty()
+        # Row: x1, y1, x2, y2, id, score, cls, det_idx
+        return Detections(tracks[:, :4].astype(np.float32), tracks[:, 5].astype(np.float32),
+                          tracks[:, 6].astype(np.int32), tracks[:, 4].astype(np.int32))
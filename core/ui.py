@@ -0,0 +1,55 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+from core import backends, config
+from core.inference import registry
+from core.metrics import get_metrics, prometheus_text, snapshot_json
+
+
+# --- SHARED STREAMLIT WIDGETS ---
+def history_panel(store, key, file_name, label="📥 Download CSV", per_page=50):
+    # Paginated view (newest first) + on-demand incremental CSV export
+    n_pages = store.n_pages(per_page)
+    page = st.number_input(f"Page (1-{n_pages}, newest first)", 1, n_pages, 1, key=f"{key}_page") - 1
+    st.dataframe(pd.DataFrame(store.page(page, per_page)))
+    st.caption(f"{len(store)} rows total")
+
+    ready_key = f"{key}_export"
+    if st.button("📦 Prepare Export", key=f"{key}_prepare"):
+        st.session_state[ready_key] = store.export_csv()
+    path = st.session_state.get(ready_key)
+    if path and os.path.exists(path):
+        with open(path, "rb") as fh:
+            st.download_button(label, fh, file_name, "text/csv", key=f"{key}_download",
+                               on_click=lambda: st.session_state.pop(ready_key, None))
+
+
+def metrics_panel(pipelines):
+    # Optional sidebar panel: rolling per-stage timings + counters, aur export
+    if not st.sidebar.toggle("📈 Pipeline Metrics", value=False, key="metrics_panel"):
+        return
+    st.sidebar.button("🔄 Refresh", key="metrics_refresh")
+    for name in pipelines:
+        snap = get_metrics(name).snapshot()
+        st.sidebar.markdown(f"**{name}**")
+        if snap["stages"]:
+            st.sidebar.dataframe(pd.DataFrame(snap["stages"]).T[["count", "p50_ms", "p95_ms", "p99_ms"]])
+        if snap["counters"] or snap["gauges"]:
+            st.sidebar.json({**snap["counters"], **snap["gauges"]}, expanded=False)
+    c1, c2 = st.sidebar.columns(2)
+    c1.download_button("JSON", snapshot_json(), "metrics.json", "application/json", key="metrics_json")
+    c2.download_button("Prometheus", prometheus_text(), "metrics.prom", "text/plain", key="metrics_prom")
+
+
+def backend_picker():
+    # Sidebar se inference backend; choice session mein saare pages par same rehti hai
+    current = st.session_state.get("aiv_backend", config.BACKEND)
+    choice = st.sidebar.selectbox("🧠 Inference Backend", backends.BACKENDS, index=backends.BACKENDS.index(current),
+                                  help="ONNX/OpenVINO pehli baar export hote hain (.cache/models), phir cache se load")
+    st.session_state.aiv_backend = choice
+    fallbacks = {e["fallback"] for e in registry.stats() if e["backend"] == choice and e["fallback"]}
+    if fallbacks:
+        st.sidebar.warning(f"{choice} load nahi hua, PyTorch par chal raha hai: {fallbacks.pop()}")
+    return choice
@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+
+import numpy as np
+
+from core import config
+from core.batching import worker_tag
+from core.inference import BOOT_T, SharedModel, first_inference_s
+from core.metrics import get_metrics
+
+
+# --- COLD START WARM-UP ---
+# Server boot par (Home ya koi bhi page pehli baar import ho) ek daemon thread detector
+# load karta hai aur har configured imgsz par ek dummy forward pass chala deta hai. Pehla
+# visitor weights load / pehli slow inference ka wait nahi karta. Heavy libs (ultralytics/
+# torch) bhi isi thread mein import hote hain, page render ke raaste mein nahi.
+_lock = threading.Lock()
+_thread = None
+_report = {"state": "pending", "import_s": None, "load_s": None, "warm_ms": {},
+           "boot_to_ready_s": None, "error": None}
+
+
+def _warm(model, imgsz, tag=None):
+    dummy = np.zeros((imgsz, imgsz, 3), np.uint8)
+    t0 = time.perf_counter()
+    with model.lease(tag, imgsz) as m:
+        # Lease ke andar seedha YOLO call: warm-up "first inference" metric mein count nahi hota
+        m.predict(dummy, imgsz=imgsz, verbose=False)
+    return time.perf_counter() - t0
+
+
+def warmup(weights=config.WEIGHTS, backend=config.BACKEND, sizes=config.WARMUP_IMGSZ, pool=config.WARMUP_POOL):
+    m = get_metrics("startup")
+    _report["state"] = "warming"
+    try:
+        t0 = time.perf_counter()
+        # Side-effect import: ultralytics + torch ka import time yahin (background thread) lag jaaye,
+        # page render ke raaste mein nahi; module khud yahan use nahi hota
+        import ultralytics  # noqa: F401
+        _report["import_s"] = round(time.perf_counter() - t0, 3)
+
+        # Torch ek copy sab sizes ke liye; exported backends har (snapped) imgsz ki apni copy rakhte hain
+        model = SharedModel(weights, backend)
+        sizes = sorted({model.snap(s) for s in sizes}) or [640]
+        for i, imgsz in enumerate(sizes):
+            t1 = time.perf_counter()
+            with model.lease(imgsz=imgsz):
+                if _report["load_s"] is None:
+                    _report["load_s"] = round(time.perf_counter() - t1, 3)
+            _report["warm_ms"][imgsz] = round(_warm(model, imgsz) * 1000, 1)
+            m.gauge(f"warm_ms_{imgsz}", _report["warm_ms"][imgsz])
+            # Warm copies pinned: idle TTL ke baad bhi loaded rahein (warna cold start laut aata)
+            model.pin(imgsz=imgsz)
+            if pool and i == 0:
+                # Live inference pool ke baaki workers ki apni copies bhi load ho jaayein
+                for slot in range(1, config.INFER_WORKERS):
+                    _warm(model, imgsz, tag=worker_tag(slot))
+                    model.pin(worker_tag(slot), imgsz)
+        _report["state"] = "ready"
+    except Exception as e:
+        _report["state"] = "failed"
+        _report["error"] = repr(e)
+    _report["boot_to_ready_s"] = round(time.monotonic() - BOOT_T, 3)
+    m.gauge("boot_to_ready_s", _report["boot_to_ready_s"])
+    if _report["load_s"] is not None:
+        m.gauge("model_load_s", _report["load_s"])
+    return report()
+
+
+def start_warmup():
+    # Idempotent: har page top par call kar sakta hai, thread process mein ek hi baar chalta hai
+    global _thread
+    if not config.WARMUP:
+        return
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=warmup, name="model-warmup", daemon=True)
+            _thread.start()
+
+
+def report():
+    return {**_report, "warm_ms": dict(_report["warm_ms"]), "time_to_first_inference_s": first_inference_s()}
+
+
+if __name__ == "__main__":
+    # Container build / readiness check: `python -m core.warmup` weights download + warm karke report deta hai
+    print(json.dumps(warmup(), indent=2))
@@ -1,10 +1,18 @@
 import streamlit as st
 import cv2
-import numpy as np
-from ultralytics import YOLO
-from PIL import Image
-import math
+from core.inference import shared_model
+from core.warmup import start_warmup
+from core.detections import Detections
+from core.overlay import renderer
+from core.cache import inference_cache, content_key
+from core.measurement import lot_images, measure_arrays, run_batch, to_rows
+from core.ingest import load_image
+from core.history import HistoryStore
+from core.ui import backend_picker, history_panel, metrics_panel
+from core.metrics import get_metrics
+from core import config
 import pandas as pd
+import os
 import time
 
 st.set_page_config(page_title="AI Precision Lab", layout="wide")
@@ -21,35 +29,8 @@ def show_instructions():
         """)
 
 # --- MODEL LOAD ---
-@st.cache_resource
-def load_yolo():
-    return YOLO("yolov8n.pt")
-
-model = load_yolo()
-
-# --- CALCULATION ENGINE ---
-def calculate_metrics(label, w_px, h_px, p2u, unit):
-    w, h = w_px * p2u, h_px * p2u
-    res = {
-        "ID": f"AI-{int(time.time() % 10000)}",
-        "Object": label.capitalize(),
-        f"Length ({unit})": round(w, 2),
-        f"Breadth ({unit})": round(h, 2),
-        f"Perimeter ({unit})": round(2*(w+h), 2),
-        f"Area ({unit}²)": round(w*h, 2)
-    }
-    
-    # 3D/Shape Specific
-    if label in ['sports ball', 'orange', 'apple']:
-        r = w / 2
-        res[f"Radius ({unit})"] = round(r, 2)
-        res[f"Volume ({unit}³)"] = round((4/3)*math.pi*(r**3), 3)
-    elif label in ['bottle', 'cup']:
-        r = w / 2
-        res[f"Volume ({unit}³)"] = round(math.pi*(r**2)*h, 3)
-    else:
-        res[f"Volume ({unit}³)"] = round(w*h*((w+h)/2), 3) # Est. Volume
-    return res
+model = shared_model(backend=backend_picker())
+start_warmup()
 
 # --- APP LAYOUT ---
 st.title("📏 Measurement Lab")
@@ -57,70 +38,107 @@ show_instructions()
 
 unit_choice = st.sidebar.selectbox("Select Unit", ["cm", "m", "ft", "inch"])
 p2u_manual = st.sidebar.number_input("Manual Calibration (if no card)", value=0.0264, format="%.5f")
+cache_stats = inference_cache.stats()
+st.sidebar.caption(f"⚡ Detection cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
 
 if 'history' not in st.session_state:
-    st.session_state.history = []
-
-def process_frame(img):
-    img_arr = np.array(img)
-    results = model(img_arr)
-    
-    # Calibration Step
-    p2u = p2u_manual
-    found_ref = False
-    
-    # YOLO typically detects cards as 'book' or 'cell phone'
-    # We will use 'cell phone' as a standard 15cm x 7cm reference if found
-    for box in results[0].boxes:
-        if model.names[int(box.cls[0])] in ['cell phone', 'book']:
-            b = box.xyxy[0].cpu().numpy()
-            ref_px_w = b[2] - b[0]
-            # Standard Card Width = 8.56 cm
-            p2u = 8.56 / ref_px_w 
-            found_ref = True
-            break
+    st.session_state.history = HistoryStore("measurements")
+if 'logged_keys' not in st.session_state:
+    st.session_state.logged_keys = set()
+
+metrics = get_metrics("measurement")
+
+def infer(img_arr):
+    with metrics.stage("infer"):
+        dets = Detections.from_result(model(img_arr)[0])
+    metrics.inc("frames_inferred")
+    metrics.inc("objects", len(dets))
+    metrics.gauge("objects_per_frame", len(dets))
+    return dets
+
+def process_frame(img_file):
+    metrics.inc("frames_in")
+    # Detector ke size par reduced decode (BGR); scale original photo ke pixels wapas deta hai
+    with metrics.stage("decode"):
+        img_arr, scale = load_image(img_file, 640)
+    # Same photo par rerun (unit/calibration change) -> cached detections, YOLO skip
+    key = content_key(img_file.getvalue(), model.ident, 640, img_arr.shape)
+    dets, _ = inference_cache.get_or_run(key, lambda: infer(img_arr))
+
+    # Calibration (reference card) + unit conversion + metrics; har box ke ROI mein contour ->
+    # rotated rectangle, saare objects ke numbers ek saath arrays par
+    with metrics.stage("measure"):
+        m = measure_arrays(dets, model.names, p2u_manual, unit_choice, scale, img_arr)
+        final_data, found_ref = to_rows(m, unit_choice), m["found_ref"]
             
     if found_ref: st.success("🎯 Reference Object Detected! Accuracy Optimized.")
     else: st.warning("⚠️ No reference card found. Using manual calibration.")
 
-    # Unit Conversion
-    if unit_choice == "m": p2u /= 100
-    elif unit_choice == "ft": p2u /= 30.48
-    elif unit_choice == "inch": p2u /= 2.54
-
-    final_data = []
-    for i, box in enumerate(results[0].boxes):
-        label = model.names[int(box.cls[0])]
-        b = box.xyxy[0].cpu().numpy()
-        data = calculate_metrics(label, b[2]-b[0], b[3]-b[1], p2u, unit_choice)
-        final_data.append(data)
-        st.session_state.history.append(data)
+    # History mein har photo sirf ek baar (reruns duplicate rows nahi banate)
+    if key not in st.session_state.logged_keys:
+        st.session_state.logged_keys.add(key)
+        st.session_state.history.extend(final_data)
         
-    return results[0].plot(), final_data
+    with metrics.stage("render"):
+        renderer.boxes(img_arr, dets, model.names)
+        return renderer.outlines(img_arr, m["corners"][m["refined"]]), final_data
+
+metrics_panel(["measurement"])
 
 # --- TABS ---
-t1, t2 = st.tabs(["📤 Image Upload", "📸 Real-time Capture"])
+t1, t2, t3 = st.tabs(["📤 Image Upload", "📸 Real-time Capture", "📦 Batch (QC Lot)"])
 
 with t1:
     f = st.file_uploader("Upload", type=['jpg','png','jpeg'])
     if f:
-        img = Image.open(f)
-        annotated_img, data = process_frame(img)
-        st.image(annotated_img)
+        annotated_img, data = process_frame(f)
+        st.image(annotated_img, channels="BGR")
         st.dataframe(pd.DataFrame(data))
 
 with t2:
     p = st.camera_input("Take Photo (Keep ATM Card in frame)")
     if p:
-        img = Image.open(p)
-        annotated_img, data = process_frame(img)
-        st.image(annotated_img)
+        annotated_img, data = process_frame(p)
+        st.image(annotated_img, channels="BGR")
         st.dataframe(pd.DataFrame(data))
 
+with t3:
+    st.caption("Poore lot ki photos ek saath measure karein. Har image ka apna reference-card calibration hota hai.")
+    lot_files = st.file_uploader("Upload Lot Images", type=['jpg','png','jpeg'], accept_multiple_files=True)
+    # Server folder sirf AIV_BATCH_ROOT ke andar (browser user server ki koi bhi directory na padh sake)
+    lot_dir = None
+    if config.BATCH_ROOT:
+        lot_dir = st.text_input(f"...ya server folder ({config.BATCH_ROOT} ke andar)", placeholder="lot-42")
+    b1, b2 = st.columns(2)
+    batch_size = b1.number_input("Batch Size", 1, 64, 8)
+    workers = b2.number_input("Decode Threads", 1, 32, 4)
+
+    sources = list(lot_files or [])
+    if lot_dir:
+        try:
+            sources += lot_images(lot_dir)
+        except ValueError as e:
+            st.error(f"⚠️ {e}")
+
+    if st.button(f"▶️ Measure {len(sources)} Images", disabled=not sources):
+        os.makedirs(os.path.join(config.CACHE_DIR, "batches"), exist_ok=True)
+        out_csv = os.path.join(config.CACHE_DIR, "batches", f"lot-{time.strftime('%Y%m%d-%H%M%S')}.csv")
+        bar, status = st.progress(0.0), st.empty()
+        for prog in run_batch(sources, model, out_csv, p2u_manual, unit_choice, batch_size, workers):
+            bar.progress(prog["done"] / prog["total"])
+            status.write(f"{prog['done']}/{prog['total']} images • {prog['rows']} rows • "
+                         f"{prog['images_per_s']} img/s")
+        for err in prog["failed"]:
+            st.warning(f"⚠️ Skipped {err}")
+        st.session_state.last_batch_csv = out_csv
+
+    if st.session_state.get("last_batch_csv") and os.path.exists(st.session_state.last_batch_csv):
+        st.dataframe(pd.read_csv(st.session_state.last_batch_csv, nrows=200))
+        with open(st.session_state.last_batch_csv, "rb") as fh:
+            st.download_button("📥 Download Lot CSV", fh, os.path.basename(st.session_state.last_batch_csv), "text/csv")
+
 # --- EXCEL EXPORT ---
 if st.session_state.history:
     st.divider()
     st.subheader("📊 Session History (Excel)")
-    df = pd.DataFrame(st.session_state.history)
-    st.dataframe(df)
-    st.download_button("📥 Download Excel Sheet", df.to_csv(index=False), "measurements.csv", "text/csv")
+    history_panel(st.session_state.history, "history", "measurements.csv", "📥 Download Excel Sheet")
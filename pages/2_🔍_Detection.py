@@ -1,10 +1,20 @@
 import streamlit as st
 import cv2
 import numpy as np
-from ultralytics import YOLO
-from PIL import Image
-from streamlit_webrtc import webrtc_streamer, RTCConfiguration
-import av
+from core.inference import shared_model
+from core.warmup import start_warmup
+from core.detections import Detections
+from core.live import LiveDetector
+from core.adaptive import AdaptiveController
+from core import config
+from core.ui import backend_picker, metrics_panel
+from core.metrics import get_metrics
+from core.overlay import renderer
+from core.cache import inference_cache, content_key
+from core.enhance import NightVision
+from core.motion import MotionGate
+from core.batching import shared_scheduler
+from core.ingest import load_image
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="AI Object Detection", layout="wide", initial_sidebar_state="collapsed")
@@ -51,10 +61,10 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # --- LOAD MODEL ---
-@st.cache_resource
-def load_yolo():
-    return YOLO('yolov8n.pt') 
-model = load_yolo()
+model = shared_model(backend=backend_picker())
+start_warmup()
+
+metrics_panel(["detection", "batching"])
 
 # --- HEADER ---
 st.markdown("<div class='main-title'>🔍 AI Object Detection</div>", unsafe_allow_html=True)
@@ -77,35 +87,100 @@ if uploaded_file: st.session_state.mode = "Browse"
 if btn_live: st.session_state.mode = "Live"
 
 processed_img = None
-detected_boxes = []
+raw_boxes = Detections.empty()
+
+metrics = get_metrics("detection")
+
+# Photo ek hi baar low floor par infer hoti hai (aur loose NMS ke saath); Confidence, class
+# filter aur NMS IoU baad mein raw arrays par NumPy se lagte hain, bina model dobara chalaye
+CONF_FLOOR = 0.05
+RAW_IOU = 0.9
+
+def infer_photo(img):
+    with metrics.stage("infer"):
+        dets = Detections.from_result(model.predict(img, conf=CONF_FLOOR, iou=RAW_IOU, imgsz=480)[0])
+    metrics.inc("frames_inferred")
+    metrics.inc("objects", len(dets))
+    return dets
+
+def detect_photo(img_file):
+    # Rerun (jaise slider move) par same photo dobara infer nahi hoti
+    metrics.inc("frames_in")
+    # 48 MP photo bhi seedha ~480-960 px par decode hoti hai (BGR, EXIF-rotated)
+    with metrics.stage("decode"):
+        img, _ = load_image(img_file, 480)
+    key = content_key(img_file.getvalue(), model.ident, 480, img.shape, CONF_FLOOR, RAW_IOU)
+    dets, _ = inference_cache.get_or_run(key, lambda: infer_photo(img))
+    return img, dets
 
 # --- ENGINES ---
 if st.session_state.mode == "Snap":
     cam_img = st.camera_input("Take a photo")
     if cam_img:
-        img = Image.open(cam_img)
-        res = model.predict(img, conf=0.3, imgsz=480)
-        processed_img, detected_boxes = res[0].plot(), res[0].boxes
+        processed_img, raw_boxes = detect_photo(cam_img)
 
 elif st.session_state.mode == "Browse" and uploaded_file:
-    img = Image.open(uploaded_file)
-    res = model.predict(img, conf=0.3, imgsz=480)
-    processed_img, detected_boxes = res[0].plot(), res[0].boxes
+    processed_img, raw_boxes = detect_photo(uploaded_file)
 
 elif st.session_state.mode == "Live":
+    # WebRTC stack (aiortc/av) sirf Live mode mein import hota hai
+    from streamlit_webrtc import webrtc_streamer, RTCConfiguration
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     RTC_CONFIG = RTCConfiguration({"iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]})
     
-    def video_frame_callback(frame):
-        img = frame.to_ndarray(format="bgr24")
-        results = model.predict(img, conf=0.3, imgsz=320, verbose=False)
-        return av.VideoFrame.from_ndarray(results[0].plot(), format="bgr24")
+    # Detector background mein sirf latest frame par chalta hai; beech ke frames
+    # pichhli detections ke saath redraw hote hain taaki video camera FPS par rahe
+    # Backend badalne par naya detector (exported backends ki apni imgsz ladder hoti hai)
+    if 'live_detector' not in st.session_state or st.session_state.live_detector.model.ident != model.ident:
+        st.session_state.live_detector = LiveDetector(model, conf=0.3, imgsz=320, controller=AdaptiveController(
+            target_ms=150, imgsz=320, imgsz_bounds=(config.IMGSZ_MIN, config.IMGSZ_MAX),
+            metrics=get_metrics("detection"), sizes=model.sizes))
+        st.session_state.live_controller = st.session_state.live_detector.controller
+        st.session_state.live_gate = MotionGate()
+    live = st.session_state.live_detector
+    live.night_mode = st.radio("🌙 Night Vision", NightVision.MODES, index=0, horizontal=True)
 
-    webrtc_streamer(key="yolo_live", video_frame_callback=video_frame_callback, 
+    # Adaptive quality: hardware ke hisaab se imgsz + inference rate khud tune hote hain
+    a1, a2 = st.columns(2)
+    adaptive = a1.toggle("⚙️ Adaptive Quality", value=True)
+    st.session_state.live_controller.target_ms = a2.slider("Frame Budget (ms)", 30, 500, 150)
+    live.controller = st.session_state.live_controller if adaptive else None
+
+    # Motion gate: static scene par detector idle rehta hai (CPU/battery bachti hai)
+    g1, g2 = st.columns(2)
+    motion_gate = g1.toggle("🏃 Motion Gate", value=True)
+    live.crop = g2.checkbox("Crop to motion", value=False, disabled=not motion_gate)
+    live.gate = st.session_state.live_gate if motion_gate else None
+
+    # Saare live sessions ek fixed-size inference pool share karte hain (full ho to frames drop, queue
+    # nahi badhti); batching on ho to kai users/cameras ke frames ek saath infer hote hain
+    live.scheduler = shared_scheduler(model, batch=st.toggle("📦 Batch across sessions", value=True))
+
+    webrtc_streamer(key="yolo_live", video_frame_callback=live.recv, 
                     rtc_configuration=RTC_CONFIG,
                     media_stream_constraints={"video": {"facingMode": "environment"}, "audio": False})
     st.markdown("</div>", unsafe_allow_html=True)
 
+    with st.expander("📈 Stream Stats"):
+        st.button("🔄 Refresh Stats")
+        stats = live.worker.stats()
+        s1, s2, s3, s4 = st.columns(4)
+        s1.metric("Frames In", stats["submitted"])
+        s2.metric("Inferred", stats["processed"])
+        s3.metric("Dropped", stats["dropped"])
+        s4.metric("Detector FPS", stats["infer_fps"])
+        if live.scheduler is not None:
+            bs = live.scheduler.stats()
+            st.caption(f"Inference pool: {bs['workers']} workers • {bs['batches']} batches • avg {bs['avg_batch']} "
+                       f"frames/batch • {bs['dropped'] + bs['timed_out']} frames dropped (overload)")
+        if live.gate is not None:
+            gs = live.gate.stats()
+            st.caption(f"Motion gate: {gs['skipped']} / {gs['checked']} static frames skipped ({gs['skip_rate']:.0%})")
+        if live.controller is not None:
+            op = live.controller.state()
+            st.caption(f"Operating point: imgsz {op['imgsz']} • interval {op['interval_ms']} ms • "
+                       f"latency {op['latency_ms']} ms (target {op['target_ms']} ms)")
+
 # --- CONDITIONAL RESULTS (Sirf tab dikhega jab photo hogi) ---
 if processed_img is not None:
     st.markdown("<div style='margin-top:20px;'></div>", unsafe_allow_html=True)
@@ -114,21 +189,33 @@ if processed_img is not None:
     with left:
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.write("### ⚙️ Settings")
-        conf = st.slider("Confidence", 0.1, 1.0, 0.35)
+        conf = st.slider("Confidence", CONF_FLOOR, 1.0, 0.35)
+        iou = st.slider("NMS IoU", 0.1, 0.9, 0.7)
+        present = sorted({model.names[c] for c in np.unique(raw_boxes.cls)})
+        include = st.multiselect("Only these classes", present)
+        exclude = st.multiselect("Hide classes", present)
         st.markdown("</div>", unsafe_allow_html=True)
+
+    # Slider/filter change par sirf NumPy masks + NMS dobara chalte hain
+    name_to_cls = {n: c for c, n in model.names.items()}
+    with metrics.stage("filter"):
+        detected_boxes = raw_boxes.filter(conf, classes=[name_to_cls[n] for n in include] or None,
+                                          exclude=[name_to_cls[n] for n in exclude] or None).nms(iou)
+    with metrics.stage("render"):
+        annotated = renderer.boxes(processed_img.copy(), detected_boxes, model.names)
         
     with mid:
         st.markdown("<div class='card'>", unsafe_allow_html=True)
-        st.image(processed_img, use_container_width=True)
+        st.image(annotated, channels="BGR", use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
         
     with right:
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.write("### 📋 Result")
         table_data = []
-        for box in detected_boxes:
-            label = model.names[int(box.cls[0])]
-            table_data.append({"Object": label, "Conf": f"{round(float(box.conf[0])*100,1)}%"})
+        for cls_idx, score in zip(detected_boxes.cls, detected_boxes.conf):
+            label = model.names[cls_idx]
+            table_data.append({"Object": label, "Conf": f"{round(float(score)*100,1)}%"})
         if table_data:
             st.table(table_data)
         else:
@@ -1,10 +1,18 @@
 import streamlit as st
-import cv2
-import numpy as np
-from ultralytics import YOLO
+import pandas as pd
+from core.inference import shared_model
+from core.warmup import start_warmup
+from core.enhance import NightVision
+from core.radar import VideoProcessor
+from core.ui import backend_picker, metrics_panel
+from core.adaptive import AdaptiveController
+from core.motion import MotionGate
+from core.batching import shared_scheduler
+from core.speedlog import SpeedLog
+from core.metrics import get_metrics
+from core import config
 from streamlit_webrtc import webrtc_streamer, RTCConfiguration
-import av
-import time
+import os
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Traffic AI Radar", layout="wide")
@@ -18,93 +26,103 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # --- LOAD MODEL (NANO) ---
-@st.cache_resource
-def load_yolo():
-    return YOLO('yolov8n.pt')
-model = load_yolo()
+model = shared_model(backend=backend_picker())
+start_warmup()
 
 # --- SIDEBAR CONTROLS ---
 st.sidebar.header("🚓 Radar & Grid Control")
 unit = st.sidebar.selectbox("Unit", ["km/h", "m/s", "cm/s"])
 grid_val = st.sidebar.slider("Grid Size (px)", 10, 200, 50)
 ppm = st.sidebar.slider("PPM (Calibration)", 10, 100, 35)
+UNIT_FACTOR = {"km/h": 3.6, "m/s": 1, "cm/s": 100}
+# Default limit ek hi m/s value se (~50 km/h), har unit mein wahi speed
+DEFAULT_LIMIT_MPS = 13.9
+speed_limit = st.sidebar.number_input(f"Speed Limit ({unit})", 0.0, 10000.0,
+                                      round(DEFAULT_LIMIT_MPS * UNIT_FACTOR[unit], 1))
+night_setting = st.sidebar.radio("🌙 Night Vision", NightVision.MODES, index=0, horizontal=True)
+
+# Adaptive quality: fixed imgsz=256 / 0.15s gate ki jagah latency-based tuning
+adaptive = st.sidebar.toggle("⚙️ Adaptive Quality", value=True)
+budget = st.sidebar.slider("Frame Budget (ms)", 30, 500, 80)
+if st.session_state.get('radar_controller_sizes', ()) != model.sizes:
+    st.session_state.radar_controller = AdaptiveController(
+        target_ms=budget, imgsz=256, imgsz_bounds=(config.IMGSZ_MIN, config.IMGSZ_MAX),
+        interval_bounds=(0.05, 0.5), metrics=get_metrics("speed_tracker"), sizes=model.sizes)
+    st.session_state.radar_controller_sizes = model.sizes
+controller = st.session_state.radar_controller
+controller.target_ms = budget
+if adaptive:
+    op = controller.state()
+    st.sidebar.caption(f"Operating point: imgsz {op['imgsz']} • every {op['interval_ms']} ms • "
+                       f"latency {op['latency_ms']} ms")
+# Motion gate: khaali/static road par tracker nahi chalta, active tracks zinda rehte hain
+motion_gate = st.sidebar.toggle("🏃 Motion Gate", value=True)
+# Detection shared inference pool mein (bounded: overload par frames drop), tracking har session ki apni.
+# Batching: sab radar sessions ki detection ek forward pass mein
+batching = st.sidebar.toggle("📦 Batch across sessions", value=True)
+metrics_panel(["speed_tracker", "batching"])
 
 # THE FIX: Data Storage (External to the Process)
-# Isme hum data store karenge bina ScriptRunContext error ke
-if 'radar_data' not in st.session_state:
-    st.session_state['radar_data'] = {}
-
-class VideoProcessor:
-    def __init__(self, unit_type, grid_size, ppm_val):
-        self.history = {}
-        self.unit = unit_type
-        self.grid = grid_size
-        self.ppm = ppm_val
-        self.last_t = time.time()
-
-    def recv(self, frame):
-        img = frame.to_ndarray(format="bgr24")
-        h, w = img.shape[:2]
-        t_now = time.time()
-
-        # 1. GRAPH GRID (Fast Slicing)
-        img[::self.grid, :, :] = img[::self.grid, :, :] // 2 + 40
-        img[:, ::self.grid, :] = img[:, ::self.grid, :] // 2 + 40
-
-        # 2. TRAFFIC ANALYSIS (Multi-Object)
-        # 0.15s delay ensures no lag for high-speed objects
-        if t_now - self.last_t > 0.15:
-            self.last_t = t_now
-            # imgsz=256 ensures high speed on all devices
-            results = model.track(img, persist=True, verbose=False, imgsz=256)
-
-            if results[0].boxes.id is not None:
-                boxes = results[0].boxes.xyxy.cpu().numpy()
-                ids = results[0].boxes.id.cpu().numpy().astype(int)
-                clss = results[0].boxes.cls.cpu().numpy().astype(int)
-
-                for box, obj_id, cls_idx in zip(boxes, ids, clss):
-                    x1, y1, x2, y2 = map(int, box)
-                    cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
-                    obj_name = model.names[cls_idx]
-                    
-                    if obj_id in self.history:
-                        prev = self.history[obj_id]
-                        dt = t_now - prev['t']
-                        dist_px = np.sqrt((cx-prev['x'])**2 + (cy-prev['y'])**2)
-                        
-                        v_mps = (dist_px / self.ppm) / dt
-                        factor = 3.6 if self.unit == "km/h" else (100 if self.unit == "cm/s" else 1)
-                        v_inst = v_mps * factor
-                        accel = (v_inst - prev['v']) / dt
-                        total_dist = prev['dist'] + (dist_px / self.ppm)
-
-                        if v_inst > 1.2:
-                            # 🟢 Draw Overlay on Video (No Thread Error here)
-                            cv2.rectangle(img, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                            cv2.putText(img, f"{obj_name} {int(v_inst)} {self.unit}", (x1, y1-10), 
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                            
-                            # HUD Display (Top Left)
-                            cv2.rectangle(img, (10, 10), (250, 80), (0, 0, 0), -1)
-                            cv2.putText(img, f"ID {obj_id} SPD: {int(v_inst)}", (20, 35), 0, 0.6, (0, 255, 0), 1)
-                            cv2.putText(img, f"ACCEL: {round(accel, 1)}", (20, 60), 0, 0.6, (0, 255, 0), 1)
-
-                        self.history[obj_id].update({'x':cx, 'y':cy, 't':t_now, 'v':v_inst, 'dist':total_dist})
-                    else:
-                        self.history[obj_id] = {'x':cx, 'y':cy, 't':t_now, 'v':0, 'dist':0}
-
-        return av.VideoFrame.from_ndarray(img, format="bgr24")
+# Isme hum data store karenge bina ScriptRunContext error ke: callback sirf SpeedLog ke ring buffer
+# mein likhta hai, background writer file + per-ID summary sambhalta hai
+if not isinstance(st.session_state.get('radar_data'), SpeedLog):
+    st.session_state['radar_data'] = SpeedLog(names=model.names)
+radar_log = st.session_state['radar_data']
+radar_log.limit_mps = speed_limit / UNIT_FACTOR[unit]
+
+# Processor session mein: rerun (Refresh Log, koi bhi widget) par tracks, speeds aur IDs bane rehte hain.
+# Naya processor sirf unit/grid/PPM/backend badalne par; baaki settings in-place
+radar_sig = (unit, grid_val, ppm, model.ident)
+if st.session_state.get('radar_sig') != radar_sig:
+    st.session_state.radar_processor = VideoProcessor(model, unit, grid_val, ppm, night_setting,
+                                                      sink=radar_log.record)
+    st.session_state.radar_gate = MotionGate()
+    st.session_state.radar_sig = radar_sig
+radar = st.session_state.radar_processor
+radar.night_mode = night_setting
+radar.controller = controller if adaptive else None
+radar.gate = st.session_state.radar_gate if motion_gate else None
+radar.scheduler = shared_scheduler(model, batching)
 
 # --- UI ---
 st.markdown("<div class='main-title'>🚦 MULTI-OBJECT AI TRAFFIC RADAR</div>", unsafe_allow_html=True)
 
 webrtc_streamer(
     key="traffic-radar-final",
-    video_frame_callback=VideoProcessor(unit, grid_val, ppm).recv,
+    video_frame_callback=radar.recv,
     rtc_configuration=RTCConfiguration({"iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]}),
     media_stream_constraints={"video": {"facingMode": "environment"}, "audio": False},
     async_processing=True,
 )
 
-st.success("Radar is active! Objects like Cars, Humans, Cycles, and Balls will be tracked automatically.")
\ No newline at end of file
+st.success("Radar is active! Objects like Cars, Humans, Cycles, and Balls will be tracked automatically.")
+
+# --- SPEED LOG (Enforcement Review) ---
+st.markdown("### 📋 Speed Log")
+st.button("🔄 Refresh Log")
+log_stats = radar_log.stats()
+l1, l2, l3, l4 = st.columns(4)
+l1.metric("Tracks", log_stats["tracks"])
+l2.metric("Samples", log_stats["samples"])
+l3.metric("Over-limit Events", log_stats["events"])
+l4.metric("Dropped", log_stats["dropped"])
+if log_stats["error"]:
+    st.warning(f"Log file write failed {log_stats['write_errors']}x (last: {log_stats['error']})")
+
+summary = radar_log.summary()
+if summary:
+    f = UNIT_FACTOR[unit]
+    df = pd.DataFrame(summary)
+    df[f"max ({unit})"] = (df.pop("max_mps") * f).round(1)
+    df[f"avg ({unit})"] = (df.pop("avg_mps") * f).round(1)
+    for col in ("first_seen", "last_seen"):
+        df[col] = pd.to_datetime(df[col], unit="s").dt.strftime("%H:%M:%S")
+    only_over = st.checkbox("Sirf over-limit tracks")
+    if only_over:
+        df = df[df["over_limit_events"] > 0]
+    st.dataframe(df, use_container_width=True)
+
+for label, path in (("📥 Samples CSV", radar_log.path), ("📥 Events CSV", radar_log.events_path)):
+    if os.path.exists(path):
+        with open(path, "rb") as fh:
+            st.download_button(label, fh, os.path.basename(path), "text/csv", key=path)
@@ -0,0 +1,104 @@
+import streamlit as st
+import pandas as pd
+from core.warmup import start_warmup
+from core.faces import FaceDetector, MoodPipeline, analyze_faces, attribute_fallback, attribute_model
+from core.recommend import KIDS_AGE, recommend
+from core.ingest import load_image
+from core.cache import content_key
+from core.overlay import renderer
+from core.ui import metrics_panel
+from core import config
+
+st.set_page_config(page_title="AI Mood Lab", layout="wide")
+start_warmup()
+
+# --- APP LAYOUT ---
+st.title("😊 Mood Based Recommendations")
+st.caption("Face → Mood, Age, Gender → Music & Movies (local catalog se, bina internet API ke)")
+
+# --- SIDEBAR ---
+st.sidebar.header("🧠 Mood Engine")
+MODELS = {"DeepFace": "deepface", "Stub (fast, testing)": "stub"}
+default = list(MODELS.values()).index(config.MOOD_MODEL) if config.MOOD_MODEL in MODELS.values() else 0
+model_name = MODELS[st.sidebar.selectbox("Attribute Model", list(MODELS), index=default)]
+refresh = st.sidebar.slider("Re-analyse every (s)", 1, 60, int(config.MOOD_REFRESH),
+                            help="Ek face track ka mood itne seconds baad dobara; beech mein cached result")
+kind = st.sidebar.radio("Recommend", ["All", "music", "movie"], horizontal=True)
+metrics_panel(["mood"])
+
+fallback = attribute_fallback(model_name)
+if fallback:
+    st.sidebar.warning(f"DeepFace load nahi hua, stub chal raha hai: {fallback}")
+
+
+def face_detector(**kwargs):
+    # OpenCV 5 par YuNet model pehli baar download hota hai; offline server par saaf error
+    try:
+        return FaceDetector(**kwargs)
+    except OSError as e:
+        st.error(f"Face detector load nahi hua (YuNet model download): {e}")
+        st.stop()
+
+
+def show_recommendations(mood, age):
+    if mood is None:
+        st.info("Koi face nahi mila. Camera ki taraf dekhein, achhi roshni mein.")
+        return
+    safe = age is not None and age < KIDS_AGE
+    st.subheader(f"🎧 Mood: {mood.capitalize()}" + (" • 🧒 Kids-safe" if safe else ""))
+    items = recommend(mood, age, None if kind == "All" else kind)
+    for item in items:
+        st.markdown(f"- {'🎵' if item['type'] == 'music' else '🎬'} [{item['title']}]({item['link']})")
+
+
+# --- TABS ---
+t1, t2 = st.tabs(["📸 Snapshot", "🎥 Live Mood"])
+
+with t1:
+    cam = st.camera_input("Take Photo")
+    upload = st.file_uploader("Ya photo upload karein", type=['jpg', 'png', 'jpeg'])
+    photo = cam or upload
+    if photo:
+        img, _ = load_image(photo, 960)
+        if 'face_detector' not in st.session_state:
+            st.session_state.face_detector = face_detector(width=480)
+        # Rerun (slider/radio) par same photo ka heavy analysis dobara nahi
+        key = content_key(photo.getvalue(), model_name)
+        if st.session_state.get('mood_snapshot', (None,))[0] != key:
+            with st.spinner("Analysing faces..."):
+                st.session_state.mood_snapshot = (key, *analyze_faces(img, st.session_state.face_detector,
+                                                                      attribute_model(model_name)))
+        _, faces, attrs = st.session_state.mood_snapshot
+        labels = [f"{a['mood']} {a['age']} {a['gender'][0]}" for a in attrs]
+        st.image(renderer.boxes(img, faces, {0: "face"}, labels=labels, color=(255, 200, 0)), channels="BGR")
+        if attrs:
+            st.table(pd.DataFrame([{k: v for k, v in a.items() if k != "scores"} for a in attrs]))
+            moods = pd.Series([a["mood"] for a in attrs])
+            show_recommendations(moods.mode()[0], min(a["age"] for a in attrs))
+        else:
+            show_recommendations(None, None)
+
+with t2:
+    from streamlit_webrtc import webrtc_streamer, RTCConfiguration
+
+    # Har session ki apni pipeline (apna face tracker + per-track mood cache); model badle to nayi
+    if st.session_state.get('mood_pipeline') is None or st.session_state.mood_pipeline.model_name != model_name:
+        st.session_state.mood_pipeline = MoodPipeline(model_name, detector=face_detector())
+    pipeline = st.session_state.mood_pipeline
+    pipeline.refresh = refresh
+
+    webrtc_streamer(
+        key="mood-live",
+        video_frame_callback=pipeline.recv,
+        rtc_configuration=RTCConfiguration({"iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]}),
+        media_stream_constraints={"video": {"facingMode": "user"}, "audio": False},
+        async_processing=True,
+    )
+    st.button("🔄 Refresh Mood")
+    rows = pipeline.tracks()
+    if rows:
+        st.dataframe(pd.DataFrame(rows))
+    stats = pipeline.worker.stats()
+    st.caption(f"{pipeline.analyzed} faces analysed • last {stats['latency_ms']} ms" +
+               (f" • error: {stats['error']}" if stats["error"] else ""))
+    show_recommendations(*pipeline.dominant())
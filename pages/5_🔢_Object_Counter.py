@@ -1,99 +1,230 @@
 import streamlit as st
 import cv2
 import numpy as np
-from ultralytics import YOLO
-from PIL import Image, ImageEnhance
+from core.inference import shared_model
+from core.warmup import start_warmup
+from core.detections import Detections
+from core.overlay import renderer
+from core.cache import inference_cache, content_key
+from core.counting import LineZone, PolygonZone, CountingProcessor
+from core.batching import shared_scheduler
+from core.enhance import NightVision
+from core.history import HistoryStore
+from core.timeseries import class_histogram, shared_count_store
+from core.ui import backend_picker, history_panel, metrics_panel
+from core.metrics import get_metrics
+from streamlit_webrtc import webrtc_streamer, RTCConfiguration
+from core.ingest import load_image
 import pandas as pd
+import tempfile
 import time
+import io
+import os
+from collections import OrderedDict
+from datetime import datetime
 
 st.set_page_config(page_title="Object Counter", layout="wide")
 
-# --- NIGHT VISION ENGINE ---
-def apply_night_vision(img):
-    # Convert PIL to OpenCV format
-    img_cv = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-    
-    # 1. CLAHE (Contrast Limited Adaptive Histogram Equalization)
-    lab = cv2.cvtColor(img_cv, cv2.COLOR_BGR2LAB)
-    l, a, b = cv2.split(lab)
-    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-    cl = clahe.apply(l)
-    limg = cv2.merge((cl,a,b))
-    final_img = cv2.cvtColor(limg, cv2.COLOR_LAB2BGR)
-    
-    # 2. Brightness & Sharpness boost using PIL
-    enhanced_img = Image.fromarray(cv2.cvtColor(final_img, cv2.COLOR_BGR2RGB))
-    enhancer = ImageEnhance.Brightness(enhanced_img)
-    enhanced_img = enhancer.enhance(1.5) # Increase brightness by 50%
-    
-    return enhanced_img
-
 # --- APP UI ---
 st.title("🔢 Object Counter")
 st.sidebar.header("🌙 Vision Settings")
 night_mode = st.sidebar.toggle("Enable Night Vision Mode", value=False)
+night_auto = st.sidebar.checkbox("Auto (sirf low light mein)", value=False, disabled=not night_mode)
+night_setting = ("Auto" if night_auto else "On") if night_mode else "Off"
 
 if night_mode:
     st.sidebar.info("Night Vision Active: Enhancing low-light visibility.")
 
-# Load Model
-@st.cache_resource
-def load_yolo():
-    return YOLO("yolov8n.pt")
+# Har session ka apna enhancer (CLAHE + buffers reuse hote hain)
+if 'night_vision' not in st.session_state:
+    st.session_state.night_vision = NightVision()
 
-model = load_yolo()
+# Load Model
+model = shared_model(backend=backend_picker())
+start_warmup()
 
 if 'count_history' not in st.session_state:
-    st.session_state.count_history = []
+    st.session_state.count_history = HistoryStore("counts")
+# Already-logged photos (rerun par dobara count nahi); sirf haal ke keys, session bhar badhta nahi
+if not isinstance(st.session_state.get('logged_keys'), OrderedDict):
+    st.session_state.logged_keys = OrderedDict()
+LOGGED_KEYS_MAX = 256
+# Occupancy trends: 1 min / 15 min / 1 h buckets, fixed memory. Process-wide + disk par: saare viewers
+# ek hi store, browser refresh / server restart ke baad bhi hours/days ke trends bane rehte hain
+count_store = shared_count_store(os.path.splitext(os.path.basename(model.weights))[0], len(model.names))
+
+# --- CROSSING ZONE (Live + Video) ---
+st.sidebar.header("🚧 Counting Line")
+zone_type = st.sidebar.selectbox("Zone", ["Horizontal Line", "Vertical Line", "Polygon"])
+if zone_type == "Polygon":
+    poly_text = st.sidebar.text_input("Polygon (relative x,y; ...)", "0.2,0.3; 0.8,0.3; 0.8,0.9; 0.2,0.9")
+else:
+    line_pos = st.sidebar.slider("Line Position (%)", 5, 95, 50)
+
+def build_zone(w, h):
+    # Sidebar settings relative hain, frame size milne par pixels mein convert
+    if zone_type == "Horizontal Line":
+        # Left->right line: top->bottom movement = In
+        y = h * line_pos / 100
+        return LineZone((0, y), (w, y))
+    if zone_type == "Vertical Line":
+        # Bottom->top line: iska right side screen ka right hai, yaani left->right movement = In
+        x = w * line_pos / 100
+        return LineZone((x, h), (x, 0))
+    pts = [tuple(map(float, p.split(","))) for p in poly_text.split(";") if p.strip()]
+    return PolygonZone([(x * w, y * h) for x, y in pts])
+
+cache_stats = inference_cache.stats()
+st.sidebar.caption(f"⚡ Detection cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
 
-def process_and_count(img):
-    # Apply Night Vision if toggled
-    if night_mode:
-        img = apply_night_vision(img)
+metrics = get_metrics("counter")
+metrics_panel(["counter", "batching"])
+
+def infer(img_arr):
+    with metrics.stage("infer"):
+        dets = Detections.from_result(model(img_arr)[0])
+    metrics.inc("frames_inferred")
+    metrics.inc("objects", len(dets))
+    metrics.gauge("objects_per_frame", len(dets))
+    return dets
+
+def process_and_count(img_file):
+    metrics.inc("frames_in")
+    # Detector ke size par reduced decode (BGR, EXIF-rotated)
+    with metrics.stage("decode"):
+        img_arr, _ = load_image(img_file, 640)
+    # Apply Night Vision if toggled (in-place, NumPy buffer par)
+    with metrics.stage("preprocess"):
+        night_on = st.session_state.night_vision.process(img_arr, night_setting, bgr=True)
     
-    img_arr = np.array(img)
-    results = model(img_arr)
+    # Rerun par same photo + same mode -> cached detections
+    key = content_key(img_file.getvalue(), model.ident, 640, img_arr.shape, night_on)
+    dets, _ = inference_cache.get_or_run(key, lambda: infer(img_arr))
     
-    counts = {}
-    for box in results[0].boxes:
-        label = model.names[int(box.cls[0])]
-        counts[label] = counts.get(label, 0) + 1
+    # Per-class histogram ek bincount mein (per-box Python loop nahi)
+    with metrics.stage("count"):
+        hist = class_histogram(dets.cls, len(model.names))
     
-    summary = []
-    current_time = time.strftime("%H:%M:%S")
-    for obj, qty in counts.items():
-        data = {"Time": current_time, "Object": obj.capitalize(), "Count": qty, "Mode": "Night" if night_mode else "Day"}
-        summary.append(data)
-        st.session_state.count_history.append(data)
+    now = time.time()
+    current_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+    mode = "Night" if night_on else "Day"
+    summary = [{"Time": current_time, "Object": model.names[c].capitalize(), "Count": int(hist[c]), "Mode": mode}
+               for c in np.flatnonzero(hist)]
+
+    logged = st.session_state.logged_keys
+    if key not in logged:
+        logged[key] = None
+        while len(logged) > LOGGED_KEYS_MAX:
+            logged.popitem(last=False)
+        st.session_state.count_history.extend(summary)
+        count_store.add(now, hist)
         
-    return results[0].plot(), summary, img
+    with metrics.stage("render"):
+        return renderer.boxes(img_arr.copy(), dets, model.names), summary, img_arr
 
 # --- TABS ---
-t1, t2 = st.tabs(["🖼️ Image Upload", "📸 Live Capture"])
+t1, t2, t3, t4 = st.tabs(["🖼️ Image Upload", "📸 Live Capture", "🎥 Live Counter", "🎞️ Video File"])
 
 with t1:
     up_file = st.file_uploader("Upload Image", type=['jpg','png','jpeg'])
     if up_file:
-        img_raw = Image.open(up_file)
-        annotated_img, summary, processed_raw = process_and_count(img_raw)
+        annotated_img, summary, processed_raw = process_and_count(up_file)
         
         c1, c2 = st.columns(2)
         with c1:
-            st.image(processed_raw, caption="Enhanced Image (Night Vision)")
+            st.image(processed_raw, caption="Enhanced Image (Night Vision)", channels="BGR")
         with c2:
-            st.image(annotated_img, caption="AI Detection")
+            st.image(annotated_img, caption="AI Detection", channels="BGR")
         st.table(pd.DataFrame(summary))
 
 with t2:
     p = st.camera_input("Snapshot")
     if p:
-        img_raw = Image.open(p)
-        annotated_img, summary, processed_raw = process_and_count(img_raw)
-        st.image(annotated_img)
+        annotated_img, summary, processed_raw = process_and_count(p)
+        st.image(annotated_img, channels="BGR")
         st.table(pd.DataFrame(summary))
 
+with t3:
+    # Zone settings (ya backend) badalne par naya processor (naye counts)
+    zone_sig = (zone_type, poly_text if zone_type == "Polygon" else line_pos, model.ident)
+    if st.session_state.get("live_counter_sig") != zone_sig:
+        # Har session ka apna tracker; detection shared, bounded inference pool mein
+        st.session_state.live_counter = CountingProcessor(model, build_zone, scheduler=shared_scheduler(model),
+                                                          store=count_store)
+        st.session_state.live_counter_sig = zone_sig
+    live_counter = st.session_state.live_counter
+    live_counter.night_mode = night_setting
+
+    webrtc_streamer(
+        key="line-counter",
+        video_frame_callback=live_counter.recv,
+        rtc_configuration=RTCConfiguration({"iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]}),
+        media_stream_constraints={"video": {"facingMode": "environment"}, "audio": False},
+        async_processing=True,
+    )
+    st.button("🔄 Refresh Counts")
+    live_summary = live_counter.summary()
+    if live_summary:
+        st.table(pd.DataFrame(live_summary))
+
+with t4:
+    vid = st.file_uploader("Upload Video", type=['mp4', 'avi', 'mov', 'mkv'])
+    if vid and st.button("▶️ Count Crossings"):
+        with tempfile.NamedTemporaryFile(suffix=vid.name[vid.name.rfind("."):]) as tmp:
+            tmp.write(vid.getvalue())
+            tmp.flush()
+            cap = cv2.VideoCapture(tmp.name)
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30
+            n_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 1
+            proc = CountingProcessor(model, build_zone, imgsz=640, night_mode=night_setting)
+            bar, preview = st.progress(0.0), st.empty()
+            idx = 0
+            while True:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                # Video time (wall clock nahi) taaki TTL file ki apni speed se chale
+                proc.process(frame, idx / fps)
+                idx += 1
+                if idx % 15 == 0:
+                    bar.progress(min(idx / n_frames, 1.0))
+                    preview.image(frame, channels="BGR")
+            cap.release()
+            bar.progress(1.0)
+        video_summary = proc.summary()
+        if video_summary:
+            st.table(pd.DataFrame(video_summary))
+        else:
+            st.write("No crossings found.")
+
+# --- OCCUPANCY TRENDS ---
+if count_store.observations:
+    st.divider()
+    st.subheader("📈 Occupancy Trends")
+    RANGES = {"Last 1 hour": 3600, "Last 6 hours": 6 * 3600, "Last 24 hours": 86400,
+              "Last 7 days": 7 * 86400, "Last 30 days": 30 * 86400}
+    RES_LABELS = {60: "1 min", 900: "15 min", 3600: "1 hour"}
+    r1, r2, r3 = st.columns(3)
+    span = RANGES[r1.selectbox("Range", list(RANGES))]
+    res_choice = r2.selectbox("Resolution", ["Auto"] + [RES_LABELS[r] for r in count_store.resolutions])
+    resolution = None if res_choice == "Auto" else next(r for r, label in RES_LABELS.items() if label == res_choice)
+    stat = r3.selectbox("Value", ["mean", "max"], help="Bucket mein average ya peak objects per frame")
+    active = count_store.active_classes()
+    picked = st.multiselect("Classes", [model.names[c] for c in active])
+    classes = [c for c in active if model.names[c] in picked] or list(active)
+
+    start = time.time() - span
+    times, values = count_store.query(start, resolution=resolution, stat=stat, classes=classes)
+    trend = pd.DataFrame(values, columns=[model.names[c] for c in classes],
+                         index=pd.to_datetime(times, unit="s", utc=True).tz_convert(
+                             datetime.now().astimezone().tzinfo))
+    st.line_chart(trend)
+    buf = io.StringIO()
+    count_store.to_csv(buf, model.names, start, resolution=resolution, stat=stat, classes=classes)
+    st.download_button("📥 Export Trend CSV", buf.getvalue(), "occupancy_trend.csv", "text/csv")
+    st.caption(f"{count_store.observations} observations • {count_store.stats()['memory_mb']} MB fixed")
+
 # --- EXCEL LOG ---
 if st.session_state.count_history:
     st.divider()
-    df = pd.DataFrame(st.session_state.count_history)
-    st.download_button("📥 Export Report", df.to_csv(index=False), "count_report.csv")
+    history_panel(st.session_state.count_history, "count_history", "count_report.csv", "📥 Export Report")
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from core.batching import BatchScheduler, Overloaded
+from core.metrics import Metrics
+
+
+class FlakyModel:
+    """Pehli call par post-processing fail (result mein boxes hi nahi), baad mein khaali results."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def snap(self, imgsz):
+        return imgsz
+
+    def predict(self, source, tag=None, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            return [object() for _ in source]
+        return [type("Result", (), {"boxes": None})() for _ in source]
+
+
+def test_worker_survives_failed_batch():
+    sched = BatchScheduler(FlakyModel(), max_batch=1, workers=1, timeout=2.0, metrics=Metrics("test"))
+    img = np.zeros((32, 32, 3), np.uint8)
+    with pytest.raises(AttributeError):
+        sched.infer(img)
+    # Wahi worker agla frame process kare (timeout -> Overloaded nahi)
+    assert len(sched.infer(img)) == 0
+    assert sched.stats()["workers"] == 1
+
+
+def test_full_queue_raises_overloaded():
+    sched = BatchScheduler(FlakyModel(), max_pending=0, metrics=Metrics("test"))
+    with pytest.raises(Overloaded):
+        sched.submit(np.zeros((32, 32, 3), np.uint8))
+    assert sched.stats()["dropped"] == 1
@@ -0,0 +1,32 @@
+import os
+
+import numpy as np
+
+from core.cache import InferenceCache
+from core.detections import Detections
+
+
+def _dets(n):
+    return Detections(np.zeros((n, 4), np.float32), np.ones(n, np.float32), np.zeros(n, np.int32))
+
+
+def test_disk_layer_prunes_least_recent(tmp_path):
+    probe = InferenceCache(1, str(tmp_path / "probe"))
+    probe.put("x", _dets(50))
+    size = probe.disk_bytes
+    cache = InferenceCache(1, str(tmp_path / "d"), max_bytes=2 * size)
+    cache.put("a", _dets(50))
+    cache.put("b", _dets(50))
+    assert cache.get("a") is not None   # RAM mein sirf "b"; "a" disk se, ab most recent
+    cache.put("c", _dets(50))
+    assert sorted(os.listdir(tmp_path / "d")) == ["a.npz", "c.npz"]
+    assert cache.disk_bytes <= cache.max_bytes
+
+
+def test_budget_applies_to_existing_files(tmp_path):
+    cache = InferenceCache(1, str(tmp_path), max_bytes=10**9)
+    for k in "abcd":
+        cache.put(k, _dets(50))
+    again = InferenceCache(1, str(tmp_path), max_bytes=cache.disk_bytes // 2)
+    assert again.stats()["disk_entries"] == 2
+    assert len(os.listdir(tmp_path)) == 2
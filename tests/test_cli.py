@@ -0,0 +1,50 @@
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from core.cli import _run_chain
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (64, 48))
+    for i in range(100):
+        writer.write(np.full((48, 64, 3), i, np.uint8))
+    writer.release()
+    return path
+
+
+def run_with_deadline(fn, seconds=10):
+    # Hang ho to test fail ho, suite atke nahi
+    out = {}
+
+    def target():
+        try:
+            out["result"] = fn()
+        except Exception as e:
+            out["error"] = e
+
+    t = threading.Thread(target=target, daemon=True)
+    t.start()
+    t.join(seconds)
+    assert not t.is_alive(), "_run_chain hung"
+    return out
+
+
+@pytest.mark.parametrize("annotate", [False, True])
+def test_failing_process_does_not_hang(video, tmp_path, annotate):
+    def process(frame, t):
+        if t > 0.1:
+            raise ValueError("boom")
+        return frame
+
+    out = run_with_deadline(lambda: _run_chain(video, process, str(tmp_path / "out.mp4") if annotate else None))
+    assert isinstance(out.get("error"), ValueError)
+
+
+def test_chain_processes_every_frame(video, tmp_path):
+    out = run_with_deadline(lambda: _run_chain(video, lambda frame, t: frame, str(tmp_path / "out.mp4")))
+    assert out["result"][0] == 100
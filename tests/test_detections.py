@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from core.detections import Detections
+
+
+class _Tensor:
+    def __init__(self, a):
+        self.a = a
+        self.transfers = 0
+
+    def cpu(self):
+        self.transfers += 1
+        return self
+
+    def numpy(self):
+        return self.a
+
+
+class _Boxes:
+    # Sirf `data`: conf/cls/id alag se padhe to AttributeError
+    def __init__(self, rows):
+        self.data = _Tensor(np.array(rows, np.float32))
+
+    def __len__(self):
+        return len(self.data.a)
+
+
+def test_from_result_predict_rows():
+    boxes = _Boxes([[0, 0, 10, 10, 0.9, 2], [5, 5, 20, 20, 0.4, 0]])
+    d = Detections.from_result(SimpleNamespace(boxes=boxes, masks=None))
+    assert d.conf.tolist() == [np.float32(0.9), np.float32(0.4)]
+    assert d.cls.tolist() == [2, 0]
+    assert d.ids is None
+    assert boxes.data.transfers == 1
+
+
+def test_from_result_track_rows():
+    boxes = _Boxes([[0, 0, 10, 10, 7, 0.9, 2]])
+    d = Detections.from_result(SimpleNamespace(boxes=boxes, masks=None))
+    assert d.ids.tolist() == [7]
+    assert d.cls.tolist() == [2]
+    assert d.xyxy.tolist() == [[0, 0, 10, 10]]
+
+
+def test_xywh_is_center_and_size():
+    d = Detections(np.array([[10, 20, 30, 60]], np.float32), np.ones(1, np.float32), np.zeros(1, np.int32))
+    assert d.xywh.tolist() == [[20, 40, 20, 40]]
@@ -0,0 +1,67 @@
+import time
+
+import numpy as np
+import pytest
+
+from core import faces
+from core.detections import Detections
+from core.faces import MoodPipeline, StubAttributes
+from core.metrics import Metrics
+
+pytest.importorskip("ultralytics.trackers.byte_tracker")
+
+
+class CountingStub(StubAttributes):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def analyze(self, face):
+        self.calls += 1
+        return super().analyze(face)
+
+
+class FakeDetector:
+    """Haar/YuNet ki jagah: `boxes` jo set ho wahi har frame ke faces."""
+
+    def __init__(self, *boxes):
+        self.boxes = list(boxes)
+
+    def detect(self, img):
+        xyxy = np.array(self.boxes, np.float32).reshape(-1, 4)
+        return Detections(xyxy, np.ones(len(xyxy), np.float32), np.zeros(len(xyxy), np.int32))
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    model = CountingStub(mood="happy", age=25)
+    monkeypatch.setattr(faces, "attribute_model", lambda name: model)
+    return model
+
+
+def step(pipeline, t_now):
+    pipeline.process(np.zeros((240, 320, 3), np.uint8), t_now=t_now)
+    # Background worker ke khatam hone tak ruko
+    w = pipeline.worker
+    deadline = time.time() + 5
+    while w.processed + w.dropped < w.submitted and time.time() < deadline:
+        time.sleep(0.005)
+
+
+def test_heavy_model_runs_once_per_track_and_on_refresh(stub):
+    detector = FakeDetector([40, 40, 120, 140])
+    pipeline = MoodPipeline("stub", refresh=5.0, detector=detector, metrics=Metrics("test"))
+    for t in range(5):
+        step(pipeline, float(t))
+    assert stub.calls == 1
+    assert [e["attrs"]["mood"] for e in pipeline.cache.values()] == ["happy"]
+
+    step(pipeline, 5.0)
+    assert stub.calls == 2
+
+    # Naya face: naye track par ek analysis, purana track refresh tak cached
+    detector.boxes.append([200, 40, 280, 140])
+    for t in (6.0, 6.5, 7.0):
+        step(pipeline, t)
+    assert stub.calls == 3
+    assert len(pipeline.cache) == 2
@@ -0,0 +1,26 @@
+import time
+
+from core.inference import ModelRegistry
+
+
+class Registry(ModelRegistry):
+    # Asli YOLO load ke bina
+    def _load(self, weights, backend, imgsz):
+        return object(), backend, None
+
+
+def test_sweep_evicts_idle_but_keeps_pinned():
+    reg = Registry(idle_ttl=0.0, sweep_every=3600)
+    with reg.lease("a.pt"):
+        pass
+    with reg.lease("b.pt"):
+        pass
+    assert reg.pin("b.pt")
+    time.sleep(0.01)
+    evicted = reg.sweep()
+    assert [k[0] for k in evicted] == ["a.pt"]
+    assert [s["weights"] for s in reg.stats()] == ["b.pt"]
+
+
+def test_pin_unknown_entry_is_noop():
+    assert not Registry().pin("missing.pt")
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+from core.measurement import lot_images
+
+
+@pytest.fixture
+def root(tmp_path):
+    lot = tmp_path / "root" / "lot-1"
+    lot.mkdir(parents=True)
+    for name in ("b.jpg", "a.png", "notes.txt"):
+        (lot / name).write_bytes(b"")
+    outside = tmp_path / "secret"
+    outside.mkdir()
+    (outside / "x.jpg").write_bytes(b"")
+    os.symlink(outside / "x.jpg", lot / "link.jpg")
+    return str(tmp_path / "root")
+
+
+def test_lists_images_inside_root(root):
+    assert [os.path.basename(p) for p in lot_images("lot-1", root)] == ["a.png", "b.jpg"]
+
+
+@pytest.mark.parametrize("folder", ["../secret", "/etc", "lot-1/../../secret"])
+def test_rejects_paths_outside_root(root, folder):
+    with pytest.raises(ValueError):
+        lot_images(folder, root)
+
+
+def test_disabled_without_root():
+    with pytest.raises(ValueError):
+        lot_images("lot-1", None)
@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("ultralytics.trackers.byte_tracker")
+from core.batching import BatchScheduler  # noqa: E402
+from core.counting import CountingProcessor, LineZone  # noqa: E402
+from core.metrics import Metrics  # noqa: E402
+from core.radar import VideoProcessor  # noqa: E402
+
+
+class _Tensor:
+    def __init__(self, a):
+        self.a = a
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.a
+
+
+class _Boxes:
+    # ultralytics Boxes jaisa: (N, 6) data = x1, y1, x2, y2, conf, cls
+    def __init__(self, data):
+        self.data = _Tensor(data)
+        self.conf = _Tensor(data[:, 4])
+        self.cls = _Tensor(data[:, 5])
+        self.id = None
+
+    def __len__(self):
+        return len(self.data.a)
+
+
+class FakeModel:
+    """Do objects, har predict call par 5 px neeche."""
+    names = {0: "car", 1: "truck"}
+
+    def __init__(self):
+        self.calls = 0
+
+    def snap(self, imgsz):
+        return imgsz
+
+    def _result(self):
+        dy = 5 * self.calls
+        self.calls += 1
+        data = np.array([[20, 10 + dy, 80, 50 + dy, 0.9, 0], [200, 10 + dy, 280, 60 + dy, 0.8, 1]], np.float32)
+        return SimpleNamespace(boxes=_Boxes(data), masks=None)
+
+    def predict(self, source, tag=None, **kwargs):
+        return [self._result() for _ in (source if isinstance(source, list) else [source])]
+
+
+def frames(n, h=240, w=320):
+    return [np.zeros((h, w, 3), np.uint8) for _ in range(n)]
+
+
+@pytest.fixture(params=["direct", "pool"])
+def scheduler(request):
+    if request.param == "direct":
+        return None
+    return BatchScheduler(FakeModel(), max_batch=1, workers=1, metrics=Metrics("test"))
+
+
+def test_speed_tracker_keeps_ids(scheduler):
+    model = scheduler.model if scheduler else FakeModel()
+    proc = VideoProcessor(model, "m/s", 100, 50.0, interval=0, scheduler=scheduler, metrics=Metrics("test"))
+    for i, img in enumerate(frames(8)):
+        proc.process(img, t_now=i / 10)
+    assert len(proc.history) == 2
+    # 5 px / 0.1 s par 50 px/m = 1 m/s
+    ids = proc.history.ids[proc.history.ids >= 0]
+    assert np.allclose(proc.history.v[proc.history.lookup(ids)], 1.0, atol=0.2)
+
+
+def test_counter_counts_each_track_once(scheduler):
+    model = scheduler.model if scheduler else FakeModel()
+    proc = CountingProcessor(model, lambda w, h: LineZone((0, 60), (w, 60)), scheduler=scheduler,
+                             metrics=Metrics("test"))
+    for i, img in enumerate(frames(20)):
+        proc.process(img, i / 10)
+    crossed = proc.counter.count_in + proc.counter.count_out
+    assert crossed.tolist()[:2] == [1, 1]
@@ -0,0 +1,50 @@
+import csv
+import time
+
+import numpy as np
+
+from core.speedlog import SpeedLog
+
+
+def _rec(log, t, v, known, ids=(1,)):
+    n = len(ids)
+    log.record(t, np.array(ids), np.zeros(n, np.int32), np.full(n, v, np.float32), np.zeros(n, np.float32),
+               np.zeros(n, np.float32), np.array(known))
+
+
+def test_first_sample_not_in_average(tmp_path):
+    log = SpeedLog(path=str(tmp_path / "log.csv"), flush_interval=60)
+    _rec(log, 0.0, 0.0, [False])
+    _rec(log, 1.0, 10.0, [True])
+    _rec(log, 2.0, 20.0, [True])
+    log.flush()
+    row = log.track(1)
+    assert row["samples"] == 2 and row["avg_mps"] == 15.0 and row["first_seen"] == 0.0
+    log.close()
+
+
+def test_event_keeps_limit_at_record_time(tmp_path):
+    log = SpeedLog(path=str(tmp_path / "log.csv"), limit_mps=10.0, flush_interval=60)
+    _rec(log, 0.0, 15.0, [True])
+    log.limit_mps = 20.0
+    log.flush()
+    with open(log.events_path) as fh:
+        rows = list(csv.DictReader(fh))
+    assert float(rows[0]["limit_mps"]) == 10.0
+    log.close()
+
+
+def test_writer_survives_io_error(tmp_path):
+    log = SpeedLog(path=str(tmp_path / "missing" / "log.csv"), flush_interval=0.01)
+    _rec(log, 0.0, 5.0, [True])
+    deadline = time.time() + 2
+    while log.stats()["write_errors"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert log.stats()["error"]
+    (tmp_path / "missing").mkdir()
+    _rec(log, 1.0, 5.0, [True])
+    deadline = time.time() + 2
+    while log.stats()["samples"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert log.stats()["samples"] == 1
+    log.close()
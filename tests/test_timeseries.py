@@ -0,0 +1,39 @@
+import numpy as np
+
+from core import timeseries
+from core.timeseries import CountStore
+
+
+def test_store_survives_reload(tmp_path):
+    path = str(tmp_path / "trends.npz")
+    store = CountStore(3, path=path)
+    t0 = 1_700_000_000
+    for i in range(10):
+        store.add(t0 + 30 * i, np.array([i, 0, 2]))
+    store.save()
+    again = CountStore(3, path=path)
+    assert again.observations == 10
+    for res in again.resolutions:
+        np.testing.assert_array_equal(store.query(t0, t0 + 300, res, "sum")[1],
+                                      again.query(t0, t0 + 300, res, "sum")[1])
+
+
+def test_add_saves_periodically(tmp_path):
+    path = tmp_path / "trends.npz"
+    store = CountStore(2, path=str(path), save_every=0)
+    store.add(1_700_000_000, np.array([1, 1]))
+    assert path.exists()
+
+
+def test_mismatched_file_is_ignored(tmp_path):
+    path = str(tmp_path / "trends.npz")
+    CountStore(3, path=path).save()
+    assert CountStore(5, path=path).observations == 0
+
+
+def test_shared_store_is_process_wide(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeseries.config, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(timeseries, "_stores", {})
+    a = timeseries.shared_count_store("yolov8n", 80)
+    assert timeseries.shared_count_store("yolov8n", 80) is a
+    assert a.path.startswith(str(tmp_path))
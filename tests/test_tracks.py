@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from core.detections import Detections
+
+pytest.importorskip("ultralytics.trackers.byte_tracker")
+from core.tracks import SessionTracker  # noqa: E402
+
+
+def dets(*boxes, conf=0.9):
+    xyxy = np.array(boxes, np.float32).reshape(-1, 4)
+    return Detections(xyxy, np.full(len(xyxy), conf, np.float32), np.zeros(len(xyxy), np.int32))
+
+
+def test_ids_persist_across_frames():
+    tracker = SessionTracker()
+    first = tracker.update(dets([10, 10, 60, 60], [200, 100, 260, 160]))
+    second = tracker.update(dets([14, 12, 64, 62], [204, 102, 264, 162]))
+    assert len(first) == len(second) == 2
+    assert sorted(first.ids.tolist()) == sorted(second.ids.tolist())
+    # Har box apna ID rakhta hai (left box left hi rehta hai)
+    assert first.ids[np.argmin(first.xyxy[:, 0])] == second.ids[np.argmin(second.xyxy[:, 0])]
+
+
+def test_empty_frames_age_out_lost_tracks():
+    tracker = SessionTracker()
+    old = tracker.update(dets([10, 10, 60, 60])).ids[0]
+    assert len(tracker.update(Detections.empty())) == 0
+    # track_buffer (30 frames) se zyada khaali frames: purana track hat jaana chahiye
+    for _ in range(40):
+        tracker.update(Detections.empty())
+    tracker.update(dets([10, 10, 60, 60]))
+    new = tracker.update(dets([10, 10, 60, 60]))
+    assert len(new) == 1 and new.ids[0] != old
+
+
+def test_new_session_does_not_reuse_live_ids():
+    a = SessionTracker()
+    first = a.update(dets([10, 10, 60, 60]))
+    # Doosra session khulna pehle wale ke IDs reset na kare
+    SessionTracker().update(dets([10, 10, 60, 60]))
+    a.update(dets([12, 12, 62, 62], [200, 100, 260, 160]))
+    tracks = a.update(dets([14, 14, 64, 64], [202, 102, 262, 162]))
+    assert len(tracks) == 2
+    assert len(set(tracks.ids.tolist())) == 2
+    assert first.ids[0] in tracks.ids